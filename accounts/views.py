@@ -1,8 +1,7 @@
 from django.shortcuts import render, redirect
 from django.contrib.auth import login, authenticate
 from django.contrib.auth.decorators import login_required
-from azure.storage.blob import BlobServiceClient
-from django.conf import settings
+from util.common.azure_storage import upload_blob
 from .forms import SignUpForm, ProfileUpdateForm
 from .models import Profile
 
@@ -37,16 +36,9 @@ def profile_update(request):
                 file_name = f"profile_{request.user.username}.{file_extension}"
 
                 try:
-                    blob_service_client = BlobServiceClient.from_connection_string(
-                        settings.AZURE_CONNECTION_STRING
+                    profile.profile_image = upload_blob(
+                        file_name, file, overwrite=True, content_type=file.content_type
                     )
-                    container_name = settings.CONTAINER_NAME
-                    blob_client = blob_service_client.get_blob_client(
-                        container=container_name, blob=file_name
-                    )
-
-                    blob_client.upload_blob(file, overwrite=True)                
-                    profile.profile_image = blob_client.url
                     
                 except Exception as e:
                     print("==== Blob 업로드 실패 ====")
@@ -1,281 +1,460 @@
-
 # #### gpt-4o-mini + DALL-E 3 + 통합 코드 이미지 파일 Azure Blob Storage 저장
+# 프로젝트 루트에서 실행: python -m ai_playground.converter
+# 여러 아이디어 한 번에 변환: python -m ai_playground.converter --batch ideas.txt --output prompts.jsonl
+# (ideas.txt는 한 줄에 아이디어 하나, 빈 줄과 #으로 시작하는 줄은 건너뜀. "-"는 표준 입력)
+#
+# 다른 코드에서 사용:
+#     from ai_playground.converter import get_converter
+#     result = get_converter().convert("노을 지는 바닷가의 고양이")
+#     result = get_converter().convert("좀 더 어둡게", thread_id=result.thread_id)
 
 # %%
-import os 
-import re 
-import time
-import requests  # 이미지 다운로드를 위해 추가  
-from dotenv import load_dotenv  
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from dotenv import load_dotenv
 from openai import AzureOpenAI
 
-from azure.storage.blob import BlobServiceClient, BlobClient
-  
-# .env 파일 로드 (gpt4o-mini용 환경 변수)  
-load_dotenv("gpt4o-mini.env")  
-  
-# Azure OpenAI 환경 변수 설정  
-AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")  
-AZURE_OPENAI_API_KEY = os.getenv("AZURE_OPENAI_API_KEY")  
-AZURE_OPENAI_API_VERSION = os.getenv("AZURE_OPENAI_API_VERSION")  
-  
-if not AZURE_OPENAI_ENDPOINT or not AZURE_OPENAI_API_KEY:  
-    raise ValueError("환경 변수가 올바르게 설정되지 않았습니다. .env 파일을 확인하세요.")  
-  
-# Azure OpenAI 클라이언트 초기화  
-GPT_CLIENT = AzureOpenAI(  
-    azure_endpoint=AZURE_OPENAI_ENDPOINT,  
-    api_key=AZURE_OPENAI_API_KEY,  
-    api_version=AZURE_OPENAI_API_VERSION  
-)  
-  
-def generate_prompt_with_gpt4o(user_input):  
-    """  
-    GPT-4o-mini를 사용해 DALL-E 3 프롬프트 생성  
-    """  
-    try:  
-        print("GPT-4o-mini를 사용해 프롬프트를 생성합니다...")  
-  
-        # Azure OpenAI GPT 모델 호출  
-        assistant = GPT_CLIENT.beta.assistants.create(  
-            model="gpt-4o-mini",  
-            instructions="""  
-            You are an expert in converting user's natural language descriptions into DALL-E image generation prompts.
-            Please generate prompts according to the following guidelines:
-
-            ##Main Guidelines
-
-            1. Carefully analyze the user's description to identify key elements.
-            2. Use clear and specific language to write the prompt.
-            3. Include details such as the main subject, style, composition, color, and lighting of the image.
-            4. Appro-priately utilize artistic references or cultural elements to enrich the prompt.
-            5. Add instructions about image quality or resolution if necessary.
-            6. Evaluate if the user's request might violate DALL-E's content policy. If there's a possibility of violation, include a message in the user's original language: "This content may be blocked by DALL-E. Please try a different approach." and explain why blocked.
-            7. Always provide the prompt in English, regardless of the language used in the user's request.
-
-            ##Prompt Structure
-
-            - Specify the main subject first, then add details.
-            - Use adjectives and adverbs effectively to convey the mood and style of the image.
-            - Specify the composition or perspective of the image if needed.
-
-            ##Precautions
-
-            - Do not directly mention copyrighted characters or brands.
-            - Avoid violent or inappropriate content.
-            - Avoid overly complex or ambiguous descriptions, maintain clarity.
-            - Avoid words related to violence, adult content, gore, politics, or drugs.
-            - Do not use names of real people.
-            - Avoid directly mentioning specific body parts.
-
-            ##Using Alternative Expressions
-
-            Consider DALL-E's strict content policy and use visual synonyms with similar meanings to prohibited words. Examples:
-
-            - "shooting star" → "meteor" or "falling star"
-            - "exploding" → "bursting" or "expanding"
-
-            ##Example Prompt Format
-
-            "[Style/mood] image of [main subject]. [Detailed description]. [Composition/perspective]. [Color/lighting information]." Follow these guidelines to convert the user's description into a DALL-E-appropriate prompt. The prompt should be creative yet easy for AI to understand. If there's a possibility of content policy violation, notify the user and suggest alternatives.
-            """,  
-            temperature=0.7  
-        )  
-  
-        # 새 스레드 생성  
-        thread = GPT_CLIENT.beta.threads.create()  
-  
-        # 사용자 입력 추가  
-        GPT_CLIENT.beta.threads.messages.create(  
-            thread_id=thread.id,  
-            role="user",  
-            content=user_input  
-        )  
-  
-        # 실행 요청  
-        try:  
-            run = GPT_CLIENT.beta.threads.runs.create(  
-                thread_id=thread.id,  
-                assistant_id=assistant.id  
-            )  
-        except Exception as e:  
-            print("run 객체 생성 중 예외 발생:", str(e))  
-            return None  
-  
-        # run 객체가 생성되지 않았으면 종료  
-        if not run:  
-            print("GPT-4o-mini 실행 실패: run 객체가 생성되지 않았습니다.")  
-            return None  
-  
-        # 실행 상태 확인 (반복적으로 상태 확인)  
-        while run.status in ['queued', 'in_progress', 'cancelling']:  
-            time.sleep(1)  # 1초 대기  
-            run = GPT_CLIENT.beta.threads.runs.retrieve(  
-                thread_id=thread.id,  
-                run_id=run.id  
+from util.common.azure_storage import get_http_session, upload_blob
+
+# .env 파일 로드 (gpt4o-mini용 환경 변수)
+load_dotenv("gpt4o-mini.env")
+
+# Azure OpenAI 환경 변수 설정
+AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
+AZURE_OPENAI_API_KEY = os.getenv("AZURE_OPENAI_API_KEY")
+AZURE_OPENAI_API_VERSION = os.getenv("AZURE_OPENAI_API_VERSION")
+
+# 클라이언트는 처음 사용할 때 만든다 (환경 변수 없이도 모듈을 import해 테스트할 수 있도록)
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def _get_client(name, create):
+    client = _clients.get(name)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(name)
+            if client is None:
+                client = _clients[name] = create()
+    return client
+
+
+def get_gpt_client():
+    """gpt-4o-mini용 Azure OpenAI 클라이언트"""
+
+    def create():
+        if not AZURE_OPENAI_ENDPOINT or not AZURE_OPENAI_API_KEY:
+            raise ValueError(
+                "환경 변수가 올바르게 설정되지 않았습니다. .env 파일을 확인하세요."
             )
-            print(f"현재 실행 상태: {run.status}")  # 상태 출력  
-  
-        # 실행 완료 시 결과 확인  
-        if run.status == 'completed':  
-            print("GPT-4o-mini 호출 성공!")  
-  
-            # 메시지에서 assistant의 응답 가져오기  
-            messages = GPT_CLIENT.beta.threads.messages.list(thread_id=thread.id)  
-  
-            # 디버깅: 반환된 메시지 구조 확인  
-            print("반환된 메시지 구조:", messages)  
-  
-            for message in reversed(messages.data):  
-                if message.role == 'assistant':  
-                    # message.content의 데이터 타입 확인  
-                    if isinstance(message.content, str):  # content가 문자열인 경우  
-                        response = message.content.strip()  
-                        print("생성된 프롬프트:", response)  
-                        return response  
-                    elif isinstance(message.content, list):  # content가 리스트인 경우  
-                        # 리스트 내부의 TextContentBlock에서 텍스트 추출  
-                        extracted_texts = [  
-                            block.text.value for block in message.content  
-                            if hasattr(block, 'text') and hasattr(block.text, 'value')  
-                        ]  
-                        response = " ".join(extracted_texts).strip()  
-                        print("생성된 프롬프트 (리스트 처리):", response)  
-                        return response  
-                    else:  
-                        print("message.content가 예상치 못한 형식입니다:", type(message.content))  
-                        return None  
-  
-            # assistant 응답이 없는 경우  
-            print("assistant의 응답을 찾을 수 없습니다.")  
-            return None  
-  
-        # 실행 실패 시 처리  
-        if run.status == 'failed':  
-            print(f"GPT-4o-mini 실행 실패: 상태 - {run.status}")  
-            print("run 객체의 속성:", dir(run))  # run 객체의 속성 출력  
-            print("run 객체의 데이터:", run.__dict__)  # run 객체의 데이터 출력  
-  
-            # 실패 이유를 명확하게 출력  
-            last_error = getattr(run, 'last_error', None)  
-            if last_error:  
-                print("실패 코드:", last_error.code)  
-                print("실패 메시지:", last_error.message)  
-            else:  
-                print("실패 이유를 확인할 수 없습니다. run 객체를 더 조사해보세요.")  
-  
-            # 실패 상태에 따른 추가 처리  
-            if last_error and last_error.code == 'rate_limit_exceeded':  
-                print("\n원인: 요청량 제한 초과 (Rate Limit Exceeded)")  
-                print("조치: 24시간 동안 대기하거나 Azure 포털에서 요청량 제한을 늘리세요.")  
-            else:  
-                print("\n다른 이유로 실패한 것 같습니다. API 설정이나 네트워크 상태를 확인하세요.")  
-  
-            return None  
-  
-    except Exception as e:  
-        print("GPT-4o-mini 호출 중 예외 발생:", str(e))  
-        return None  
-
-# DALL-E 환경 변수 로드  
-load_dotenv("dalle3.env")  
-  
-# DALL-E 클라이언트 초기화  
-DALLE_CLIENT = AzureOpenAI(  
-    azure_endpoint=os.environ["AZURE_DALLE_ENDPOINT"],  
-    api_key=os.environ["AZURE_DALLE_API_KEY"],  
-    api_version=os.environ["AZURE_DALLE_API_VERSION"]  
-)  
-
-def generate_image_with_dalle(prompt):  
-    """DALL-E를 사용해 이미지를 생성하고 로컬에 저장"""  
-    try:  
-        print("DALL-E를 사용해 이미지를 생성합니다...")  
-  
-        # DALL-E API 호출  
-        result = DALLE_CLIENT.images.generate(  
-            model="dall-e-3",  # 사용할 DALL-E 모델  
-            prompt=prompt,    # 생성할 이미지에 대한 프롬프트  
-            n=1               # 생성할 이미지 개수  
-        )  
-  
-        # 결과 처리  
-        if result and result.data:  
-            image_url = result.data[0].url  
-            print("DALL-E 호출 성공! 생성된 이미지 URL:", image_url)  
-
-            # 이미지 다운로드 및 저장
-            save_image(image_url, prompt)
-
-            return image_url  
-        else:  
-            print("DALL-E 호출 실패: 결과가 비어 있습니다.")  
-            return None  
-    except Exception as e:  
-        print("DALL-E 호출 중 예외 발생:", str(e))  
-        return None  
+        return AzureOpenAI(
+            azure_endpoint=AZURE_OPENAI_ENDPOINT,
+            api_key=AZURE_OPENAI_API_KEY,
+            api_version=AZURE_OPENAI_API_VERSION,
+        )
+
+    return _get_client("gpt", create)
+
+
+CONVERTER_MODEL = "gpt-4o-mini"
+CONVERTER_TEMPERATURE = 0.7
+# 이 스크립트가 만든 어시스턴트를 찾기 위한 메타데이터 값
+CONVERTER_APP_TAG = "inspiraition-prompt-converter"
+# 배치 변환 시 동시에 실행할 요청 수
+CONVERTER_BATCH_WORKERS = 4
+
+CONVERTER_INSTRUCTIONS = """\
+You are an expert in converting user's natural language descriptions into DALL-E image generation prompts.
+Please generate prompts according to the following guidelines:
+
+##Main Guidelines
+
+1. Carefully analyze the user's description to identify key elements.
+2. Use clear and specific language to write the prompt.
+3. Include details such as the main subject, style, composition, color, and lighting of the image.
+4. Appro-priately utilize artistic references or cultural elements to enrich the prompt.
+5. Add instructions about image quality or resolution if necessary.
+6. Evaluate if the user's request might violate DALL-E's content policy. If there's a possibility of violation, include a message in the user's original language: "This content may be blocked by DALL-E. Please try a different approach." and explain why blocked.
+7. Always provide the prompt in English, regardless of the language used in the user's request.
+
+##Prompt Structure
+
+- Specify the main subject first, then add details.
+- Use adjectives and adverbs effectively to convey the mood and style of the image.
+- Specify the composition or perspective of the image if needed.
+
+##Precautions
+
+- Do not directly mention copyrighted characters or brands.
+- Avoid violent or inappropriate content.
+- Avoid overly complex or ambiguous descriptions, maintain clarity.
+- Avoid words related to violence, adult content, gore, politics, or drugs.
+- Do not use names of real people.
+- Avoid directly mentioning specific body parts.
+
+##Using Alternative Expressions
+
+Consider DALL-E's strict content policy and use visual synonyms with similar meanings to prohibited words. Examples:
+
+- "shooting star" → "meteor" or "falling star"
+- "exploding" → "bursting" or "expanding"
+
+##Example Prompt Format
+
+"[Style/mood] image of [main subject]. [Detailed description]. [Composition/perspective]. [Color/lighting information]." Follow these guidelines to convert the user's description into a DALL-E-appropriate prompt. The prompt should be creative yet easy for AI to understand. If there's a possibility of content policy violation, notify the user and suggest alternatives.
+"""
+
+
+class ConversionError(Exception):
+    """프롬프트 변환 실패"""
+
+
+@dataclass
+class ConversionResult:
+    idea: str
+    prompt: str
+    # 같은 아이디어를 이어서 다듬을 때 convert(..., thread_id=)로 넘긴다
+    thread_id: str
+
+
+class PromptConverter:
+    """아이디어를 DALL-E 프롬프트로 바꾸는 변환 엔진
+
+    어시스턴트는 (모델, 지침, 온도) 지문을 메타데이터에 붙여 한 번만 만들고,
+    이후에는 같은 지문의 어시스턴트를 찾아 ID를 재사용한다(CONVERTER_ASSISTANT_ID
+    환경 변수로 지정할 수도 있음). 실행은 스트리밍으로 받아 상태 폴링 없이
+    완료되는 즉시 결과를 얻는다.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        model=CONVERTER_MODEL,
+        instructions=CONVERTER_INSTRUCTIONS,
+        temperature=CONVERTER_TEMPERATURE,
+        assistant_id=None,
+    ):
+        self.client = client or get_gpt_client()
+        self.model = model
+        self.instructions = instructions
+        self.temperature = temperature
+        self._assistant_id = assistant_id or os.getenv("CONVERTER_ASSISTANT_ID")
+        self._lock = threading.Lock()
+
+    @property
+    def fingerprint(self):
+        source = f"{self.model}\x1f{self.temperature}\x1f{self.instructions}"
+        return hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
+
+    def _own_assistants(self):
+        for assistant in self.client.beta.assistants.list(limit=100):
+            if (assistant.metadata or {}).get("app") == CONVERTER_APP_TAG:
+                yield assistant
+
+    @property
+    def assistant_id(self):
+        """재사용할 어시스턴트 ID (처음 사용할 때 찾거나 생성)"""
+        if self._assistant_id is None:
+            with self._lock:
+                if self._assistant_id is None:
+                    self._assistant_id = self._find_or_create_assistant()
+        return self._assistant_id
+
+    def _find_or_create_assistant(self):
+        for assistant in self._own_assistants():
+            if assistant.metadata.get("fingerprint") == self.fingerprint:
+                return assistant.id
+
+        assistant = self.client.beta.assistants.create(
+            model=self.model,
+            name="prompt-converter",
+            instructions=self.instructions,
+            temperature=self.temperature,
+            metadata={"app": CONVERTER_APP_TAG, "fingerprint": self.fingerprint},
+        )
+        print(f"프롬프트 변환용 어시스턴트를 생성했습니다: {assistant.id}")
+        return assistant.id
+
+    def cleanup_stale_assistants(self):
+        """지침이나 모델이 바뀌어 더 이상 쓰지 않는 어시스턴트 삭제 (삭제한 개수 반환)"""
+        stale = [
+            assistant.id
+            for assistant in self._own_assistants()
+            if assistant.metadata.get("fingerprint") != self.fingerprint
+        ]
+        for assistant_id in stale:
+            self.client.beta.assistants.delete(assistant_id)
+        return len(stale)
+
+    def convert(self, idea, thread_id=None, on_delta=None):
+        """아이디어를 DALL-E 프롬프트로 변환
+
+        thread_id를 주면 그 스레드에 이어서 요청해 앞선 대화를 바탕으로 다듬는다.
+        없으면 스레드 생성과 실행을 한 번의 요청으로 처리한다.
+        on_delta(text)는 응답 토큰이 도착할 때마다 호출된다.
+        """
+        message = {"role": "user", "content": idea}
+        if thread_id:
+            stream = self.client.beta.threads.runs.stream(
+                thread_id=thread_id,
+                assistant_id=self.assistant_id,
+                additional_messages=[message],
+            )
+        else:
+            stream = self.client.beta.threads.create_and_run_stream(
+                assistant_id=self.assistant_id, thread={"messages": [message]}
+            )
+
+        parts = []
+        with stream as events:
+            for delta in events.text_deltas:
+                parts.append(delta)
+                if on_delta:
+                    on_delta(delta)
+            run = events.get_final_run()
+
+        if run.status != "completed":
+            error = run.last_error
+            detail = f" ({error.code}: {error.message})" if error else ""
+            raise ConversionError(f"실행 상태 {run.status}{detail}")
+        prompt = "".join(parts).strip()
+        if not prompt:
+            raise ConversionError("assistant의 응답을 찾을 수 없습니다.")
+        return ConversionResult(idea=idea, prompt=prompt, thread_id=run.thread_id)
+
+    def _convert_once(self, idea):
+        try:
+            result = self.convert(idea)
+        except Exception as e:
+            return idea, None, str(e)
+        # 배치 변환은 이어서 다듬지 않으므로 스레드를 남기지 않는다
+        try:
+            self.client.beta.threads.delete(result.thread_id)
+        except Exception:
+            pass
+        return idea, result.prompt, None
+
+    def convert_many(self, ideas, workers=CONVERTER_BATCH_WORKERS):
+        """여러 아이디어를 동시에 변환해 입력 순서대로 (아이디어, 프롬프트, 오류) 반환"""
+        ideas = list(ideas)
+        if not ideas:
+            return
+        # 어시스턴트를 워커 시작 전에 한 번만 준비
+        self.assistant_id
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            yield from executor.map(self._convert_once, ideas)
+
+
+_converter = None
+
+
+def get_converter():
+    """프로세스 전체에서 공유하는 PromptConverter"""
+    global _converter
+    if _converter is None:
+        _converter = PromptConverter()
+    return _converter
+
+
+def _convert_verbose(user_input, thread_id=None):
+    """생성되는 프롬프트를 바로 출력하면서 변환 (실패 시 None)"""
+    print("GPT-4o-mini를 사용해 프롬프트를 생성합니다...")
+    try:
+        result = get_converter().convert(
+            user_input,
+            thread_id=thread_id,
+            on_delta=lambda text: print(text, end="", flush=True),
+        )
+    except Exception as e:
+        print("\nGPT-4o-mini 호출 중 예외 발생:", str(e))
+        if "rate_limit_exceeded" in str(e):
+            print("\n원인: 요청량 제한 초과 (Rate Limit Exceeded)")
+            print("조치: 24시간 동안 대기하거나 Azure 포털에서 요청량 제한을 늘리세요.")
+        return None
+    print()
+    return result
+
+
+def generate_prompt_with_gpt4o(user_input):
+    """
+    GPT-4o-mini를 사용해 DALL-E 3 프롬프트 생성
+    """
+    result = _convert_verbose(user_input)
+    return result.prompt if result else None
+
+
+# DALL-E 환경 변수 로드
+load_dotenv("dalle3.env")
+
+
+def get_dalle_client():
+    """DALL-E 3용 Azure OpenAI 클라이언트"""
+    return _get_client(
+        "dalle",
+        lambda: AzureOpenAI(
+            azure_endpoint=os.environ["AZURE_DALLE_ENDPOINT"],
+            api_key=os.environ["AZURE_DALLE_API_KEY"],
+            api_version=os.environ["AZURE_DALLE_API_VERSION"],
+        ),
+    )
+
+
+# 이전 모듈 속성 이름 (from ai_playground.converter import GPT_CLIENT 등) 호환
+_LEGACY_CLIENTS = {"GPT_CLIENT": get_gpt_client, "DALLE_CLIENT": get_dalle_client}
+
+
+def __getattr__(name):
+    if name in _LEGACY_CLIENTS:
+        return _LEGACY_CLIENTS[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def generate_image_with_dalle(prompt):
+    """DALL-E를 사용해 이미지를 생성하고 URL 반환"""
+    try:
+        print("DALL-E를 사용해 이미지를 생성합니다...")
+
+        # DALL-E API 호출
+        result = get_dalle_client().images.generate(
+            model="dall-e-3",  # 사용할 DALL-E 모델
+            prompt=prompt,  # 생성할 이미지에 대한 프롬프트
+            n=1,  # 생성할 이미지 개수
+        )
+
+        # 결과 처리
+        if result and result.data:
+            image_url = result.data[0].url
+            print("DALL-E 호출 성공! 생성된 이미지 URL:", image_url)
+            return image_url
+        else:
+            print("DALL-E 호출 실패: 결과가 비어 있습니다.")
+            return None
+    except Exception as e:
+        print("DALL-E 호출 중 예외 발생:", str(e))
+        return None
+
 
 # Azure Blob Storage 환경 변수 로드
+# (AZURE_STORAGE_CONNECTION_STRING, AZURE_STORAGE_CONTAINER_NAME을 util.common.azure_storage에서 사용)
 load_dotenv("azure_storage.env")
 
-# Azure Blob Storage 연결 문자열
-connect_str = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
-
-# Blob Service Client 생성
-blob_service_client = BlobServiceClient.from_connection_string(connect_str)
 
 def save_image_to_blob_storage(image_url, prompt):
     """이미지를 다운로드하여 Azure Blob Storage에 저장"""
     try:
-        response = requests.get(image_url, stream=True)
+        response = get_http_session().get(image_url, timeout=60)
         response.raise_for_status()
 
-        # 컨테이너 이름
-        container_name = os.getenv("AZURE_STORAGE_CONTAINER_NAME")
-
         # 파일명에서 특수문자 제거 및 최대 길이 제한
-        sanitized_filename = re.sub(r'[<>:"/\\|?*]', '', prompt[:30]).strip()
+        sanitized_filename = re.sub(r'[<>:"/\\|?*]', "", prompt[:30]).strip()
         filename = f"{sanitized_filename}.png"
 
-        # Blob Client 생성
-        blob_client = blob_service_client.get_blob_client(container=container_name, blob=filename)
-
-        # 이미지 데이터 업로드
-        blob_client.upload_blob(response.content)
+        # 이미지 데이터 업로드 (공유 Blob 클라이언트 사용)
+        upload_blob(filename, response.content, overwrite=False)
 
         print(f"이미지가 Azure Blob Storage에 저장되었습니다: {filename}")
 
     except Exception as e:
         print(f"Azure Blob Storage에 이미지 저장 중 오류 발생: {e}")
 
-def main():  
-    """전체 워크플로 실행"""  
-    user_input = input("이미지 생성 아이디어를 입력하세요: ").strip()  
-    if not user_input:  
-        print("입력값이 비어 있습니다. 유효한 입력값을 제공합니다.")  
-        return  
-  
-    # Step 1: GPT-4o-mini를 사용해 프롬프트 생성  
-    prompt = generate_prompt_with_gpt4o(user_input)  
-    if not prompt:  
-        print("프롬프트 생성 실패. 워크플로를 종료합니다.")  
-        return  
-  
-    # Step 2: DALL-E를 사용해 이미지 생성  
-    image_url = generate_image_with_dalle(prompt)  
-    if not image_url:  
-        print("이미지 생성 실패. 워크플로를 종료합니다.")  
-        return  
-    
+
+def read_ideas(path):
+    """한 줄에 하나씩 적힌 아이디어 목록 읽기 (빈 줄과 # 주석 제외)"""
+    if path == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.startswith("#")]
+
+
+def run_batch(input_path, output_path=None, workers=CONVERTER_BATCH_WORKERS):
+    """아이디어 파일을 변환해 JSON Lines({idea, prompt, error})로 기록"""
+    ideas = read_ideas(input_path)
+    print(f"{len(ideas)}개의 아이디어를 변환합니다...", file=sys.stderr)
+
+    out = open(output_path, "w", encoding="utf-8") if output_path else sys.stdout
+    failed = 0
+    try:
+        for idea, prompt, error in get_converter().convert_many(ideas, workers):
+            failed += error is not None
+            record = {"idea": idea, "prompt": prompt, "error": error}
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+    finally:
+        if output_path:
+            out.close()
+
+    print(f"변환 완료: 성공 {len(ideas) - failed}개, 실패 {failed}개", file=sys.stderr)
+    return failed
+
+
+def run_interactive():
+    """전체 워크플로 실행"""
+    user_input = input("이미지 생성 아이디어를 입력하세요: ").strip()
+    if not user_input:
+        print("입력값이 비어 있습니다. 유효한 입력값을 제공합니다.")
+        return
+
+    # Step 1: GPT-4o-mini를 사용해 프롬프트 생성 (같은 스레드에서 원하는 만큼 다듬기)
+    result = _convert_verbose(user_input)
+    while result:
+        feedback = input("\n수정할 내용을 입력하세요 (엔터: 이대로 진행): ").strip()
+        if not feedback:
+            break
+        result = _convert_verbose(feedback, thread_id=result.thread_id)
+    if not result:
+        print("프롬프트 생성 실패. 워크플로를 종료합니다.")
+        return
+
+    # Step 2: DALL-E를 사용해 이미지 생성
+    image_url = generate_image_with_dalle(result.prompt)
+    if not image_url:
+        print("이미지 생성 실패. 워크플로를 종료합니다.")
+        return
+
     # Step 3: Azure Blob Storage에 이미지 저장
-    if image_url:
-        save_image_to_blob_storage(image_url, prompt)
-  
-    print("\n=== 최종 결과 ===")  
-    print(f"생성된 이미지가 'images/' 폴더에 저장되었습니다.")  
-  
-  
-if __name__ == "__main__":  
-    main()
+    save_image_to_blob_storage(image_url, result.prompt)
+
+    print("\n=== 최종 결과 ===")
+    print(f"생성된 이미지 URL: {image_url}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="아이디어를 DALL-E 프롬프트로 변환")
+    parser.add_argument(
+        "--batch", metavar="FILE", help="아이디어 파일 일괄 변환 (- 는 표준 입력)"
+    )
+    parser.add_argument(
+        "--output", metavar="FILE", help="배치 결과 JSON Lines 파일 (기본: 표준 출력)"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=CONVERTER_BATCH_WORKERS, help="동시 변환 요청 수"
+    )
+    parser.add_argument(
+        "--cleanup",
+        action="store_true",
+        help="더 이상 쓰지 않는 변환용 어시스턴트 삭제",
+    )
+    args = parser.parse_args(argv)
+
+    if args.cleanup:
+        deleted = get_converter().cleanup_stale_assistants()
+        print(f"사용하지 않는 어시스턴트 {deleted}개를 삭제했습니다.", file=sys.stderr)
+    if args.batch:
+        return 1 if run_batch(args.batch, args.output, args.workers) else 0
+    if not args.cleanup:
+        run_interactive()
+    return 0
 
 
+if __name__ == "__main__":
+    sys.exit(main())
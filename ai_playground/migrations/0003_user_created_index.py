@@ -0,0 +1,21 @@
+# Generated by Django 5.1.5 on 2026-10-18 01:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ai_playground", "0002_alter_aiimagegeneration_image_url"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="aiimagegeneration",
+            index=models.Index(
+                fields=["user", "-created_at"], name="aiimg_user_created_idx"
+            ),
+        ),
+    ]
@@ -12,4 +12,7 @@ class AIImageGeneration(models.Model):
         return f"{self.user.username}'s image - {self.created_at}"
 
     class Meta:
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=["user", "-created_at"], name="aiimg_user_created_idx"),
+        ]
\ No newline at end of file
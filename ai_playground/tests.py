@@ -1,5 +1,245 @@
-from django.test import TestCase
+import os
+import threading
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
 
-# test-th
\ No newline at end of file
+from app.jobs import run_job
+from app.models import GenerationJob
+from util.common.generation import GPT4O_SYSTEM_PROMPT, generate_prompt_with_gpt4o
+from util.common.prompt_cache import get_prompt_cache
+from util.testing import IndexUsageTestMixin, count_outbound_calls
+
+from .converter import CONVERTER_APP_TAG, ConversionError, PromptConverter
+from .models import AIImageGeneration
+from .views import PLAYGROUND_SYSTEM_PROMPT
+
+
+class ImageHistoryIndexTests(IndexUsageTestMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("indexer", password="pw")
+        for i in range(5):
+            AIImageGeneration.objects.create(
+                user=cls.user,
+                prompt=f"prompt {i}",
+                generated_prompt="generated",
+                image_url="https://example.com/image.png",
+            )
+
+    def test_image_history_uses_user_created_index(self):
+        self.client.force_login(self.user)
+        for sql in self.captured_queries(
+            "ai_playground_aiimagegeneration",
+            lambda: self.client.get(reverse("ai_playground:image_history")),
+        ):
+            self.assertUsesIndex(sql, "aiimg_user_created_idx")
+
+
+class OutboundCallBenchmarkTests(TestCase):
+    """요청 한 번에 외부 API를 몇 번 호출하는지 고정하는 회귀 테스트"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("generator", password="pw")
+
+    def setUp(self):
+        get_prompt_cache().clear()
+
+    def assertCalls(self, calls, **expected):
+        self.assertEqual({name: calls[name].call_count for name in expected}, expected)
+
+    def generate(self, prompt):
+        self.client.force_login(self.user)
+        return self.client.post(
+            reverse("ai_playground:generate_image"), {"prompt": prompt}
+        )
+
+    def test_playground_generate_calls_each_api_once(self):
+        with count_outbound_calls() as calls:
+            response = self.generate("고양이")
+        self.assertEqual(response.status_code, 200)
+        self.assertCalls(calls, gpt=1, o3=0, dalle=1, blob=0)
+
+        # 같은 입력은 프롬프트 캐시로 처리되어 GPT를 다시 호출하지 않음
+        with count_outbound_calls() as calls:
+            self.generate("고양이 ")
+        self.assertCalls(calls, gpt=0, dalle=1)
+
+    def test_playground_keeps_its_own_system_prompt(self):
+        with count_outbound_calls() as calls:
+            self.generate("고양이")
+        messages = calls["gpt"].call_args.kwargs["messages"]
+        self.assertEqual(messages[0]["content"], PLAYGROUND_SYSTEM_PROMPT)
+
+        # 시스템 프롬프트가 다르면 같은 입력이어도 캐시를 함께 쓰지 않는다
+        with count_outbound_calls() as calls:
+            generate_prompt_with_gpt4o("고양이")
+        self.assertCalls(calls, gpt=1)
+        messages = calls["gpt"].call_args.kwargs["messages"]
+        self.assertEqual(messages[0]["content"], GPT4O_SYSTEM_PROMPT)
+
+    def test_generation_job_calls_each_api_once(self):
+        job = GenerationJob.objects.create(user=self.user, prompt="고양이")
+        with count_outbound_calls() as calls, mock.patch(
+            "app.jobs.create_thumbnails", return_value={}
+        ):
+            run_job(job)
+        self.assertEqual(job.status, GenerationJob.STATUS_SUCCEEDED)
+        self.assertCalls(calls, gpt=0, o3=1, dalle=1, blob=1)
+
+
+class FakeAssistantsBeta:
+    """PromptConverter가 쓰는 client.beta의 가짜 구현 (assistants, threads)"""
+
+    def __init__(self, assistants=(), replies=None):
+        self.assistants = SimpleNamespace(
+            list=mock.Mock(side_effect=lambda limit: list(assistants)),
+            create=mock.Mock(return_value=SimpleNamespace(id="asst_new")),
+            delete=mock.Mock(),
+        )
+        # 아이디어 → (응답 토큰 목록, 실행 상태, 지연 시간)
+        self.replies = replies or {}
+        self.threads = SimpleNamespace(
+            create_and_run_stream=mock.Mock(side_effect=self._create_and_run),
+            runs=SimpleNamespace(stream=mock.Mock(side_effect=self._run)),
+            delete=mock.Mock(),
+        )
+        self._lock = threading.Lock()
+        self._thread_count = 0
+
+    def _create_and_run(self, assistant_id, thread):
+        with self._lock:
+            self._thread_count += 1
+            thread_id = f"thread_{self._thread_count}"
+        return self._stream(thread["messages"][0]["content"], thread_id)
+
+    def _run(self, thread_id, assistant_id, additional_messages):
+        return self._stream(additional_messages[0]["content"], thread_id)
+
+    @contextmanager
+    def _stream(self, idea, thread_id):
+        deltas, status, delay = self.replies.get(
+            idea, ([idea, " prompt"], "completed", 0)
+        )
+        time.sleep(delay)
+        error = (
+            None
+            if status == "completed"
+            else SimpleNamespace(code="rate_limit_exceeded", message="too many")
+        )
+        run = SimpleNamespace(status=status, last_error=error, thread_id=thread_id)
+        yield SimpleNamespace(text_deltas=iter(deltas), get_final_run=lambda: run)
+
+
+def own_assistant(assistant_id, fingerprint, app=CONVERTER_APP_TAG):
+    return SimpleNamespace(
+        id=assistant_id, metadata={"app": app, "fingerprint": fingerprint}
+    )
+
+
+class PromptConverterTests(SimpleTestCase):
+    def make_converter(self, **beta_kwargs):
+        beta = FakeAssistantsBeta(**beta_kwargs)
+        return PromptConverter(client=SimpleNamespace(beta=beta)), beta
+
+    def setUp(self):
+        patcher = mock.patch.dict(os.environ)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        os.environ.pop("CONVERTER_ASSISTANT_ID", None)
+
+    def test_reuses_assistant_with_same_fingerprint(self):
+        fingerprint = PromptConverter(client=object()).fingerprint
+        converter, beta = self.make_converter(
+            assistants=[
+                own_assistant("asst_other_app", fingerprint, app="other"),
+                own_assistant("asst_old", "0" * 16),
+                own_assistant("asst_current", fingerprint),
+            ]
+        )
+        self.assertEqual(converter.assistant_id, "asst_current")
+        self.assertEqual(converter.assistant_id, "asst_current")
+        beta.assistants.create.assert_not_called()
+        self.assertEqual(beta.assistants.list.call_count, 1)
+
+    def test_creates_assistant_when_fingerprint_changes(self):
+        old = PromptConverter(client=object())
+        converter, beta = self.make_converter(
+            assistants=[own_assistant("asst_old", old.fingerprint)]
+        )
+        converter.instructions += "\nAlways answer in one sentence."
+        self.assertNotEqual(converter.fingerprint, old.fingerprint)
+
+        self.assertEqual(converter.assistant_id, "asst_new")
+        metadata = beta.assistants.create.call_args.kwargs["metadata"]
+        self.assertEqual(
+            metadata, {"app": CONVERTER_APP_TAG, "fingerprint": converter.fingerprint}
+        )
+
+    def test_cleanup_deletes_only_own_stale_assistants(self):
+        fingerprint = PromptConverter(client=object()).fingerprint
+        converter, beta = self.make_converter(
+            assistants=[
+                own_assistant("asst_current", fingerprint),
+                own_assistant("asst_old", "0" * 16),
+                own_assistant("asst_other_app", "0" * 16, app="other"),
+            ]
+        )
+        self.assertEqual(converter.cleanup_stale_assistants(), 1)
+        beta.assistants.delete.assert_called_once_with("asst_old")
+
+    def test_convert_joins_streamed_text(self):
+        converter, beta = self.make_converter(
+            replies={"고양이": (["A cat", " at sunset."], "completed", 0)}
+        )
+        deltas = []
+        result = converter.convert("고양이", on_delta=deltas.append)
+        self.assertEqual(result.prompt, "A cat at sunset.")
+        self.assertEqual(deltas, ["A cat", " at sunset."])
+
+        # thread_id를 주면 같은 스레드에 이어서 실행한다
+        refined = converter.convert("더 어둡게", thread_id=result.thread_id)
+        self.assertEqual(refined.thread_id, result.thread_id)
+        self.assertEqual(beta.threads.create_and_run_stream.call_count, 1)
+        self.assertEqual(beta.threads.runs.stream.call_count, 1)
+
+    def test_incomplete_run_raises(self):
+        converter, _ = self.make_converter(
+            replies={"고양이": (["A cat"], "incomplete", 0)}
+        )
+        with self.assertRaisesMessage(
+            ConversionError, "실행 상태 incomplete (rate_limit_exceeded: too many)"
+        ):
+            converter.convert("고양이")
+
+    def test_convert_many_keeps_input_order_and_captures_errors(self):
+        ideas = ["느린 아이디어", "실패하는 아이디어", "빠른 아이디어"]
+        converter, beta = self.make_converter(
+            assistants=[],
+            replies={
+                "느린 아이디어": (["slow"], "completed", 0.1),
+                "실패하는 아이디어": (["partial"], "failed", 0),
+                "빠른 아이디어": (["fast"], "completed", 0),
+            },
+        )
+        results = list(converter.convert_many(ideas, workers=3))
+
+        self.assertEqual([idea for idea, _, _ in results], ideas)
+        self.assertEqual(results[0], ("느린 아이디어", "slow", None))
+        self.assertEqual(results[2], ("빠른 아이디어", "fast", None))
+        self.assertIsNone(results[1][1])
+        self.assertIn("실행 상태 failed", results[1][2])
+        # 어시스턴트는 워커 시작 전에 한 번만 준비하고, 성공한 스레드는 지운다
+        beta.assistants.create.assert_called_once()
+        self.assertEqual(beta.threads.delete.call_count, 2)
+
+    def test_convert_many_with_no_ideas_skips_assistant(self):
+        converter, beta = self.make_converter()
+        self.assertEqual(list(converter.convert_many([])), [])
+        beta.assistants.list.assert_not_called()
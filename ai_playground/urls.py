@@ -4,6 +4,8 @@ from . import views
 app_name = 'ai_playground'
 
 urlpatterns = [
-    path('generate/', views.generate_image, name='generate_image'),
+    # /ai/generate/는 app.urls가 먼저 사용하므로 playground/ 아래에 둔다
+    path('playground/generate/', views.generate_image, name='generate_image'),
+    path('playground/generate/async/', views.agenerate_image, name='agenerate_image'),
     path('history/', views.image_history, name='image_history')
 ]
\ No newline at end of file
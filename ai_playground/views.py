@@ -1,71 +1,21 @@
-import os
-import time
-from django.shortcuts import render, redirect
+from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
-from django.conf import settings
 from django.http import JsonResponse
-from openai import AzureOpenAI
-from .models import AIImageGeneration
+from django.views.decorators.http import require_POST
 
-GPT_CLIENT = AzureOpenAI(
-    azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
-    api_key=settings.AZURE_OPENAI_API_KEY,
-    api_version=settings.AZURE_OPENAI_API_VERSION
+from util.common.generation import (
+    GenerationError,
+    agenerate_image_from_idea,
+    generate_image_from_idea,
 )
 
-DALLE_CLIENT = AzureOpenAI(
-    azure_endpoint=settings.AZURE_DALLE_ENDPOINT,
-    api_key=settings.AZURE_DALLE_API_KEY,
-    api_version=settings.AZURE_DALLE_API_VERSION
-)
+from .models import AIImageGeneration
 
-def generate_prompt_with_gpt4o(user_input):
-    """GPT-4o를 사용해 DALL-E 3 프롬프트 생성"""
-    try:
-        print("GPT-4o를 사용해 프롬프트를 생성합니다...")
-
-        response = GPT_CLIENT.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {
-                    "role": "system",
-                    "content": """You are an assistant that generates creative visual prompts for DALL-E.
+# 플레이그라운드는 게시물 작성보다 짧고 자유로운 프롬프트를 만든다
+PLAYGROUND_SYSTEM_PROMPT = """You are an assistant that generates creative visual prompts for DALL-E.
                     Provide concise, descriptive prompts suitable for generating high-quality images."""
-                },
-                {"role": "user", "content": user_input}
-            ],
-            temperature=0.7
-        )
 
-        if response.choices and len(response.choices) > 0:
-            generated_prompt = response.choices[0].message.content.strip()
-            print("생성된 프롬프트:", generated_prompt)
-            return generated_prompt
-        return None
-    
-    except Exception as e:
-        print("GPT-4o 호출 중 예외 발생:", str(e))
-        return None
-    
-def generate_image_with_dalle(prompt):
-    """DALL-E를 사용해 이미지를 생성"""
-    try:
-        print("DALL-E를 사용해 이미지를 생성합니다...")
-
-        result = DALLE_CLIENT.images.generate(
-            model="dall-e-3",
-            prompt=prompt,
-            n=1
-        )
 
-        if result and result.data:
-            return result.data[0].url
-        return None
-    
-    except Exception as e:
-        print("DALL-E 호출 중 예외 발생:", str(e))
-        return None
-    
 @login_required
 def generate_image(request):
     """이미지 생성 뷰"""
@@ -74,35 +24,54 @@ def generate_image(request):
 
         if not user_input:
             return JsonResponse({"error": "프롬프트를 입력해주세요."}, status=400)
-        
-        generated_prompt = generate_prompt_with_gpt4o(user_input)
-        if not generated_prompt:
-            return JsonResponse({"error": "프롬프트 생성에 실패했습니다."}, status=500)
-
-        generated_prompt = generate_prompt_with_gpt4o(user_input)
-        if not generated_prompt:
-            return JsonResponse({"error": "프롬프트 생성에 실패했습니다."}, status=500)
-        
-        image_url = generate_image_with_dalle(generated_prompt)
-        if not image_url:
-            return JsonResponse({"error": "이미지 생성에 실패했습니다."}, status=500)
+
+        try:
+            generated_prompt, image_url = generate_image_from_idea(
+                user_input, system_prompt=PLAYGROUND_SYSTEM_PROMPT
+            )
+        except GenerationError as e:
+            return JsonResponse({"error": str(e)}, status=500)
 
         AIImageGeneration.objects.create(
             user=request.user,
             prompt=user_input,
             generated_prompt=generated_prompt,
-            image_url=image_url
+            image_url=image_url,
+        )
+
+        return JsonResponse(
+            {"image_url": image_url, "generated_prompt": generated_prompt}
         )
 
-        return JsonResponse({
-            "image_url": image_url,
-            "generated_prompt": generated_prompt
-        })
-    
     return render(request, "ai_playground/generate_image.html")
 
+
+@login_required
+@require_POST
+async def agenerate_image(request):
+    """generate_image의 async 버전 (ASGI에서 외부 호출을 스레드 없이 기다림)"""
+    user_input = request.POST.get("prompt", "").strip()
+    if not user_input:
+        return JsonResponse({"error": "프롬프트를 입력해주세요."}, status=400)
+
+    try:
+        generated_prompt, image_url = await agenerate_image_from_idea(
+            user_input, system_prompt=PLAYGROUND_SYSTEM_PROMPT
+        )
+    except GenerationError as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
+    await AIImageGeneration.objects.acreate(
+        user=await request.auser(),
+        prompt=user_input,
+        generated_prompt=generated_prompt,
+        image_url=image_url,
+    )
+    return JsonResponse({"image_url": image_url, "generated_prompt": generated_prompt})
+
+
 @login_required
 def image_history(request):
     """사용자의 이미지 생성 히스토리 보기"""
     images = AIImageGeneration.objects.filter(user=request.user)
-    return render(request, "ai_playground/image_history.html", {"images": images})
\ No newline at end of file
+    return render(request, "ai_playground/image_history.html", {"images": images})
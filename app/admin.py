@@ -1,6 +1,16 @@
 from django.contrib import admin
 
 # Register your models here.
-from app.models import Post
+from app.models import (
+    Post,
+    GenerationAsset,
+    GenerationJob,
+    PostImageAnalysis,
+    PostCuration,
+)
 
 admin.site.register(Post)
+admin.site.register(GenerationJob)
+admin.site.register(PostImageAnalysis)
+admin.site.register(PostCuration)
+admin.site.register(GenerationAsset)
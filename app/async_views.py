@@ -0,0 +1,208 @@
+"""ASGI 서버(uvicorn 등)용 async 뷰
+
+views.py의 같은 이름 뷰에 대응하며, Azure OpenAI/Blob/Speech 호출을
+AsyncAzureOpenAI, aio Blob SDK, httpx.AsyncClient로 기다린다. 외부 응답을 기다리는
+동안 스레드를 점유하지 않으므로 워커 하나가 많은 생성 요청을 동시에 처리할 수 있다.
+(post_detail은 views.py에 async 뷰로 있다.)
+"""
+
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.decorators import login_required
+from django.http import HttpRequest, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.shortcuts import aget_object_or_404
+from django.utils.cache import get_conditional_response
+from django.views.decorators.http import require_GET, require_http_methods, require_POST
+
+from util.common.azure_speech import TTS_AUDIO_FORMATS
+from util.common.azure_storage import blob_name_from_url
+from util.common.generation import (
+    agenerate_image_with_dalle,
+    agenerate_prompt_with_gpt3o,
+    asave_image_to_blob,
+)
+from util.common.timing import StageTimer
+from util.common.tts_cache import TTS_AUDIO_FORMAT, aopen_tts_audio
+
+from .duplicates import find_duplicate_generation, index_generation_prompt
+from .jobs import SlotsUnavailable, inline_job
+from .models import Comment, GenerationAsset, GenerationJob, Post
+from .thumbnails import create_thumbnails
+from .views import (
+    _cached_audio_response,
+    comment_list_response,
+    comment_payload,
+    comment_state_aggregates,
+    comment_validators,
+    duplicate_generation_response,
+    parse_comment_cursor,
+    set_comment_validators,
+)
+
+
+@login_required
+@require_POST
+async def generate_image(request):
+    """이미지를 바로 생성해 반환 (작업 큐 없이 한 요청 안에서 프롬프트 → DALL-E → Blob 저장)
+
+    성공하면 generation_job_status의 성공 응답과 같은 generation_id를 반환하므로
+    create_post에서 그대로 사용할 수 있다. 생성은 GenerationJob으로 기록되어 워커가
+    처리하는 작업과 같은 사용자별 동시 실행 한도를 따르고, 한도 안에서 슬롯이 나지 않으면
+    429를 반환한다.
+    """
+    user = await request.auser()
+    prompt = request.POST.get("prompt", "").strip()
+    if not prompt:
+        return JsonResponse({"error": "프롬프트를 입력해주세요."}, status=400)
+
+    if not request.POST.get("force"):
+        duplicate = await sync_to_async(find_duplicate_generation)(user, prompt)
+        if duplicate:
+            return duplicate_generation_response(duplicate)
+
+    timer = StageTimer("agenerate_image")
+    try:
+        async with inline_job(user, prompt) as job:
+            with timer.stage("prompt"):
+                generated_prompt = await agenerate_prompt_with_gpt3o(prompt)
+            if not generated_prompt:
+                job.error = "프롬프트 생성에 실패했습니다."
+                return JsonResponse({"error": job.error}, status=500)
+
+            job.stage = GenerationJob.STAGE_IMAGE
+            with timer.stage("image"):
+                source_url = await agenerate_image_with_dalle(generated_prompt)
+            if not source_url:
+                job.error = "이미지 생성에 실패했습니다."
+                return JsonResponse({"error": job.error}, status=500)
+
+            job.stage = GenerationJob.STAGE_UPLOAD
+            with timer.stage("upload"):
+                image_url = await asave_image_to_blob(
+                    source_url, generated_prompt, user.id
+                )
+            if not image_url:
+                job.error = "이미지 저장에 실패했습니다."
+                return JsonResponse({"error": job.error}, status=500)
+
+            # 워커가 처리한 작업과 같이 첫 번째 후보의 ID를 작업 ID와 맞춘다
+            asset = await GenerationAsset.objects.acreate(
+                id=job.id,
+                user=user,
+                batch=job,
+                prompt=prompt,
+                generated_prompt=generated_prompt,
+                blob_name=blob_name_from_url(image_url),
+                image_url=image_url,
+            )
+            job.generated_prompt = generated_prompt
+            job.source_image_url = source_url
+            job.image_url = image_url
+            job.stage = GenerationJob.STAGE_DONE
+            job.status = GenerationJob.STATUS_SUCCEEDED
+    except SlotsUnavailable:
+        return JsonResponse(
+            {"error": "동시 생성 한도를 넘었습니다. 잠시 후 다시 시도해주세요."},
+            status=429,
+        )
+
+    try:
+        await sync_to_async(index_generation_prompt)(asset)
+    except Exception as e:
+        logging.error(f"생성 {asset.id} 프롬프트 지문 저장 실패: {str(e)}")
+
+    with timer.stage("thumbnails"):
+        try:
+            # Pillow 변환은 CPU 작업이므로 이벤트 루프 밖의 스레드에서 실행
+            asset.thumbnails = await sync_to_async(
+                create_thumbnails, thread_sensitive=False
+            )(image_url)
+            await asset.asave(update_fields=["thumbnails"])
+        except Exception as e:
+            logging.error(f"생성 {asset.id} 썸네일 생성 실패: {str(e)}")
+    timer.log()
+
+    response = JsonResponse(
+        {
+            "status": "succeeded",
+            "generation_id": str(asset.id),
+            "image_url": image_url,
+            "generated_prompt": generated_prompt,
+        }
+    )
+    response["Server-Timing"] = timer.server_timing()
+    return response
+
+
+@require_http_methods(["GET", "POST"])
+async def comment_list_create(request, post_id):
+    post = await aget_object_or_404(Post, id=post_id)
+
+    if request.method == "GET":
+        etag, count = comment_validators(
+            post,
+            await Comment.objects.filter(post=post).aaggregate(
+                **comment_state_aggregates()
+            ),
+        )
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            try:
+                after = parse_comment_cursor(request)
+            except ValueError:
+                return JsonResponse({"error": "잘못된 댓글 커서입니다."}, status=400)
+            comments = Comment.objects.filter(post=post).select_related(
+                "author", "author__profile"
+            )
+            if after is not None:
+                comments = comments.filter(id__gt=after)
+            data = [comment_payload(comment) async for comment in comments]
+            response = comment_list_response(data, count, after)
+        return set_comment_validators(response, etag)
+
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({"error": "로그인이 필요합니다."}, status=401)
+
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "잘못된 요청입니다."}, status=400)
+    message = data.get("message", "").strip()
+    if not message:
+        return JsonResponse({"error": "댓글 내용을 입력해주세요."}, status=400)
+
+    comment = await Comment.objects.acreate(post=post, author=user, message=message)
+    return JsonResponse(
+        {
+            "id": comment.id,
+            "message": comment.message,
+            "author": user.username,
+            "created_at": comment.created_at.isoformat(),
+        },
+        status=201,
+    )
+
+
+@require_GET
+async def read_text(request: HttpRequest) -> HttpResponse:
+    caption = request.GET.get("caption", "").strip()
+    if not caption:
+        return JsonResponse({"error": "캡션이 제공되지 않았습니다."}, status=400)
+    try:
+        _, content_type, extension = TTS_AUDIO_FORMATS[TTS_AUDIO_FORMAT]
+        key, path, chunks = aopen_tts_audio(caption)
+        if path is not None:
+            response = await sync_to_async(
+                _cached_audio_response, thread_sensitive=False
+            )(request, path, f'"{key}"', content_type)
+        else:
+            # 합성되는 대로 전송 (async iterator이므로 ASGI에서 스레드 없이 스트리밍)
+            response = StreamingHttpResponse(chunks, content_type=content_type)
+        response["Content-Disposition"] = f'inline; filename="caption.{extension}"'
+        return response
+    except Exception as e:
+        logging.error("read_text 에러", exc_info=True)
+        return JsonResponse({"error": str(e)}, status=500)
@@ -0,0 +1,414 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+
+from django.conf import settings
+from django.db import IntegrityError, connections
+
+from util.common.azure_openai import get_client
+
+from .embeddings import update_post_embedding
+from .models import PostCuration
+
+# 스타일 프롬프트나 시스템 프롬프트를 바꾸면 버전을 올린다.
+# 이전 버전의 큐레이션은 조회 시 무시되고, 새 버전이 저장될 때 삭제된다.
+CURATION_PROMPT_VERSION = 1
+
+# 스타일 하나의 최대 대기 시간(초). 초과한 스타일은 결과에서 빠지고 다음 조회 때 재시도
+CURATION_STYLE_TIMEOUT = getattr(settings, "CURATION_STYLE_TIMEOUT", 30)
+
+# 진행 중인 게시물별 스타일 큐레이션 생성 ((게시물 ID, 스타일) → _StyleGeneration)
+_generations_guard = threading.Lock()
+_generations = {}
+
+# 스타일별 프롬프트 설정
+STYLE_PROMPTS = {
+    "Emotional": """Explore the emotions and sentiments contained in this artwork in depth. Write lyrically, including the following elements:
+        - The main emotions and atmosphere conveyed by the work
+        - Emotional responses evoked by visual elements
+        - The special emotions given by the moment in the work
+        - Empathy and resonance that viewers can feel
+        - Lyrical characteristics and poetic expressions of the work""",
+    "Interpretive": """Analyze the meaning and artistic techniques of the work in depth. Interpret it by including the following elements:
+        - The main visual elements of the work and their symbolism
+        - The effects of composition and color sense
+        - The artist's intention and message
+        - Artistic techniques used and their effects
+        - Philosophical/conceptual meaning conveyed by the work""",
+    "Historical": """Analyze the work in depth in its historical and art historical context. Explain it by including the following elements:
+        - The historical background and characteristics of the era in which the work was produced
+        - Relationship with similar art trends or works
+        - Position and significance in modern art history
+        - Artistic/social impact of the work
+        - Interpretation of the work in its historical context""",
+    "Critical": """Provide a professional and balanced critique of the work. Evaluate it by including the following elements:
+        - Technical completeness and artistry of the work
+        - Analysis of creativity and innovation
+        - Strengths and areas for improvement
+        - Artistic achievement and limitations
+        - Uniqueness and differentiation of the work""",
+    "Narrative": """Unravel the work into an attractive story. Describe it by including the following elements:
+        - Vivid description of the scene in the work
+        - Relationship and story between the elements of appearance
+        - Flow and changes in time in the work
+        - Hidden drama and narrative in the scene
+        - Context before and after that viewers can imagine""",
+    "Trend": """Analyze the work from the perspective of contemporary art trends. Evaluate it by including the following elements:
+        - Relevance to contemporary art trends
+        - Digital/technological innovation elements
+        - Meaning in the context of modern society/culture
+        - Contact with the latest art trends
+        - Implications for future art development""",
+}
+
+
+def build_curation_input(user_prompt, captions, tags):
+    return f"프롬프트: {user_prompt}\n이미지 설명: {captions}\n태그: {tags}"
+
+
+def build_style_messages(style, combined_text):
+    return [
+        {
+            "role": "system",
+            "content": f"""You are an art curation expert. Provide a very detailed and professional analysis of the given work.
+                    {STYLE_PROMPTS[style]} The analysis should be written in a specific and persuasive manner,
+                    and should clearly reveal the characteristics and value of the work from a professional perspective.
+                    Please write a curation in Korean based on the following information.""",
+        },
+        {"role": "user", "content": combined_text},
+    ]
+
+
+def generate_style_curation(style, combined_text, timeout=CURATION_STYLE_TIMEOUT):
+    """한 스타일의 큐레이션을 생성 (실패 시 예외 발생)"""
+    response = get_client("o3").chat.completions.create(
+        model="team6-o3-mini",
+        timeout=timeout,
+        messages=build_style_messages(style, combined_text),
+    )
+    return response.choices[0].message.content
+
+
+def stream_style_curation(style, combined_text, timeout=CURATION_STYLE_TIMEOUT):
+    """한 스타일의 큐레이션을 스트리밍 API로 받아 토큰 단위로 반환"""
+    stream = get_client("o3").chat.completions.create(
+        model="team6-o3-mini",
+        timeout=timeout,
+        messages=build_style_messages(style, combined_text),
+        stream=True,
+    )
+    try:
+        for chunk in stream:
+            # Azure는 콘텐츠 필터 결과만 담긴 빈 청크를 보내기도 한다
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    finally:
+        stream.close()
+
+
+def generate_ai_curation(
+    user_prompt, captions, tags, styles=None, timeout=CURATION_STYLE_TIMEOUT
+):
+    """
+    한글로 각 스타일별 큐레이션을 동시에 생성하는 함수
+
+    모든 스타일 요청을 한 번에 보내고 timeout 안에 끝난 결과만 모은다.
+    느린 스타일이 다른 스타일의 결과를 막지 않는다.
+
+    Args:
+        user_prompt (str): 사용자 프롬프트
+        captions (str): 이미지 설명
+        tags (str): 태그들
+        styles (list): 생성할 스타일 목록 (기본값: 전체)
+        timeout (float): 스타일별 최대 대기 시간(초)
+
+    Returns:
+        tuple: (스타일별 큐레이션 딕셔너리, 스타일별 오류 메시지 딕셔너리)
+    """
+
+    combined_text = build_curation_input(user_prompt, captions, tags)
+
+    # 결과를 저장할 딕셔너리
+    curations = {}
+    errors = {}
+
+    # 모든 스타일을 동시에 요청 (요청마다 스타일 수만큼의 스레드를 따로 사용하므로
+    # 다른 요청의 생성 작업 뒤에서 기다리지 않는다)
+    styles = list(styles or STYLE_PROMPTS)
+    started = time.monotonic()
+    executor = ThreadPoolExecutor(
+        max_workers=len(styles), thread_name_prefix="curation"
+    )
+    futures = {
+        style: executor.submit(generate_style_curation, style, combined_text, timeout)
+        for style in styles
+    }
+    executor.shutdown(wait=False)
+    deadline = started + timeout
+
+    for style, future in futures.items():
+        try:
+            curations[style] = future.result(
+                timeout=max(0, deadline - time.monotonic())
+            )
+        except FuturesTimeoutError:
+            # 실행 중인 요청은 API 호출의 timeout으로 곧 끝난다
+            errors[style] = f"{style} curation timed out after {timeout}s"
+        except Exception as e:
+            errors[style] = f"Error generating {style} curation: {str(e)}"
+
+    logging.info(
+        f"큐레이션 {len(curations)}/{len(futures)}개 생성 "
+        f"({time.monotonic() - started:.2f}초)"
+    )
+    return curations, errors
+
+
+def _store_curations(post, curations):
+    for style, text in curations.items():
+        try:
+            PostCuration.objects.update_or_create(
+                post=post,
+                style=style,
+                prompt_version=CURATION_PROMPT_VERSION,
+                defaults={"text": text},
+            )
+        except IntegrityError:
+            # 다른 요청이 같은 큐레이션을 먼저 저장한 경우
+            pass
+    # 이전 프롬프트 버전의 큐레이션은 새 버전이 저장될 때 정리
+    post.curations.exclude(prompt_version=CURATION_PROMPT_VERSION).delete()
+
+
+def load_stored_curations(post):
+    """현재 프롬프트 버전으로 저장된 스타일별 큐레이션"""
+    return dict(
+        post.curations.filter(prompt_version=CURATION_PROMPT_VERSION).values_list(
+            "style", "text"
+        )
+    )
+
+
+async def aload_stored_curations(post):
+    """load_stored_curations의 비동기 버전"""
+    return {
+        style: text
+        async for style, text in post.curations.filter(
+            prompt_version=CURATION_PROMPT_VERSION
+        ).values_list("style", "text")
+    }
+
+
+def complete_post_curations(post, analysis, stored):
+    """저장된 큐레이션에 없는 스타일만 새로 생성해 채움
+
+    생성에 실패한 스타일은 저장하지 않으므로 다음 조회 때 다시 시도된다.
+
+    Returns:
+        dict: 스타일별 큐레이션 (실패한 스타일은 오류 메시지)
+    """
+    stored = dict(stored)
+    missing = [style for style in STYLE_PROMPTS if style not in stored]
+
+    errors = {}
+    if missing:
+        generated, errors = generate_ai_curation(
+            post.title, analysis.caption, analysis.tags_text, styles=missing
+        )
+        _store_curations(post, generated)
+        stored.update(generated)
+        if generated:
+            update_post_embedding(post)
+        for style, message in errors.items():
+            logging.error(f"게시물 {post.pk} 큐레이션 생성 실패: {message}")
+
+    return {
+        style: stored.get(style, errors.get(style))
+        for style in STYLE_PROMPTS
+        if style in stored or style in errors
+    }
+
+
+def get_post_curations(post, analysis):
+    """현재 프롬프트 버전의 저장된 큐레이션을 반환하고, 없는 스타일만 새로 생성"""
+    return complete_post_curations(post, analysis, load_stored_curations(post))
+
+
+class _StyleGeneration:
+    """한 게시물의 한 스타일에 대해 진행 중인 큐레이션 생성
+
+    별도 스레드에서 스트리밍 API로 끝까지 생성해 저장하고, 같은 게시물을 보는
+    요청들은 지금까지의 토큰부터 이어서 함께 받는다. 여러 명이 동시에 처음 조회해도
+    스타일마다 한 번만 생성하며, 보던 사람이 나가도 생성된 결과는 저장된다.
+    """
+
+    def __init__(self, post, style, combined_text, timeout):
+        self.post = post
+        self.style = style
+        self.combined_text = combined_text
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._history = []
+        self._subscribers = []
+        self._done = False
+        self._cancelled = False
+
+    @property
+    def key(self):
+        return (self.post.pk, self.style)
+
+    def start(self):
+        threading.Thread(
+            target=self._run,
+            name=f"curation-{self.post.pk}-{self.style}",
+            daemon=True,
+        ).start()
+
+    def _publish(self, event, value, done=False):
+        with self._lock:
+            self._history.append((event, value))
+            for events in self._subscribers:
+                events.put((event, self.style, value))
+            self._done = done
+
+    def cancel(self):
+        """생성을 취소해 결과를 저장하지 않게 함 (저장 중이면 끝날 때까지 기다림)"""
+        with self._lock:
+            self._cancelled = True
+
+    def _run(self):
+        parts = []
+        try:
+            for delta in stream_style_curation(
+                self.style, self.combined_text, self.timeout
+            ):
+                if self._cancelled:
+                    break
+                parts.append(delta)
+                self._publish("token", delta)
+            text = "".join(parts)
+            with self._lock:
+                # 취소와 저장이 겹치지 않도록 잠근 채로 확인하고 저장
+                cancelled = self._cancelled
+                if not cancelled:
+                    _store_curations(self.post, {self.style: text})
+            if cancelled:
+                self._publish(
+                    "error", f"{self.style} curation was cancelled", done=True
+                )
+            else:
+                self._publish("curation", text, done=True)
+        except Exception as e:
+            self._publish(
+                "error", f"Error generating {self.style} curation: {e}", done=True
+            )
+        finally:
+            # 저장한 뒤에 빼야 다음 요청이 저장된 큐레이션을 찾는다
+            with _generations_guard:
+                if _generations.get(self.key) is self:
+                    del _generations[self.key]
+            connections.close_all()
+
+    def subscribe(self, events):
+        """지금까지의 이벤트를 events 큐에 넣고, 이후 이벤트도 받도록 등록"""
+        with self._lock:
+            for event, value in self._history:
+                events.put((event, self.style, value))
+            if not self._done:
+                self._subscribers.append(events)
+
+    def unsubscribe(self, events):
+        with self._lock:
+            if events in self._subscribers:
+                self._subscribers.remove(events)
+
+
+def _style_generation(post, style, combined_text, timeout):
+    """진행 중인 생성이 있으면 그것을, 없으면 새로 시작한 생성을 반환"""
+    with _generations_guard:
+        generation = _generations.get((post.pk, style))
+        if generation is None:
+            generation = _StyleGeneration(post, style, combined_text, timeout)
+            _generations[generation.key] = generation
+            generation.start()
+        return generation
+
+
+def stream_post_curations(post, analysis, stored, timeout=CURATION_STYLE_TIMEOUT):
+    """저장되지 않은 스타일의 큐레이션을 동시에 스트리밍하며 (이벤트, 데이터)를 반환
+
+    같은 게시물의 스타일을 이미 생성 중이면 새로 요청하지 않고 그 결과를 함께 받는다.
+
+    이벤트 종류:
+        token: {"style", "delta"} 생성 중인 텍스트 조각
+        curation: {"style", "text"} 완성되어 저장된 큐레이션
+        error: {"style", "error"} 실패하거나 시간 초과된 스타일 (저장하지 않음)
+    """
+    missing = [style for style in STYLE_PROMPTS if style not in stored]
+    if not missing:
+        return
+
+    combined_text = build_curation_input(
+        post.title, analysis.caption, analysis.tags_text
+    )
+    events = queue.Queue()
+    generations = [
+        _style_generation(post, style, combined_text, timeout) for style in missing
+    ]
+    for generation in generations:
+        generation.subscribe(events)
+
+    pending = set(missing)
+    completed = False
+    deadline = time.monotonic() + timeout
+    try:
+        while pending:
+            try:
+                event, style, value = events.get(
+                    timeout=max(0, deadline - time.monotonic())
+                )
+            except queue.Empty:
+                break
+
+            if event == "token":
+                yield "token", {"style": style, "delta": value}
+            elif event == "curation":
+                pending.discard(style)
+                completed = True
+                yield "curation", {"style": style, "text": value}
+            else:
+                pending.discard(style)
+                logging.error(f"게시물 {post.pk} 큐레이션 생성 실패: {value}")
+                yield "error", {"style": style, "error": value}
+    finally:
+        # 시간이 초과되었거나 클라이언트 연결이 끊겨도 생성은 끝까지 진행되어 저장된다
+        for generation in generations:
+            generation.unsubscribe(events)
+
+    for style in pending:
+        message = f"{style} curation timed out after {timeout}s"
+        logging.error(f"게시물 {post.pk} 큐레이션 생성 실패: {message}")
+        yield "error", {"style": style, "error": message}
+
+    if completed:
+        # 큐레이션이 추가되었으므로 유사 작품 검색용 임베딩 갱신
+        update_post_embedding(post)
+
+
+def regenerate_post_curations(post):
+    """게시물의 큐레이션을 모두 지움
+
+    진행 중인 생성은 취소해 이전 결과가 지운 뒤에 다시 저장되지 않게 하고,
+    다음 조회가 합류하지 않도록 목록에서 뺀다. 새 큐레이션은 게시물 상세 페이지가
+    curation_stream으로 받아 생성하므로 요청 안에서 기다리지 않는다.
+    """
+    with _generations_guard:
+        in_flight = [
+            _generations.pop(key) for key in list(_generations) if key[0] == post.pk
+        ]
+    for generation in in_flight:
+        generation.cancel()
+    post.curations.all().delete()
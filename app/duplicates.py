@@ -0,0 +1,101 @@
+"""같은 사용자의 유사 중복 프롬프트 탐지
+
+생성이 끝난 이미지(GenerationAsset)마다 프롬프트의 MinHash 서명과 LSH 버킷을 저장해두고,
+새 프롬프트는 (user, bucket) 인덱스로 후보만 찾아 서명을 비교한다.
+후보 조회가 인덱스 검색 몇 번이므로 행 수가 많아도 수 밀리초 안에 끝난다.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from util.common.minhash import (
+    band_hashes,
+    estimate_similarity,
+    signature,
+    signature_from_bytes,
+    signature_to_bytes,
+)
+
+from .models import PromptFingerprint, PromptLSHBucket
+
+# 이 값 이상이면 중복으로 보고 재사용을 제안 (자카드 유사도 추정값)
+DUPLICATE_PROMPT_THRESHOLD = getattr(settings, "DUPLICATE_PROMPT_THRESHOLD", 0.8)
+# 이 기간 안에 생성된 이미지만 재사용 대상으로 봄
+DUPLICATE_PROMPT_LOOKBACK_DAYS = getattr(settings, "DUPLICATE_PROMPT_LOOKBACK_DAYS", 30)
+# 비교할 최대 후보 수
+DUPLICATE_MAX_CANDIDATES = 50
+
+
+def index_generation_prompt(asset):
+    """생성 이미지의 프롬프트 지문을 저장 (이미 있으면 교체)"""
+    sig = signature(asset.prompt)
+    if sig is None:
+        return None
+    with transaction.atomic():
+        fingerprint, _ = PromptFingerprint.objects.update_or_create(
+            asset=asset,
+            defaults={"user_id": asset.user_id, "signature": signature_to_bytes(sig)},
+        )
+        fingerprint.buckets.all().delete()
+        PromptLSHBucket.objects.bulk_create(
+            PromptLSHBucket(
+                fingerprint=fingerprint, user_id=asset.user_id, band=band, bucket=bucket
+            )
+            for band, bucket in enumerate(band_hashes(sig))
+        )
+    return fingerprint
+
+
+def find_duplicate_generation(user, prompt):
+    """같은 사용자가 최근에 생성한 이미지 중 프롬프트가 거의 같은 것 (없으면 None)
+
+    반환된 에셋에는 similarity(추정 유사도)가 추가된다.
+    """
+    sig = signature(prompt)
+    if sig is None:
+        return None
+
+    buckets = band_hashes(sig)
+    since = timezone.now() - timedelta(days=DUPLICATE_PROMPT_LOOKBACK_DAYS)
+    candidate_ids = set()
+    # 64비트 해시라 밴드가 달라도 값이 겹칠 일은 거의 없으므로 (user, bucket)으로 찾고
+    # 밴드 번호는 가져온 뒤 확인한다. 기간이 지난 지문은 조회 단계에서 빼고
+    # 최근 것부터 세어야 오래된 후보가 한도를 채워 최근 중복을 가리지 않는다.
+    for fingerprint_id, band, bucket in (
+        PromptLSHBucket.objects.filter(
+            user=user, bucket__in=buckets, fingerprint__created_at__gte=since
+        )
+        .order_by("-fingerprint__created_at")
+        .values_list("fingerprint_id", "band", "bucket")
+    ):
+        if buckets[band] == bucket:
+            candidate_ids.add(fingerprint_id)
+            if len(candidate_ids) >= DUPLICATE_MAX_CANDIDATES:
+                break
+
+    candidates = PromptFingerprint.objects.filter(
+        asset_id__in=candidate_ids
+    ).select_related("asset")
+
+    best, best_score = None, 0.0
+    for fingerprint in candidates:
+        score = estimate_similarity(sig, signature_from_bytes(fingerprint.signature))
+        if score > best_score or (
+            score == best_score
+            and best is not None
+            and fingerprint.created_at > best.created_at
+        ):
+            best, best_score = fingerprint, score
+
+    if best is None or best_score < DUPLICATE_PROMPT_THRESHOLD:
+        return None
+    logging.info(
+        f"유사 프롬프트 발견: 사용자 {user.pk}, 에셋 {best.asset_id} (유사도 {best_score:.2f})"
+    )
+    asset = best.asset
+    asset.similarity = best_score
+    return asset
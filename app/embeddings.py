@@ -0,0 +1,243 @@
+"""게시물 임베딩 저장과 유사 작품 검색
+
+임베딩은 게시물 작성과 큐레이션 생성 시점에만 계산해 PostEmbedding에 저장하고,
+검색 때는 프로세스 메모리의 EmbeddingIndex(NumPy 행렬)로 코사인 유사도를 구한다.
+인덱스는 마지막 갱신 이후 바뀐 행만 읽어 증분 갱신한다. 검색 중인 요청이 보고 있는
+행렬은 바꾸지 않고, 갱신할 때마다 새 행렬을 만들어 교체한다.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+
+from util.common.embeddings import (
+    EMBEDDING_DEPLOYMENT,
+    embed_query,
+    embed_texts,
+    vector_from_bytes,
+    vector_to_bytes,
+)
+
+from .models import PostEmbedding
+
+# 임베딩에 넣을 텍스트 최대 길이 (큐레이션이 길어 토큰 한도를 넘지 않도록 자름)
+EMBEDDING_MAX_CHARS = getattr(settings, "EMBEDDING_MAX_CHARS", 6000)
+# 인덱스를 DB와 비교해 갱신하는 최소 간격(초)
+EMBEDDING_INDEX_REFRESH_INTERVAL = getattr(
+    settings, "EMBEDDING_INDEX_REFRESH_INTERVAL", 5
+)
+# 증분 갱신 시 마지막으로 본 updated_at보다 이만큼(초) 앞부터 다시 읽는다.
+# updated_at은 저장 시점의 시각이라, 늦게 커밋된 트랜잭션의 행을 놓치지 않도록 겹쳐 읽는다.
+EMBEDDING_INDEX_SYNC_OVERLAP = getattr(settings, "EMBEDDING_INDEX_SYNC_OVERLAP", 60)
+
+
+def build_embedding_text(post, curations=None):
+    """생성 프롬프트, 제목, 이미지 캡션/태그, 큐레이션을 이어 붙인 임베딩 입력"""
+    parts = [post.title, post.generated_prompt or ""]
+    try:
+        analysis = post.image_analysis
+        parts += [analysis.caption, analysis.tags_text]
+    except type(post).image_analysis.RelatedObjectDoesNotExist:
+        pass
+    if curations is None:
+        # curation 모듈이 이 모듈을 가져오므로 순환 import를 피해 여기서 가져온다
+        from .curation import load_stored_curations
+
+        # 이전 프롬프트 버전의 큐레이션은 화면에 보이지 않으므로 임베딩에서도 제외
+        curations = load_stored_curations(post)
+    parts += [curations[style] for style in sorted(curations)]
+    return "\n".join(part for part in parts if part)[:EMBEDDING_MAX_CHARS]
+
+
+def update_post_embedding(post, curations=None, force=False):
+    """게시물 임베딩을 계산해 저장 (입력 텍스트가 그대로면 건너뜀, 실패 시 None)"""
+    text = build_embedding_text(post, curations)
+    source_hash = hashlib.sha256(
+        f"{EMBEDDING_DEPLOYMENT}\x1f{text}".encode("utf-8")
+    ).hexdigest()
+    existing = PostEmbedding.objects.filter(post=post).first()
+    if existing and existing.source_hash == source_hash and not force:
+        return existing
+
+    try:
+        vector = embed_texts([text])[0]
+    except Exception as e:
+        logging.error(f"게시물 {post.pk} 임베딩 생성 실패: {str(e)}")
+        return None
+
+    embedding, _ = PostEmbedding.objects.update_or_create(
+        post=post,
+        defaults={
+            "model": EMBEDDING_DEPLOYMENT,
+            "dimensions": vector.shape[0],
+            "vector": vector_to_bytes(vector),
+            "source_hash": source_hash,
+        },
+    )
+    return embedding
+
+
+class EmbeddingIndex:
+    """게시물 임베딩을 (n, d) float32 행렬로 들고 있는 인메모리 검색 인덱스"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = np.empty(0, dtype=np.int64)
+        self._matrix = np.empty((0, 0), dtype=np.float32)
+        self._positions = {}
+        self._synced_until = None
+        self._checked_at = 0.0
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _rows(self, queryset):
+        return queryset.filter(model=EMBEDDING_DEPLOYMENT).values_list(
+            "post_id", "vector", "updated_at"
+        )
+
+    def _rebuild(self):
+        ids, vectors, synced_until = [], [], None
+        for post_id, vector, updated_at in self._rows(PostEmbedding.objects.all()):
+            ids.append(post_id)
+            vectors.append(vector_from_bytes(vector))
+            synced_until = max(synced_until or updated_at, updated_at)
+        self._ids = np.array(ids, dtype=np.int64)
+        self._matrix = (
+            np.vstack(vectors) if vectors else np.empty((0, 0), dtype=np.float32)
+        )
+        self._positions = {post_id: row for row, post_id in enumerate(ids)}
+        self._synced_until = synced_until
+
+    def _apply_changes(self):
+        since = self._synced_until - timedelta(seconds=EMBEDDING_INDEX_SYNC_OVERLAP)
+        changed = self._rows(PostEmbedding.objects.filter(updated_at__gte=since))
+        ids, matrix, positions = self._ids, self._matrix, self._positions
+        new_ids, new_vectors, updates = [], [], {}
+        synced_until = self._synced_until
+        for post_id, vector, updated_at in changed:
+            vector = vector_from_bytes(vector)
+            if vector.shape[0] != matrix.shape[1]:
+                # 차원이 바뀌면(모델 변경) 증분 갱신할 수 없음
+                return False
+            row = positions.get(post_id)
+            if row is None:
+                new_ids.append(post_id)
+                new_vectors.append(vector)
+            else:
+                updates[row] = vector
+            synced_until = max(synced_until, updated_at)
+
+        if updates or new_ids:
+            # search()가 가져간 행렬은 그대로 두고 새 행렬로 교체
+            matrix = np.vstack([matrix, *new_vectors])
+            for row, vector in updates.items():
+                matrix[row] = vector
+            if new_ids:
+                positions = dict(positions)
+                for offset, post_id in enumerate(new_ids):
+                    positions[post_id] = len(ids) + offset
+                ids = np.concatenate([ids, np.array(new_ids, np.int64)])
+            self._ids, self._matrix, self._positions = ids, matrix, positions
+        self._synced_until = synced_until
+        return True
+
+    def refresh(self, force=False):
+        """DB에서 바뀐 임베딩만 읽어 인덱스에 반영 (삭제가 있으면 전체 재구성)"""
+        now = time.monotonic()
+        if not force and now - self._checked_at < EMBEDDING_INDEX_REFRESH_INTERVAL:
+            return
+        with self._lock:
+            self._checked_at = now
+            if self._synced_until is None or not self._apply_changes():
+                self._rebuild()
+            elif (
+                len(self._ids)
+                != PostEmbedding.objects.filter(model=EMBEDDING_DEPLOYMENT).count()
+            ):
+                self._rebuild()
+
+    def vector_for(self, post_id):
+        row = self._positions.get(post_id)
+        return None if row is None else self._matrix[row]
+
+    def search(self, vector, limit, exclude_ids=(), include_ids=None):
+        """코사인 유사도가 높은 순으로 (게시물 ID, 점수) 목록 반환
+
+        include_ids를 주면 그 게시물만 후보로 삼는다 (조회 조건은 순위를 매기기 전에 적용).
+        """
+        with self._lock:
+            ids, matrix = self._ids, self._matrix
+        if not len(ids):
+            return []
+        scores = matrix @ np.asarray(vector, dtype=np.float32)
+        if include_ids is not None:
+            scores[~np.isin(ids, list(include_ids))] = -np.inf
+        if exclude_ids:
+            scores[np.isin(ids, list(exclude_ids))] = -np.inf
+        limit = min(limit, len(ids))
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top])]
+        return [
+            (int(ids[row]), float(scores[row]))
+            for row in top
+            if np.isfinite(scores[row])
+        ]
+
+
+_index = EmbeddingIndex()
+
+
+def get_embedding_index():
+    _index.refresh()
+    return _index
+
+
+def _visible_ids(queryset):
+    return set(queryset.values_list("id", flat=True))
+
+
+def _rank_posts(queryset, scored, limit):
+    """유사도 순서를 유지하면서 게시물 객체로 변환 (그 사이 삭제된 게시물은 제외)"""
+    posts = queryset.in_bulk([post_id for post_id, _ in scored])
+    ranked = []
+    for post_id, score in scored:
+        post = posts.get(post_id)
+        if post is None:
+            continue
+        post.similarity = score
+        ranked.append(post)
+        if len(ranked) >= limit:
+            break
+    return ranked
+
+
+def similar_posts(post, queryset, limit=6):
+    """저장된 임베딩 기준으로 비슷한 게시물 (쿼리 시 임베딩을 계산하지 않음)"""
+    index = get_embedding_index()
+    vector = index.vector_for(post.pk)
+    if vector is None:
+        embedding = PostEmbedding.objects.filter(
+            post=post, model=EMBEDDING_DEPLOYMENT
+        ).first()
+        if embedding is None:
+            return []
+        vector = vector_from_bytes(embedding.vector)
+    # 전체 상위 몇 개를 고른 뒤 거르면 비공개 게시물 등이 빠져 결과가 모자라므로
+    # 조회 조건을 통과한 게시물 안에서만 순위를 매긴다
+    scored = index.search(
+        vector, limit, exclude_ids={post.pk}, include_ids=_visible_ids(queryset)
+    )
+    return _rank_posts(queryset, scored, limit)
+
+
+def semantic_search(queryset, query, limit):
+    """검색어 임베딩과 비슷한 게시물 (의미 검색 갤러리 모드)"""
+    index = get_embedding_index()
+    scored = index.search(embed_query(query), limit, include_ids=_visible_ids(queryset))
+    return _rank_posts(queryset, scored, limit)
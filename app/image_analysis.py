@@ -0,0 +1,90 @@
+import asyncio
+import logging
+from contextlib import nullcontext
+
+from asgiref.sync import sync_to_async
+
+from util.common.azure_computer_vision import (
+    describe_image_captions,
+    get_image_caption_and_tags,
+    tag_image_tags,
+)
+
+from .models import PostImageAnalysis
+
+
+def save_image_analysis(post, captions, tags):
+    analysis, _ = PostImageAnalysis.objects.update_or_create(
+        post=post,
+        defaults={"image_url": post.image, "captions": captions, "tags": tags},
+    )
+    logging.info(f"게시물 {post.pk}의 이미지 분석 결과가 저장되었습니다.")
+    return analysis
+
+
+def analyze_post_image(post):
+    """Computer Vision으로 게시물 이미지를 분석하고 결과를 저장"""
+    captions, tags = get_image_caption_and_tags(post.image)
+    return save_image_analysis(post, captions, tags)
+
+
+def get_stored_image_analysis(post):
+    """이미지가 바뀌지 않은 경우에만 저장된 분석 결과를 반환"""
+    try:
+        analysis = post.image_analysis
+    except PostImageAnalysis.DoesNotExist:
+        return None
+    if analysis.image_url != post.image:
+        return None
+    return analysis
+
+
+async def aget_post_image_analysis(post, timer=None):
+    """get_post_image_analysis의 비동기 버전
+
+    분석이 필요하면 describe_image와 tag_image를 동시에 호출한다.
+    post.image_analysis는 select_related로 미리 불러와 있어야 한다.
+    """
+    if not post.image:
+        return None
+
+    analysis = get_stored_image_analysis(post)
+    if analysis is not None:
+        return analysis
+
+    async def run(stage, func):
+        with timer.stage(stage) if timer else nullcontext():
+            return await sync_to_async(func, thread_sensitive=False)(post.image)
+
+    try:
+        captions, tags = await asyncio.gather(
+            run("cv_describe", describe_image_captions),
+            run("cv_tag", tag_image_tags),
+        )
+        return await sync_to_async(save_image_analysis)(post, captions, tags)
+    except Exception as e:
+        logging.error(
+            f"게시물 {post.pk} 이미지 분석 중 오류 발생: {str(e)}", exc_info=True
+        )
+        return None
+
+
+def get_post_image_analysis(post):
+    """저장된 이미지 분석 결과를 반환하고, 없거나 이미지가 바뀐 경우에만 새로 분석
+
+    분석에 실패하면 None을 반환한다.
+    """
+    if not post.image:
+        return None
+
+    analysis = get_stored_image_analysis(post)
+    if analysis is not None:
+        return analysis
+
+    try:
+        return analyze_post_image(post)
+    except Exception as e:
+        logging.error(
+            f"게시물 {post.pk} 이미지 분석 중 오류 발생: {str(e)}", exc_info=True
+        )
+        return None
@@ -0,0 +1,356 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+
+from util.common.azure_storage import blob_name_from_url
+from util.common.generation import (
+    generate_image_with_dalle,
+    generate_prompt_with_gpt3o,
+    save_image_to_blob,
+)
+
+from .duplicates import index_generation_prompt
+from .models import GenerationAsset, GenerationJob
+from .thumbnails import create_thumbnails
+
+# 워커가 죽어 RUNNING 상태로 남은 작업을 다시 대기열에 넣기까지의 시간(초)
+STALE_JOB_TIMEOUT = getattr(settings, "GENERATION_JOB_STALE_TIMEOUT", 300)
+# 같은 작업을 재시도할 최대 횟수
+MAX_JOB_ATTEMPTS = getattr(settings, "GENERATION_JOB_MAX_ATTEMPTS", 2)
+# 한 작업에서 만들 수 있는 최대 이미지 후보 수
+MAX_BATCH_CANDIDATES = getattr(settings, "GENERATION_MAX_BATCH_CANDIDATES", 4)
+# 사용자 한 명이 동시에 보낼 수 있는 DALL-E/업로드 호출 수 (워커 전체 기준)
+USER_MAX_CONCURRENCY = getattr(settings, "GENERATION_USER_MAX_CONCURRENCY", 4)
+# 동시 실행 슬롯을 기다리는 최대 시간(초). 넘으면 작업을 대기열로 되돌린다
+SLOT_WAIT_TIMEOUT = getattr(settings, "GENERATION_SLOT_WAIT_TIMEOUT", 60)
+# 슬롯을 얻지 못해 되돌린 작업을 다시 가져가기까지의 기본 대기 시간(초). 되돌릴 때마다 늘어난다
+SLOT_RETRY_DELAY = getattr(settings, "GENERATION_SLOT_RETRY_DELAY", 30)
+# 슬롯을 얻지 못해 대기열로 되돌릴 수 있는 최대 횟수. 넘으면 실패 처리
+MAX_SLOT_WAITS = getattr(settings, "GENERATION_MAX_SLOT_WAITS", 5)
+# 동시 실행 슬롯이 비기를 기다리는 간격(초)
+_SLOT_POLL_INTERVAL = 0.5
+
+
+class StageError(Exception):
+    """파이프라인 단계 실패"""
+
+
+class SlotsUnavailable(Exception):
+    """사용자의 동시 실행 슬롯이 제한 시간 안에 비지 않음"""
+
+
+def default_worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim_next_job(worker_name):
+    """대기 중인 작업 하나를 원자적으로 가져와 RUNNING 상태로 변경
+
+    PostgreSQL에서는 SKIP LOCKED로 다른 워커가 잡고 있는 행을 건너뛰고,
+    조건부 UPDATE로 한 작업이 두 워커에 동시에 할당되지 않도록 보장한다.
+    시도 횟수도 같은 UPDATE에서 올려, 가져온 직후 워커가 죽어도 횟수가 빠지지 않는다.
+    슬롯을 기다리다 되돌아간 작업은 available_at이 지날 때까지 건너뛴다.
+    """
+    while True:
+        with transaction.atomic():
+            now = timezone.now()
+            job_id = (
+                GenerationJob.objects.select_for_update(skip_locked=True)
+                .filter(status=GenerationJob.STATUS_PENDING)
+                .filter(Q(available_at__isnull=True) | Q(available_at__lte=now))
+                .order_by("created_at")
+                .values_list("id", flat=True)
+                .first()
+            )
+            if job_id is None:
+                return None
+
+            claimed = GenerationJob.objects.filter(
+                id=job_id, status=GenerationJob.STATUS_PENDING
+            ).update(
+                status=GenerationJob.STATUS_RUNNING,
+                worker=worker_name,
+                started_at=now,
+                updated_at=now,
+                attempts=F("attempts") + 1,
+            )
+        if claimed:
+            return GenerationJob.objects.get(id=job_id)
+
+
+def requeue_stale_jobs():
+    """응답이 없는 워커에 할당된 작업을 다시 대기열에 넣거나 실패 처리"""
+    cutoff = timezone.now() - timedelta(seconds=STALE_JOB_TIMEOUT)
+    stale = GenerationJob.objects.filter(
+        status=GenerationJob.STATUS_RUNNING, updated_at__lt=cutoff
+    )
+    failed = stale.filter(attempts__gte=MAX_JOB_ATTEMPTS).update(
+        status=GenerationJob.STATUS_FAILED,
+        error="작업 시간이 초과되었습니다.",
+        finished_at=timezone.now(),
+    )
+    requeued = stale.filter(attempts__lt=MAX_JOB_ATTEMPTS).update(
+        status=GenerationJob.STATUS_PENDING, worker=""
+    )
+    if failed or requeued:
+        logging.warning(f"정지된 생성 작업 처리: 재시도 {requeued}건, 실패 {failed}건")
+    return requeued
+
+
+def _enter_stage(job, stage):
+    job.stage = stage
+    job.save(update_fields=["stage", "updated_at"])
+
+
+def _record_stage(job, stage, started):
+    job.stage_timings[stage] = round(time.monotonic() - started, 3)
+
+
+def _try_acquire_user_slots(job, wanted):
+    with transaction.atomic():
+        # 같은 사용자의 슬롯 계산이 워커 사이에서 겹치지 않도록 사용자 행을 잠근다
+        list(User.objects.select_for_update().filter(pk=job.user_id).values("pk"))
+        in_use = (
+            GenerationJob.objects.filter(
+                user_id=job.user_id, status=GenerationJob.STATUS_RUNNING
+            )
+            .exclude(id=job.id)
+            .aggregate(total=Sum("concurrency"))["total"]
+            or 0
+        )
+        granted = min(wanted, USER_MAX_CONCURRENCY - in_use)
+        if granted <= 0:
+            return 0
+        job.concurrency = granted
+        GenerationJob.objects.filter(id=job.id).update(
+            concurrency=granted, updated_at=timezone.now()
+        )
+        return granted
+
+
+def acquire_user_slots(job, wanted):
+    """사용자의 동시 실행 슬롯을 최대 wanted개 확보해 그 수를 반환
+
+    실행 중인 같은 사용자 작업의 concurrency 합으로 한도를 계산하므로 모든 워커에
+    적용되고, 워커가 죽어 작업이 다시 대기열에 들어가면 슬롯도 함께 풀린다.
+    하나도 없으면 작업의 updated_at을 갱신하며(정지된 작업으로 보지 않도록) 기다리고,
+    SLOT_WAIT_TIMEOUT이 지나면 SlotsUnavailable을 발생시킨다.
+    """
+    deadline = time.monotonic() + SLOT_WAIT_TIMEOUT
+    while True:
+        granted = _try_acquire_user_slots(job, wanted)
+        if granted:
+            return granted
+        if time.monotonic() >= deadline:
+            raise SlotsUnavailable(f"사용자 {job.user_id}의 동시 실행 한도 초과")
+        GenerationJob.objects.filter(id=job.id).update(updated_at=timezone.now())
+        time.sleep(_SLOT_POLL_INTERVAL)
+
+
+async def aacquire_user_slots(job, wanted):
+    """acquire_user_slots의 비동기 버전 (기다리는 동안 이벤트 루프를 막지 않음)"""
+    deadline = time.monotonic() + SLOT_WAIT_TIMEOUT
+    while True:
+        granted = await sync_to_async(_try_acquire_user_slots)(job, wanted)
+        if granted:
+            return granted
+        if time.monotonic() >= deadline:
+            raise SlotsUnavailable(f"사용자 {job.user_id}의 동시 실행 한도 초과")
+        await GenerationJob.objects.filter(id=job.id).aupdate(updated_at=timezone.now())
+        await asyncio.sleep(_SLOT_POLL_INTERVAL)
+
+
+@asynccontextmanager
+async def inline_job(user, prompt):
+    """async 뷰가 요청 안에서 직접 실행하는 생성을 GenerationJob으로 기록하고 슬롯 하나를 점유
+
+    워커가 처리하는 작업과 같은 사용자별 동시 실행 한도를 적용한다. 블록 안에서
+    status를 STATUS_SUCCEEDED로 바꾸지 않고 끝나면 실패로 기록하고, 어느 경우든
+    슬롯을 돌려준다. 프로세스가 죽어 정지된 작업을 워커가 다시 실행하지 않도록
+    시도 횟수를 최대로 두어 재시도 대신 실패 처리되게 한다.
+    """
+    job = await GenerationJob.objects.acreate(
+        user=user,
+        prompt=prompt,
+        status=GenerationJob.STATUS_RUNNING,
+        stage=GenerationJob.STAGE_PROMPT,
+        worker=f"asgi:{default_worker_name()}",
+        attempts=MAX_JOB_ATTEMPTS,
+        started_at=timezone.now(),
+    )
+    try:
+        await aacquire_user_slots(job, 1)
+        yield job
+    except SlotsUnavailable as e:
+        job.error = str(e)
+        raise
+    finally:
+        if job.status != GenerationJob.STATUS_SUCCEEDED:
+            job.status = GenerationJob.STATUS_FAILED
+            job.error = job.error or "이미지 생성이 중단되었습니다."
+        job.concurrency = 0
+        job.finished_at = timezone.now()
+        await job.asave()
+
+
+def _requeue_job(job):
+    """실패로 처리하지 않고 대기열로 되돌림 (이번 시도는 횟수에서 제외)
+
+    바로 다시 가져가 워커를 붙잡지 않도록, 되돌린 횟수만큼 늘어나는 시간 동안은
+    다른 작업을 먼저 처리한다.
+    """
+    now = timezone.now()
+    GenerationJob.objects.filter(id=job.id).update(
+        status=GenerationJob.STATUS_PENDING,
+        stage=GenerationJob.STAGE_QUEUED,
+        worker="",
+        concurrency=0,
+        attempts=F("attempts") - 1,
+        slot_waits=F("slot_waits") + 1,
+        available_at=now + timedelta(seconds=SLOT_RETRY_DELAY * (job.slot_waits + 1)),
+        updated_at=now,
+    )
+    job.refresh_from_db()
+
+
+def _map_concurrently(func, items, max_workers):
+    """items마다 func을 최대 max_workers개 스레드로 동시에 실행 (순서 유지)"""
+    if max_workers <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+    with ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="generation"
+    ) as executor:
+        return list(executor.map(func, items))
+
+
+def _create_candidate_assets(job, image_urls):
+    """저장된 후보 이미지를 GenerationAsset으로 등록 (첫 번째 후보의 ID는 작업 ID)"""
+    # 재시도 중이면 이전 시도에서 만든 나머지 후보를 지우고 새로 등록
+    GenerationAsset.objects.filter(batch=job).exclude(id=job.id).delete()
+    assets = []
+    for index, image_url in enumerate(image_urls):
+        defaults = {
+            "user_id": job.user_id,
+            "batch": job,
+            "prompt": job.prompt,
+            "generated_prompt": job.generated_prompt,
+            "blob_name": blob_name_from_url(image_url),
+            "image_url": image_url,
+        }
+        if index == 0:
+            asset, _ = GenerationAsset.objects.update_or_create(
+                id=job.id, defaults=defaults
+            )
+        else:
+            asset = GenerationAsset.objects.create(id=uuid.uuid4(), **defaults)
+        assets.append(asset)
+    return assets
+
+
+def _create_asset_thumbnails(asset):
+    try:
+        asset.thumbnails = create_thumbnails(asset.image_url)
+    except Exception as e:
+        # 썸네일이 없어도 원본 이미지로 표시할 수 있으므로 작업은 성공 처리
+        logging.error(f"생성 이미지 {asset.id} 썸네일 생성 실패: {str(e)}")
+    return asset
+
+
+def run_job(job):
+    """생성 파이프라인(프롬프트 → DALL-E → Blob 저장 → 썸네일)을 단계별로 실행
+
+    프롬프트는 한 번만 만들고, 후보가 여러 개면 DALL-E 호출과 업로드를 사용자별
+    동시 실행 한도 안에서 병렬로 처리한다. 저장이 끝나면 후보마다 GenerationAsset을
+    등록해 게시물 작성 시 재사용한다.
+    """
+    try:
+        if not job.generated_prompt:
+            _enter_stage(job, GenerationJob.STAGE_PROMPT)
+            started = time.monotonic()
+            job.generated_prompt = generate_prompt_with_gpt3o(job.prompt)
+            _record_stage(job, GenerationJob.STAGE_PROMPT, started)
+            if not job.generated_prompt:
+                raise StageError("프롬프트 생성에 실패했습니다.")
+            job.save(update_fields=["generated_prompt", "stage_timings", "updated_at"])
+
+        candidate_count = max(1, min(job.candidate_count, MAX_BATCH_CANDIDATES))
+        concurrency = acquire_user_slots(job, candidate_count)
+
+        _enter_stage(job, GenerationJob.STAGE_IMAGE)
+        started = time.monotonic()
+        # DALL-E 3는 요청당 n=1만 지원하므로 후보 수만큼 동시에 호출
+        source_urls = _map_concurrently(
+            generate_image_with_dalle,
+            [job.generated_prompt] * candidate_count,
+            concurrency,
+        )
+        source_urls = [url for url in source_urls if url]
+        _record_stage(job, GenerationJob.STAGE_IMAGE, started)
+        if not source_urls:
+            raise StageError("이미지 생성에 실패했습니다.")
+        job.source_image_url = source_urls[0]
+        job.save(update_fields=["source_image_url", "stage_timings", "updated_at"])
+
+        _enter_stage(job, GenerationJob.STAGE_UPLOAD)
+        started = time.monotonic()
+        image_urls = _map_concurrently(
+            lambda url: save_image_to_blob(url, job.generated_prompt, job.user_id),
+            source_urls,
+            concurrency,
+        )
+        image_urls = [url for url in image_urls if url]
+        _record_stage(job, GenerationJob.STAGE_UPLOAD, started)
+        if not image_urls:
+            raise StageError("이미지 저장에 실패했습니다.")
+        job.image_url = image_urls[0]
+        assets = _create_candidate_assets(job, image_urls)
+        try:
+            # 후보들은 프롬프트가 같으므로 첫 번째 후보만 중복 탐지에 등록
+            index_generation_prompt(assets[0])
+        except Exception as e:
+            logging.error(f"생성 작업 {job.id} 프롬프트 지문 저장 실패: {str(e)}")
+
+        _enter_stage(job, GenerationJob.STAGE_THUMBNAILS)
+        started = time.monotonic()
+        for asset in _map_concurrently(_create_asset_thumbnails, assets, concurrency):
+            if asset.thumbnails:
+                asset.save(update_fields=["thumbnails"])
+        _record_stage(job, GenerationJob.STAGE_THUMBNAILS, started)
+
+        job.stage = GenerationJob.STAGE_DONE
+        job.status = GenerationJob.STATUS_SUCCEEDED
+    except SlotsUnavailable as e:
+        if job.slot_waits < MAX_SLOT_WAITS:
+            logging.warning(f"생성 작업 {job.id} 대기열로 되돌림: {str(e)}")
+            _requeue_job(job)
+            return job
+        logging.error(f"생성 작업 {job.id} 실패: {str(e)}")
+        job.status = GenerationJob.STATUS_FAILED
+        job.error = (
+            "요청이 많아 이미지를 생성하지 못했습니다. 잠시 후 다시 시도해주세요."
+        )
+    except Exception as e:
+        logging.error(f"생성 작업 {job.id} 실패: {str(e)}", exc_info=True)
+        job.status = GenerationJob.STATUS_FAILED
+        job.error = str(e)
+
+    job.concurrency = 0
+    job.finished_at = timezone.now()
+    job.save()
+    logging.info(
+        f"생성 작업 {job.id} 종료: {job.status} (단계별 시간: {job.stage_timings})"
+    )
+    return job
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from app.embeddings import update_post_embedding
+from app.models import Post
+
+
+class Command(BaseCommand):
+    help = "임베딩이 없는 기존 게시물의 유사 작품 검색용 임베딩을 계산해 저장합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit", type=int, default=0, help="처리할 최대 게시물 수 (0이면 전체)"
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="이미 임베딩이 있는 게시물도 다시 계산",
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.select_related("image_analysis").defer("search_vector")
+        if not options["force"]:
+            posts = posts.filter(embedding__isnull=True)
+        posts = posts.order_by("pk")
+        if options["limit"]:
+            posts = posts[: options["limit"]]
+
+        done = failed = 0
+        for post in posts.iterator():
+            if update_post_embedding(post, force=options["force"]):
+                done += 1
+            else:
+                failed += 1
+                self.stderr.write(f"게시물 {post.pk} 임베딩 생성 실패")
+
+        self.stdout.write(f"임베딩 생성 완료: 성공 {done}건, 실패 {failed}건")
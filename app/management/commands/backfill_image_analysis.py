@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from app.image_analysis import analyze_post_image
+from app.models import Post
+
+
+class Command(BaseCommand):
+    help = "이미지 분석 결과(캡션, 태그)가 없는 기존 게시물을 분석해 저장합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit", type=int, default=0, help="처리할 최대 게시물 수 (0이면 전체)"
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="이미 분석 결과가 있는 게시물도 다시 분석",
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image__isnull=True).exclude(image="")
+        if not options["force"]:
+            posts = posts.filter(image_analysis__isnull=True)
+        posts = posts.order_by("pk")
+        if options["limit"]:
+            posts = posts[: options["limit"]]
+
+        done = failed = 0
+        for post in posts.iterator():
+            try:
+                analyze_post_image(post)
+                done += 1
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f"게시물 {post.pk} 분석 실패: {str(e)}")
+
+        self.stdout.write(f"이미지 분석 완료: 성공 {done}건, 실패 {failed}건")
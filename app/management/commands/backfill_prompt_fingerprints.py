@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from app.duplicates import index_generation_prompt
+from app.models import GenerationAsset
+
+
+class Command(BaseCommand):
+    help = "지문이 없는 생성 이미지의 프롬프트 MinHash 지문과 LSH 버킷을 저장합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit", type=int, default=0, help="처리할 최대 에셋 수 (0이면 전체)"
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="이미 지문이 있는 에셋도 다시 계산",
+        )
+
+    def handle(self, *args, **options):
+        assets = GenerationAsset.objects.all()
+        if not options["force"]:
+            assets = assets.filter(fingerprint__isnull=True)
+        assets = assets.order_by("created_at")
+        if options["limit"]:
+            assets = assets[: options["limit"]]
+
+        done = skipped = 0
+        for asset in assets.iterator():
+            if index_generation_prompt(asset):
+                done += 1
+            else:
+                skipped += 1
+
+        self.stdout.write(f"프롬프트 지문 저장 완료: {done}건, 빈 프롬프트 {skipped}건")
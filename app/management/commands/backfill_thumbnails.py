@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from app.models import Post
+from app.thumbnails import create_thumbnails
+
+
+class Command(BaseCommand):
+    help = "썸네일이 없는 기존 게시물의 반응형 썸네일(WebP/AVIF)을 생성합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit", type=int, default=0, help="처리할 최대 게시물 수 (0이면 전체)"
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="이미 썸네일이 있는 게시물도 다시 생성",
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image__isnull=True).exclude(image="")
+        if not options["force"]:
+            posts = posts.filter(thumbnails={})
+        posts = posts.order_by("pk")
+        if options["limit"]:
+            posts = posts[: options["limit"]]
+
+        done = failed = 0
+        for post in posts.iterator():
+            try:
+                post.thumbnails = create_thumbnails(post.image)
+                post.save(update_fields=["thumbnails"])
+                done += 1
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f"게시물 {post.pk} 썸네일 생성 실패: {str(e)}")
+
+        self.stdout.write(f"썸네일 생성 완료: 성공 {done}건, 실패 {failed}건")
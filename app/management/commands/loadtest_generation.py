@@ -0,0 +1,179 @@
+import asyncio
+import statistics
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from types import SimpleNamespace
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ai_playground.models import AIImageGeneration
+
+LOADTEST_USERNAME = "loadtest"
+
+
+def _fake_response(kind):
+    if kind == "chat":
+        message = SimpleNamespace(content="loadtest prompt")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+    image = SimpleNamespace(url="https://example.com/loadtest.png")
+    return SimpleNamespace(data=[image])
+
+
+def _fake_client(latency, is_async):
+    """지연 시간만큼 기다린 뒤 고정 응답을 돌려주는 Azure OpenAI 클라이언트 대역"""
+    if is_async:
+
+        async def call(kind):
+            await asyncio.sleep(latency)
+            return _fake_response(kind)
+
+    else:
+
+        def call(kind):
+            time.sleep(latency)
+            return _fake_response(kind)
+
+    return SimpleNamespace(
+        chat=SimpleNamespace(
+            completions=SimpleNamespace(create=lambda **kwargs: call("chat"))
+        ),
+        images=SimpleNamespace(generate=lambda **kwargs: call("image")),
+    )
+
+
+@contextmanager
+def _simulated_upstream(latency):
+    # 테스트 클라이언트의 호스트(testserver)도 허용
+    allowed_hosts = [*settings.ALLOWED_HOSTS, "testserver"]
+    with override_settings(ALLOWED_HOSTS=allowed_hosts), mock.patch(
+        "util.common.generation.get_client",
+        return_value=_fake_client(latency, is_async=False),
+    ), mock.patch(
+        "util.common.generation.get_async_client",
+        return_value=_fake_client(latency, is_async=True),
+    ):
+        yield
+
+
+class _ThreadSampler:
+    """부하 중 프로세스의 최대 스레드 수를 기록"""
+
+    def __init__(self):
+        self.peak = threading.active_count()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(0.01):
+            self.peak = max(self.peak, threading.active_count())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+class Command(BaseCommand):
+    help = (
+        "동기(WSGI 스레드) 뷰와 async(ASGI) 뷰의 이미지 생성 처리량을 비교합니다. "
+        "외부 API는 지정한 지연 시간을 가진 대역으로 대체합니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests", type=int, default=100, help="방식별 동시 요청 수"
+        )
+        parser.add_argument(
+            "--latency",
+            type=float,
+            default=0.5,
+            help="외부 API 호출 한 번의 지연 시간(초)",
+        )
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=8,
+            help="동기 뷰에 사용할 워커 스레드 수 (WSGI 서버의 스레드 수)",
+        )
+
+    def handle(self, *args, **options):
+        user, _ = User.objects.get_or_create(username=LOADTEST_USERNAME)
+        started_at = timezone.now()
+        try:
+            with _simulated_upstream(options["latency"]):
+                sync_result = self._run_sync(user, options)
+                async_result = asyncio.run(self._run_async(user, options))
+        finally:
+            AIImageGeneration.objects.filter(
+                user=user, created_at__gte=started_at
+            ).delete()
+
+        self.stdout.write(
+            f"요청 {options['requests']}건, 외부 호출 지연 {options['latency']}초"
+        )
+        self._report(f"동기 뷰 (스레드 {options['threads']}개)", sync_result)
+        self._report("async 뷰", async_result)
+
+    def _prompts(self, count):
+        # 프롬프트 캐시에 적중하지 않도록 요청마다 다른 입력 사용
+        return [f"loadtest {uuid.uuid4().hex}" for _ in range(count)]
+
+    def _run_sync(self, user, options):
+        url = reverse("ai_playground:generate_image")
+        local = threading.local()
+
+        def send(prompt):
+            if not hasattr(local, "client"):
+                local.client = Client()
+                local.client.force_login(user)
+            started = time.monotonic()
+            response = local.client.post(url, {"prompt": prompt})
+            return response.status_code, time.monotonic() - started
+
+        with _ThreadSampler() as sampler:
+            started = time.monotonic()
+            with ThreadPoolExecutor(max_workers=options["threads"]) as executor:
+                results = list(executor.map(send, self._prompts(options["requests"])))
+            elapsed = time.monotonic() - started
+        return results, elapsed, sampler.peak
+
+    async def _run_async(self, user, options):
+        url = reverse("ai_playground:agenerate_image")
+        client = AsyncClient()
+        await client.aforce_login(user)
+
+        async def send(prompt):
+            started = time.monotonic()
+            response = await client.post(url, {"prompt": prompt})
+            return response.status_code, time.monotonic() - started
+
+        with _ThreadSampler() as sampler:
+            started = time.monotonic()
+            results = await asyncio.gather(
+                *(send(prompt) for prompt in self._prompts(options["requests"]))
+            )
+            elapsed = time.monotonic() - started
+        return results, elapsed, sampler.peak
+
+    def _report(self, label, result):
+        results, elapsed, peak_threads = result
+        latencies = sorted(latency for _, latency in results)
+        failed = sum(1 for status, _ in results if status != 200)
+        p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+        self.stdout.write(
+            f"{label}: 총 {elapsed:.2f}초, {len(results) / elapsed:.1f} req/s, "
+            f"p50 {statistics.median(latencies):.2f}초, p95 {p95:.2f}초, "
+            f"최대 스레드 {peak_threads}개, 실패 {failed}건"
+        )
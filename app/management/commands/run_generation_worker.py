@@ -0,0 +1,65 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from app.jobs import claim_next_job, default_worker_name, requeue_stale_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = (
+        "이미지 생성 작업 큐를 처리하는 워커를 실행합니다. "
+        "같은 호스트에서 여러 프로세스를 띄워 수평 확장할 수 있습니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="대기 중인 작업이 없을 때 다시 확인하기까지의 시간(초)",
+        )
+        parser.add_argument(
+            "--max-jobs",
+            type=int,
+            default=0,
+            help="처리할 최대 작업 수 (0이면 제한 없음)",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="대기 중인 작업을 모두 처리한 뒤 종료",
+        )
+        parser.add_argument("--name", default="", help="워커 이름 (기본값: 호스트:PID)")
+
+    def handle(self, *args, **options):
+        worker_name = options["name"] or default_worker_name()
+        self._stopping = False
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+
+        self.stdout.write(f"생성 워커 시작: {worker_name}")
+        processed = 0
+        while not self._stopping:
+            close_old_connections()
+            requeue_stale_jobs()
+
+            job = claim_next_job(worker_name)
+            if job is None:
+                if options["once"]:
+                    break
+                time.sleep(options["poll_interval"])
+                continue
+
+            run_job(job)
+            processed += 1
+            self.stdout.write(f"작업 {job.id} 처리 완료: {job.status}")
+            if options["max_jobs"] and processed >= options["max_jobs"]:
+                break
+
+        self.stdout.write(f"생성 워커 종료: {worker_name} (처리한 작업 {processed}건)")
+
+    def _request_stop(self, signum, frame):
+        # 진행 중인 작업은 끝까지 처리한 뒤 종료
+        self._stopping = True
@@ -0,0 +1,91 @@
+# Generated by Django 5.1.5 on 2026-10-18 01:20
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0013_alter_comment_options_comment_author_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="GenerationJob",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("prompt", models.TextField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "대기 중"),
+                            ("running", "처리 중"),
+                            ("succeeded", "완료"),
+                            ("failed", "실패"),
+                        ],
+                        default="pending",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "stage",
+                    models.CharField(
+                        choices=[
+                            ("queued", "대기열"),
+                            ("prompt", "프롬프트 생성"),
+                            ("image", "이미지 생성"),
+                            ("upload", "이미지 저장"),
+                            ("done", "완료"),
+                        ],
+                        default="queued",
+                        max_length=20,
+                    ),
+                ),
+                ("generated_prompt", models.TextField(blank=True, null=True)),
+                (
+                    "source_image_url",
+                    models.URLField(blank=True, max_length=1000, null=True),
+                ),
+                ("image_url", models.URLField(blank=True, max_length=1000, null=True)),
+                ("error", models.TextField(blank=True, null=True)),
+                ("stage_timings", models.JSONField(blank=True, default=dict)),
+                ("attempts", models.PositiveSmallIntegerField(default=0)),
+                ("worker", models.CharField(blank=True, max_length=100)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("started_at", models.DateTimeField(blank=True, null=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "이미지 생성 작업",
+                "verbose_name_plural": "이미지 생성 작업들",
+                "ordering": ["created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["status", "created_at"],
+                        name="app_generat_status_a032ab_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.1.5 on 2026-10-18 01:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0014_generationjob"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PostImageAnalysis",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("image_url", models.URLField(max_length=1000)),
+                ("captions", models.JSONField(blank=True, default=list)),
+                ("tags", models.JSONField(blank=True, default=list)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "post",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="image_analysis",
+                        to="app.post",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "이미지 분석 결과",
+                "verbose_name_plural": "이미지 분석 결과들",
+            },
+        ),
+    ]
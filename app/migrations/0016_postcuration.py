@@ -0,0 +1,51 @@
+# Generated by Django 5.1.5 on 2026-10-18 01:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0015_postimageanalysis"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PostCuration",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("style", models.CharField(max_length=30)),
+                ("prompt_version", models.PositiveIntegerField()),
+                ("text", models.TextField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "post",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="curations",
+                        to="app.post",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "AI 큐레이션",
+                "verbose_name_plural": "AI 큐레이션들",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("post", "style", "prompt_version"),
+                        name="unique_post_curation_version",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.1.5 on 2026-10-18 01:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0016_postcuration"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="GenerationAsset",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(editable=False, primary_key=True, serialize=False),
+                ),
+                ("prompt", models.TextField()),
+                ("generated_prompt", models.TextField(blank=True)),
+                ("blob_name", models.CharField(max_length=500)),
+                ("image_url", models.URLField(max_length=1000)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "생성 이미지 에셋",
+                "verbose_name_plural": "생성 이미지 에셋들",
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="asset",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="posts",
+                to="app.generationasset",
+            ),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.1.5 on 2026-10-18 01:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0017_generationasset"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="generationasset",
+            name="thumbnails",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="thumbnails",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AlterField(
+            model_name="generationjob",
+            name="stage",
+            field=models.CharField(
+                choices=[
+                    ("queued", "대기열"),
+                    ("prompt", "프롬프트 생성"),
+                    ("image", "이미지 생성"),
+                    ("upload", "이미지 저장"),
+                    ("thumbnails", "썸네일 생성"),
+                    ("done", "완료"),
+                ],
+                default="queued",
+                max_length=20,
+            ),
+        ),
+    ]
@@ -0,0 +1,105 @@
+# Generated by Django 5.1.5 on 2026-10-18 01:35
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.functions.text
+from django.conf import settings
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+SEARCH_INDEXES = [
+    django.contrib.postgres.indexes.GinIndex(
+        fields=["search_vector"], name="post_search_vector_gin"
+    ),
+    django.contrib.postgres.indexes.GinIndex(
+        django.contrib.postgres.indexes.OpClass(
+            django.db.models.functions.text.Upper("title"), name="gin_trgm_ops"
+        ),
+        name="post_title_trgm",
+    ),
+    django.contrib.postgres.indexes.GinIndex(
+        django.contrib.postgres.indexes.OpClass(
+            django.db.models.functions.text.Upper("content"), name="gin_trgm_ops"
+        ),
+        name="post_content_trgm",
+    ),
+    django.contrib.postgres.indexes.GinIndex(
+        django.contrib.postgres.indexes.OpClass(
+            django.db.models.functions.text.Upper("generated_prompt"),
+            name="gin_trgm_ops",
+        ),
+        name="post_prompt_trgm",
+    ),
+]
+
+
+def create_search_indexes(apps, schema_editor):
+    # GIN 인덱스는 PostgreSQL 전용이므로 다른 DB에서는 건너뜀
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    Post = apps.get_model("app", "Post")
+    for index in SEARCH_INDEXES:
+        schema_editor.add_index(Post, index)
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    Post = apps.get_model("app", "Post")
+    for index in SEARCH_INDEXES:
+        schema_editor.remove_index(Post, index)
+
+
+def populate_search_vectors(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    from django.contrib.postgres.search import SearchVector
+    from django.db.models import Value
+
+    Post = apps.get_model("app", "Post")
+    PostImageAnalysis = apps.get_model("app", "PostImageAnalysis")
+    analysis_text = {
+        post_id: " ".join([*tags, *captions])
+        for post_id, tags, captions in PostImageAnalysis.objects.values_list(
+            "post_id", "tags", "captions"
+        )
+    }
+    for post_id in Post.objects.values_list("id", flat=True).iterator():
+        Post.objects.filter(pk=post_id).update(
+            search_vector=SearchVector("title", weight="A", config="simple")
+            + SearchVector("generated_prompt", weight="B", config="simple")
+            + SearchVector(
+                Value(analysis_text.get(post_id, "")), weight="B", config="simple"
+            )
+            + SearchVector("content", weight="C", config="simple")
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0019_access_path_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # PostgreSQL이 아니면 아무 것도 하지 않음
+        TrigramExtension(),
+        migrations.AddField(
+            model_name="post",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name="post", index=index)
+                for index in SEARCH_INDEXES
+            ],
+            database_operations=[
+                migrations.RunPython(create_search_indexes, drop_search_indexes),
+            ],
+        ),
+        migrations.RunPython(populate_search_vectors, migrations.RunPython.noop),
+    ]
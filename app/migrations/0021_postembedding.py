@@ -0,0 +1,45 @@
+# Generated by Django 5.1.5 on 2026-10-18 01:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0020_post_search"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PostEmbedding",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("model", models.CharField(max_length=100)),
+                ("dimensions", models.PositiveIntegerField()),
+                ("vector", models.BinaryField()),
+                ("source_hash", models.CharField(max_length=64)),
+                ("updated_at", models.DateTimeField(auto_now=True, db_index=True)),
+                (
+                    "post",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="embedding",
+                        to="app.post",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "게시물 임베딩",
+                "verbose_name_plural": "게시물 임베딩들",
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.5 on 2026-10-18 01:49
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0022_prompt_fingerprints"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["post", "updated_at", "created_at"],
+                name="comment_post_updated_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.5 on 2026-10-18 02:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0023_comment_conditional_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="aigeneration",
+            name="batch",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="history",
+                to="app.generationjob",
+            ),
+        ),
+        migrations.AddField(
+            model_name="generationasset",
+            name="batch",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="candidates",
+                to="app.generationjob",
+            ),
+        ),
+        migrations.AddField(
+            model_name="generationjob",
+            name="candidate_count",
+            field=models.PositiveSmallIntegerField(default=1),
+        ),
+    ]
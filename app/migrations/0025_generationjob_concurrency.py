@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-18 02:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0024_generation_batch"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="generationjob",
+            name="concurrency",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.5 on 2026-10-18 02:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0025_generationjob_concurrency"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="generationjob",
+            name="available_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="generationjob",
+            name="slot_waits",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+    ]
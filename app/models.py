@@ -1,9 +1,13 @@
+import uuid
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models.functions import Upper
 from django.conf import settings
 from django.contrib.auth.models import User
-from azure.storage.blob import BlobServiceClient
 import logging
-from urllib.parse import urlparse
+from util.common.azure_storage import blob_name_from_url, delete_blob
+from .thumbnails import delete_thumbnails
 
 
 class Post(models.Model):
@@ -14,23 +18,82 @@ class Post(models.Model):
     image = models.URLField(blank=True, null=True, max_length=1000)
     generated_prompt = models.TextField(blank=True, null=True)
     is_public = models.BooleanField(default=False)
+    asset = models.ForeignKey(
+        "GenerationAsset",
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name="posts",
+    )
+    # 반응형 썸네일 {포맷: {너비: URL}}
+    thumbnails = models.JSONField(default=dict, blank=True)
+    # 전문 검색용 (PostgreSQL에서만 채워짐, app/search.py 참고)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # 내 갤러리: user로 거르고 최신순 정렬
+            models.Index(
+                fields=["user", "-date_posted", "-id"], name="post_user_date_idx"
+            ),
+            # 공개 갤러리: is_public으로 거르고 날짜순 정렬
+            models.Index(
+                fields=["is_public", "date_posted", "id"], name="post_public_date_idx"
+            ),
+            # 공개 게시물만 담는 부분 인덱스 (PostgreSQL, SQLite)
+            models.Index(
+                fields=["date_posted", "id"],
+                condition=models.Q(is_public=True),
+                name="post_public_only_idx",
+            ),
+            # 아래 인덱스들은 PostgreSQL에서만 생성된다 (마이그레이션 0020 참고)
+            GinIndex(fields=["search_vector"], name="post_search_vector_gin"),
+            # icontains(UPPER(...) LIKE '%q%') 부분 문자열 검색용 트라이그램 인덱스
+            GinIndex(
+                OpClass(Upper("title"), name="gin_trgm_ops"), name="post_title_trgm"
+            ),
+            GinIndex(
+                OpClass(Upper("content"), name="gin_trgm_ops"), name="post_content_trgm"
+            ),
+            GinIndex(
+                OpClass(Upper("generated_prompt"), name="gin_trgm_ops"),
+                name="post_prompt_trgm",
+            ),
+        ]
 
     def __str__(self):
         return self.title
+
+    def _srcset(self, fmt):
+        urls = self.thumbnails.get(fmt, {})
+        return ", ".join(
+            f"{urls[width]} {width}w" for width in sorted(urls, key=int)
+        )
+
+    @property
+    def avif_srcset(self):
+        return self._srcset("avif")
+
+    @property
+    def webp_srcset(self):
+        return self._srcset("webp")
     
+    def _image_referenced_elsewhere(self):
+        """다른 게시물이나 생성 기록(AIGeneration, GenerationAsset)이 같은 이미지를 쓰는지"""
+        return (
+            Post.objects.filter(image=self.image).exclude(pk=self.pk).exists()
+            or AIGeneration.objects.filter(image_url=self.image).exists()
+            or GenerationAsset.objects.filter(image_url=self.image).exists()
+        )
+
     def delete(self, *args, **kwargs):
-        if self.image:
+        # 생성 기록이 남아 있는 이미지는 Blob과 썸네일을 지우지 않는다
+        if self.image and not self._image_referenced_elsewhere():
             try:
-                blob_service_client = BlobServiceClient.from_connection_string(
-                    settings.AZURE_CONNECTION_STRING
-                )
-                container_client = blob_service_client.get_container_client(
-                    settings.CONTAINER_NAME
-                )
+                blob_name = blob_name_from_url(self.image)
 
-                blob_name = urlparse(self.image).path.split('/')[-1]
-
-                container_client.delete_blob(blob_name)
+                delete_blob(blob_name)
+                delete_thumbnails(self.thumbnails)
                 logging.info(f"Blob {blob_name} deleted successfully")
             
             except Exception as e:
@@ -61,6 +124,14 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=["post", "-created_at"], name="comment_post_created_idx"),
+            # 댓글 조건부 응답(ETag)용 집계를 인덱스만으로 계산
+            models.Index(
+                fields=["post", "updated_at", "created_at"],
+                name="comment_post_updated_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"Comment by {self.author} on {self.post}"
@@ -70,11 +141,92 @@ class Comment(models.Model):
         return self.author.profile.nickname if hasattr(self.author, 'profile') else self.author.username
 
 
+class PostImageAnalysis(models.Model):
+    """게시물 이미지의 Computer Vision 분석 결과 (캡션, 태그)"""
+
+    post = models.OneToOneField(
+        Post, on_delete=models.CASCADE, related_name="image_analysis"
+    )
+    image_url = models.URLField(max_length=1000)
+    captions = models.JSONField(default=list, blank=True)
+    tags = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "이미지 분석 결과"
+        verbose_name_plural = "이미지 분석 결과들"
+
+    def __str__(self):
+        return f"Image analysis of {self.post}"
+
+    @property
+    def caption(self):
+        return self.captions[0] if self.captions else ""
+
+    @property
+    def tags_text(self):
+        return ", ".join(self.tags)
+
+
+class PostCuration(models.Model):
+    """스타일별 AI 큐레이션 (프롬프트 버전별로 한 번만 생성)"""
+
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="curations")
+    style = models.CharField(max_length=30)
+    prompt_version = models.PositiveIntegerField()
+    text = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["post", "style", "prompt_version"],
+                name="unique_post_curation_version",
+            )
+        ]
+        verbose_name = "AI 큐레이션"
+        verbose_name_plural = "AI 큐레이션들"
+
+    def __str__(self):
+        return f"{self.style} curation of {self.post} (v{self.prompt_version})"
+
+
+class PostEmbedding(models.Model):
+    """게시물 텍스트(생성 프롬프트, 캡션, 큐레이션)의 임베딩 (float32 바이트)"""
+
+    post = models.OneToOneField(
+        Post, on_delete=models.CASCADE, related_name="embedding"
+    )
+    model = models.CharField(max_length=100)
+    dimensions = models.PositiveIntegerField()
+    vector = models.BinaryField()
+    # 임베딩한 텍스트의 해시 (내용이 바뀌지 않았으면 다시 계산하지 않음)
+    source_hash = models.CharField(max_length=64)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        verbose_name = "게시물 임베딩"
+        verbose_name_plural = "게시물 임베딩들"
+
+    def __str__(self):
+        return f"Embedding of {self.post} ({self.model})"
+
+
 class AIGeneration(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     prompt = models.TextField()
     generated_prompt = models.TextField()
     image_url = models.URLField(max_length=1000)
+    # 여러 후보 중에서 고른 이미지라면 후보들을 만든 생성 작업
+    batch = models.ForeignKey(
+        "GenerationJob",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="history",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
@@ -82,10 +234,152 @@ class AIGeneration(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=["user", "-created_at"], name="aigen_user_created_idx"),
+        ]
         verbose_name = 'AI 생성 이미지'
         verbose_name_plural = 'AI 생성 이미지들'
 
 
+class GenerationJob(models.Model):
+    """이미지 생성 파이프라인 작업 (워커 프로세스가 처리)"""
+
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_SUCCEEDED = "succeeded"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "대기 중"),
+        (STATUS_RUNNING, "처리 중"),
+        (STATUS_SUCCEEDED, "완료"),
+        (STATUS_FAILED, "실패"),
+    ]
+
+    STAGE_QUEUED = "queued"
+    STAGE_PROMPT = "prompt"
+    STAGE_IMAGE = "image"
+    STAGE_UPLOAD = "upload"
+    STAGE_THUMBNAILS = "thumbnails"
+    STAGE_DONE = "done"
+    STAGE_CHOICES = [
+        (STAGE_QUEUED, "대기열"),
+        (STAGE_PROMPT, "프롬프트 생성"),
+        (STAGE_IMAGE, "이미지 생성"),
+        (STAGE_UPLOAD, "이미지 저장"),
+        (STAGE_THUMBNAILS, "썸네일 생성"),
+        (STAGE_DONE, "완료"),
+    ]
+    PIPELINE_STAGES = [STAGE_PROMPT, STAGE_IMAGE, STAGE_UPLOAD, STAGE_THUMBNAILS]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    prompt = models.TextField()
+    # 같은 생성 프롬프트로 만들 이미지 후보 수
+    candidate_count = models.PositiveSmallIntegerField(default=1)
+    # 실행 중에 사용하는 동시 호출 슬롯 수 (사용자별 동시 실행 한도 계산용)
+    concurrency = models.PositiveSmallIntegerField(default=0)
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING
+    )
+    stage = models.CharField(max_length=20, choices=STAGE_CHOICES, default=STAGE_QUEUED)
+    generated_prompt = models.TextField(blank=True, null=True)
+    source_image_url = models.URLField(blank=True, null=True, max_length=1000)
+    image_url = models.URLField(blank=True, null=True, max_length=1000)
+    error = models.TextField(blank=True, null=True)
+    stage_timings = models.JSONField(default=dict, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # 동시 실행 슬롯을 얻지 못해 대기열로 되돌아간 횟수와, 다시 가져갈 수 있는 시각
+    slot_waits = models.PositiveSmallIntegerField(default=0)
+    available_at = models.DateTimeField(blank=True, null=True)
+    worker = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ["created_at"]
+        indexes = [models.Index(fields=["status", "created_at"])]
+        verbose_name = "이미지 생성 작업"
+        verbose_name_plural = "이미지 생성 작업들"
+
+    def __str__(self):
+        return f"{self.user.username}'s job {self.id} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_SUCCEEDED, self.STATUS_FAILED)
+
+
+class GenerationAsset(models.Model):
+    """Blob Storage에 저장된 생성 이미지 (첫 번째 후보의 ID는 생성 작업 ID와 같음)
+
+    게시물 작성 시 이미지를 다시 복사하지 않고 이 기록을 연결한다.
+    """
+
+    id = models.UUIDField(primary_key=True, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    batch = models.ForeignKey(
+        GenerationJob,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="candidates",
+    )
+    prompt = models.TextField()
+    generated_prompt = models.TextField(blank=True)
+    blob_name = models.CharField(max_length=500)
+    image_url = models.URLField(max_length=1000)
+    thumbnails = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name = "생성 이미지 에셋"
+        verbose_name_plural = "생성 이미지 에셋들"
+
+    def __str__(self):
+        return f"{self.user.username}'s asset {self.id}"
+
+
+class PromptFingerprint(models.Model):
+    """생성 이미지 프롬프트의 MinHash 서명 (유사 중복 프롬프트 탐지용)"""
+
+    asset = models.OneToOneField(
+        GenerationAsset,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="fingerprint",
+    )
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    signature = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "프롬프트 지문"
+        verbose_name_plural = "프롬프트 지문들"
+
+    def __str__(self):
+        return f"Fingerprint of {self.asset_id}"
+
+
+class PromptLSHBucket(models.Model):
+    """MinHash 서명의 LSH 밴드 해시 (같은 버킷에 있는 프롬프트만 비교)"""
+
+    fingerprint = models.ForeignKey(
+        PromptFingerprint, on_delete=models.CASCADE, related_name="buckets"
+    )
+    # 조회는 항상 아래 복합 인덱스를 사용하므로 user 단독 인덱스는 만들지 않음
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
+    band = models.PositiveSmallIntegerField()
+    bucket = models.BigIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "bucket"], name="prompt_lsh_lookup_idx"),
+        ]
+
+
 # class Tag(models.Model):
 #     name = models.CharField(max_length=100, unique=True)
 
@@ -0,0 +1,121 @@
+"""익명 사용자용 페이지 캐시와 키 버전 기반 무효화
+
+캐시 키에 버전 번호를 넣고, 게시물/댓글이 바뀌면 signals.py에서 버전을 올려
+이전 키가 더 이상 조회되지 않도록 한다. 로그인한 사용자는 페이지마다 내용이
+다르므로 페이지 캐시를 사용하지 않는다. 대신 템플릿 프래그먼트 캐시를 같은 버전으로 사용한다.
+"""
+
+import asyncio
+import functools
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+
+PAGE_CACHE_TIMEOUT = getattr(settings, "PAGE_CACHE_TIMEOUT", 60 * 10)
+# 버전 키는 페이지보다 오래 유지해 버전이 되돌아가지 않도록 한다
+_VERSION_TIMEOUT = None
+
+GALLERY_SCOPE = "gallery"
+
+
+def post_scope(pk):
+    return f"post:{pk}"
+
+
+def _version_key(scope):
+    return f"page-cache:version:{scope}"
+
+
+def get_cache_version(scope):
+    version = cache.get(_version_key(scope))
+    if version is None:
+        cache.add(_version_key(scope), 1, timeout=_VERSION_TIMEOUT)
+        version = cache.get(_version_key(scope), 1)
+    return version
+
+
+async def aget_cache_version(scope):
+    version = await cache.aget(_version_key(scope))
+    if version is None:
+        await cache.aadd(_version_key(scope), 1, timeout=_VERSION_TIMEOUT)
+        version = await cache.aget(_version_key(scope), 1)
+    return version
+
+
+def bump_cache_version(scope):
+    """scope의 캐시된 페이지와 프래그먼트를 모두 무효화"""
+    try:
+        cache.incr(_version_key(scope))
+    except ValueError:
+        # 아직 버전 키가 없으면 처음 조회될 때 새로 만들어진다
+        cache.add(_version_key(scope), 2, timeout=_VERSION_TIMEOUT)
+
+
+def _page_key(request, scope, version):
+    path = hashlib.sha256(request.get_full_path().encode("utf-8")).hexdigest()
+    return f"page-cache:page:{scope}:v{version}:{request.method}:{path}"
+
+
+def _cacheable(request, response):
+    if response.status_code != 200 or response.streaming:
+        return False
+    if response.cookies or request.META.get("CSRF_COOKIE_NEEDS_UPDATE"):
+        # 방문자별 쿠키나 CSRF 토큰이 들어간 응답은 공유하면 안 됨
+        return False
+    cache_control = response.get("Cache-Control", "")
+    return "private" not in cache_control and "no-store" not in cache_control
+
+
+def cache_anonymous_page(scope_func):
+    """익명 사용자의 GET 응답을 캐시하는 뷰 데코레이터
+
+    scope_func(request, *args, **kwargs)는 무효화 범위(GALLERY_SCOPE, post_scope(pk) 등)를 반환한다.
+    로그인 여부에 따라 응답이 달라지므로 모든 응답에 Vary: Cookie를 붙인다.
+    뷰가 Cache-Control: private/no-store를 설정하면 캐시하지 않는다.
+    """
+
+    def decorator(view_func):
+        if asyncio.iscoroutinefunction(view_func):
+
+            @functools.wraps(view_func)
+            async def async_wrapper(request, *args, **kwargs):
+                user = await request.auser()
+                if user.is_authenticated or request.method not in ("GET", "HEAD"):
+                    response = await view_func(request, *args, **kwargs)
+                    patch_vary_headers(response, ["Cookie"])
+                    return response
+
+                scope = scope_func(request, *args, **kwargs)
+                key = _page_key(request, scope, await aget_cache_version(scope))
+                response = await cache.aget(key)
+                if response is None:
+                    response = await view_func(request, *args, **kwargs)
+                    patch_vary_headers(response, ["Cookie"])
+                    if _cacheable(request, response):
+                        await cache.aset(key, response, PAGE_CACHE_TIMEOUT)
+                return response
+
+            return async_wrapper
+
+        @functools.wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.user.is_authenticated or request.method not in ("GET", "HEAD"):
+                response = view_func(request, *args, **kwargs)
+                patch_vary_headers(response, ["Cookie"])
+                return response
+
+            scope = scope_func(request, *args, **kwargs)
+            key = _page_key(request, scope, get_cache_version(scope))
+            response = cache.get(key)
+            if response is None:
+                response = view_func(request, *args, **kwargs)
+                patch_vary_headers(response, ["Cookie"])
+                if _cacheable(request, response):
+                    cache.set(key, response, PAGE_CACHE_TIMEOUT)
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,65 @@
+import base64
+import json
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+GALLERY_PAGE_SIZE = getattr(settings, "GALLERY_PAGE_SIZE", 24)
+
+
+class InvalidCursor(ValueError):
+    """해석할 수 없는 페이지 커서"""
+
+
+def encode_cursor(post, key="date_posted"):
+    """(정렬 키 값, id)를 URL에 넣을 수 있는 불투명한 커서 문자열로 변환"""
+    value = getattr(post, key)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([value, post.pk])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, key="date_posted"):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value, pk = json.loads(base64.urlsafe_b64decode(padded))
+        if key == "date_posted":
+            value = parse_datetime(value)
+    except (ValueError, TypeError):
+        raise InvalidCursor(cursor)
+    if value is None or not isinstance(pk, int):
+        raise InvalidCursor(cursor)
+    if key != "date_posted" and not isinstance(value, (int, float)):
+        raise InvalidCursor(cursor)
+    return value, pk
+
+
+def keyset_page(
+    queryset, cursor=None, descending=True, page_size=None, key="date_posted"
+):
+    """(key, id) 기준 키셋 페이지네이션 (key 기본값은 date_posted)
+
+    OFFSET 없이 마지막으로 본 게시물 다음부터 읽으므로 페이지가 뒤로 가도
+    조회 비용이 일정하다. (게시물 목록, 다음 커서 또는 None) 반환.
+    """
+    page_size = page_size or GALLERY_PAGE_SIZE
+    if descending:
+        queryset = queryset.order_by(f"-{key}", "-id")
+    else:
+        queryset = queryset.order_by(key, "id")
+
+    if cursor:
+        value, pk = decode_cursor(cursor, key)
+        op = "lt" if descending else "gt"
+        queryset = queryset.filter(
+            Q(**{f"{key}__{op}": value}) | Q(**{key: value, f"id__{op}": pk})
+        )
+
+    posts = list(queryset[: page_size + 1])
+    if len(posts) > page_size:
+        posts = posts[:page_size]
+        return posts, encode_cursor(posts[-1], key)
+    return posts, None
@@ -0,0 +1,91 @@
+"""게시물 전문 검색
+
+PostgreSQL에서는 search_vector(GIN 인덱스)로 제목, 내용, 생성 프롬프트,
+이미지 태그/캡션을 검색하고 순위를 매긴다. 형태소 분석기가 없는 한국어는
+단어 일부만 입력해도 찾을 수 있도록 pg_trgm 인덱스를 쓰는 부분 문자열 검색을 함께 사용한다.
+다른 DB에서는 같은 필드에 대한 icontains 검색으로 대체한다.
+"""
+
+from django.conf import settings
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramWordSimilarity,
+)
+from django.db import connection
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import Cast, Round
+
+# 한국어 사전이 없으므로 언어 처리 없이 단어 단위로 나누는 simple 설정 사용
+SEARCH_CONFIG = getattr(settings, "SEARCH_CONFIG", "simple")
+# 검색 순위를 반올림할 소수 자릿수 (차이가 이보다 작으면 id 순서로 정렬)
+SEARCH_RANK_PRECISION = 6
+
+
+def search_enabled():
+    return connection.vendor == "postgresql"
+
+
+def _analysis_text(post):
+    try:
+        analysis = post.image_analysis
+    except post._meta.model.image_analysis.RelatedObjectDoesNotExist:
+        return ""
+    return " ".join([*analysis.tags, *analysis.captions])
+
+
+def update_search_vector(post):
+    """게시물의 검색 벡터를 현재 내용과 이미지 분석 결과로 갱신"""
+    if not search_enabled():
+        return
+    vector = (
+        SearchVector("title", weight="A", config=SEARCH_CONFIG)
+        + SearchVector("generated_prompt", weight="B", config=SEARCH_CONFIG)
+        + SearchVector(Value(_analysis_text(post)), weight="B", config=SEARCH_CONFIG)
+        + SearchVector("content", weight="C", config=SEARCH_CONFIG)
+    )
+    # update()는 post_save 신호를 보내지 않으므로 신호 처리기가 다시 호출되지 않는다
+    type(post).objects.filter(pk=post.pk).update(search_vector=vector)
+
+
+def stable_rank(expression):
+    """순위 값을 반올림한 double precision으로 변환
+
+    SearchRank와 trigram 유사도는 real(float4)이라 커서에 담긴 float(float8)와
+    정확히 같게 비교되지 않는다. 키셋 페이지네이션의 경계 비교가 맞도록 변환한다.
+    """
+    return Cast(
+        Round(Cast(expression, FloatField()), SEARCH_RANK_PRECISION), FloatField()
+    )
+
+
+def _substring_filter(query):
+    return (
+        Q(title__icontains=query)
+        | Q(content__icontains=query)
+        | Q(generated_prompt__icontains=query)
+    )
+
+
+def search_posts(queryset, query):
+    """검색어로 게시물을 거른다. (queryset, 순위 정렬 여부) 반환
+
+    순위 정렬 시 각 게시물에 search_rank가 추가된다.
+    """
+    if not search_enabled():
+        return (
+            queryset.filter(
+                _substring_filter(query) | Q(image_analysis__tags__icontains=query)
+            ),
+            False,
+        )
+
+    search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type="websearch")
+    queryset = queryset.annotate(
+        search_rank=stable_rank(
+            SearchRank(F("search_vector"), search_query)
+            + TrigramWordSimilarity(query, "title")
+        )
+    ).filter(Q(search_vector=search_query) | _substring_filter(query))
+    return queryset, True
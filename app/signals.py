@@ -0,0 +1,38 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Comment, Post, PostCuration, PostImageAnalysis
+from .page_cache import GALLERY_SCOPE, bump_cache_version, post_scope
+from .search import update_search_vector
+
+
+@receiver(post_save, sender=Post)
+def refresh_post_search_vector(sender, instance, update_fields=None, **kwargs):
+    # 썸네일 등 검색과 무관한 필드만 저장한 경우는 건너뜀
+    if update_fields and not {"title", "content", "generated_prompt"} & set(
+        update_fields
+    ):
+        return
+    update_search_vector(instance)
+
+
+@receiver(post_save, sender=PostImageAnalysis)
+def refresh_analysis_search_vector(sender, instance, **kwargs):
+    update_search_vector(instance.post)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_pages(sender, instance, **kwargs):
+    # 갤러리 목록과 게시물 상세의 캐시를 함께 무효화
+    bump_cache_version(GALLERY_SCOPE)
+    bump_cache_version(post_scope(instance.pk))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=PostCuration)
+@receiver(post_delete, sender=PostCuration)
+@receiver(post_save, sender=PostImageAnalysis)
+def invalidate_post_detail(sender, instance, **kwargs):
+    bump_cache_version(post_scope(instance.post_id))
@@ -1,3 +1,1298 @@
+import asyncio
+import io
+import queue
+import tempfile
+import threading
+import time
+import uuid
+from datetime import timedelta
+from contextlib import contextmanager
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock, skipUnless
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import ExpressionWrapper, F, FloatField, Value
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from util.common.embeddings import EMBEDDING_DEPLOYMENT, vector_to_bytes
+from util.common.image_derivatives import build_derivatives, supported_formats
+from util.common import tts_cache
+from util.common.prompt_cache import get_prompt_cache
+from util.testing import (
+    IndexUsageTestMixin,
+    count_async_outbound_calls,
+    count_outbound_calls,
+)
+
+from . import curation
+from .curation import (
+    CURATION_PROMPT_VERSION,
+    STYLE_PROMPTS,
+    regenerate_post_curations,
+    stream_post_curations,
+)
+from .duplicates import find_duplicate_generation, index_generation_prompt
+from .embeddings import (
+    EmbeddingIndex,
+    build_embedding_text,
+    semantic_search,
+    update_post_embedding,
+)
+from .jobs import (
+    MAX_JOB_ATTEMPTS,
+    MAX_SLOT_WAITS,
+    STALE_JOB_TIMEOUT,
+    USER_MAX_CONCURRENCY,
+    claim_next_job,
+    requeue_stale_jobs,
+    run_job,
+)
+from .models import (
+    AIGeneration,
+    Comment,
+    GenerationAsset,
+    GenerationJob,
+    Post,
+    PostCuration,
+    PostEmbedding,
+    PromptFingerprint,
+)
+from .page_cache import GALLERY_SCOPE, get_cache_version, post_scope
+from .pagination import InvalidCursor, decode_cursor, encode_cursor, keyset_page
+from .search import search_enabled, search_posts, stable_rank, update_search_vector
+from .thumbnails import create_thumbnails, delete_thumbnails
+
+
+class GalleryIndexTests(IndexUsageTestMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("indexer", password="pw")
+        other = User.objects.create_user("other", password="pw")
+        for i in range(30):
+            Post.objects.create(
+                user=cls.user if i % 2 else other,
+                title=f"post {i}",
+                content="content",
+                is_public=i % 3 == 0,
+            )
+
+    def test_my_gallery_uses_user_date_index(self):
+        self.client.force_login(self.user)
+        for sql in self.captured_queries(
+            "app_post", lambda: self.client.get(reverse("my_gallery"))
+        ):
+            self.assertUsesIndex(sql, "post_user_date_idx")
+
+    def test_public_gallery_uses_public_index(self):
+        for sql in self.captured_queries(
+            "app_post", lambda: self.client.get(reverse("public_gallery"))
+        ):
+            self.assertUsesIndex(sql)
+
+    def test_public_gallery_feed_uses_public_index(self):
+        response = self.client.get(reverse("public_gallery"))
+        cursor = response.context["next_cursor"] or ""
+        for sql in self.captured_queries(
+            "app_post",
+            lambda: self.client.get(
+                reverse("gallery_feed", args=["public"]), {"cursor": cursor}
+            ),
+        ):
+            self.assertUsesIndex(sql)
+
+
+class HistoryIndexTests(IndexUsageTestMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("indexer", password="pw")
+        for i in range(5):
+            AIGeneration.objects.create(
+                user=cls.user,
+                prompt=f"prompt {i}",
+                generated_prompt="generated",
+                image_url="https://example.com/image.png",
+            )
+
+    def test_latest_generation_uses_user_created_index(self):
+        queryset = AIGeneration.objects.filter(user=self.user).order_by("-created_at")[
+            :1
+        ]
+        self.assertUsesIndex(str(queryset.query), "aigen_user_created_idx")
+
+
+class CommentIndexTests(IndexUsageTestMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user("indexer", password="pw")
+        cls.post = Post.objects.create(user=user, title="post", content="content")
+        for i in range(5):
+            Comment.objects.create(post=cls.post, author=user, message=f"comment {i}")
+
+    def test_comment_list_uses_post_created_index(self):
+        for sql in self.captured_queries(
+            "app_comment",
+            lambda: self.client.get(
+                reverse("comment_list_create", args=[self.post.id])
+            ),
+        ):
+            if "COUNT(" in sql:
+                # ETag 계산용 집계
+                self.assertUsesIndex(sql, "comment_post_updated_idx")
+            else:
+                self.assertUsesIndex(sql, "comment_post_created_idx")
+
+
+class CommentConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("commenter", password="pw")
+        cls.post = Post.objects.create(user=cls.user, title="post", content="content")
+        for i in range(5):
+            Comment.objects.create(post=cls.post, author=cls.user, message=f"c{i}")
+
+    url_names = ["comment_list_create", "async_comment_list_create"]
+
+    def test_comment_list_not_modified(self):
+        for url_name in self.url_names:
+            with self.subTest(url_name):
+                url = reverse(url_name, args=[self.post.id])
+                etag = self.client.get(url)["ETag"]
+
+                with CaptureQueriesContext(connection) as context:
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                # 변경이 없으면 댓글 목록을 조회하지 않는다
+                self.assertFalse(
+                    [q for q in context.captured_queries if "message" in q["sql"]]
+                )
+
+                after = Comment.objects.order_by("id")[3].id
+                response = self.client.get(url, {"after": after})
+                self.assertEqual(len(response.json()["comments"]), 1)
+
+    def test_deleting_newest_comment_changes_validators(self):
+        url = reverse("comment_list_create", args=[self.post.id])
+        first = self.client.get(url)
+        # 삭제 후 남은 댓글의 최신 시각은 뒤로 가므로 Last-Modified를 쓰지 않는다
+        self.assertFalse(first.has_header("Last-Modified"))
+
+        Comment.objects.order_by("-id").first().delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["count"], 4)
+        self.assertNotEqual(response["ETag"], first["ETag"])
+
+    def test_editing_comment_changes_etag(self):
+        url = reverse("comment_list_create", args=[self.post.id])
+        etag = self.client.get(url)["ETag"]
+        comment = Comment.objects.order_by("id").first()
+        comment.message = "수정됨"
+        comment.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("수정됨", [c["message"] for c in response.json()["comments"]])
+
+
+def walk_pages(queryset, page_size, **kwargs):
+    """keyset_page로 마지막 페이지까지 읽은 게시물 ID 목록"""
+    ids, cursor = [], None
+    while True:
+        posts, cursor = keyset_page(
+            queryset, cursor=cursor, page_size=page_size, **kwargs
+        )
+        ids += [post.id for post in posts]
+        if cursor is None:
+            return ids
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("pager", password="pw")
+        for i in range(11):
+            Post.objects.create(
+                user=cls.user,
+                title=f"고양이 {'고양이 ' * (i % 4)}{i}",
+                content="content",
+                is_public=True,
+            )
+
+    def test_ranked_pages_do_not_repeat_or_drop_ties(self):
+        # 1/3, 1/4, 1/5 처럼 이진수로 정확히 표현되지 않고 같은 값이 여러 개인 순위
+        rank = ExpressionWrapper(
+            Value(1.0) / (F("id") % 3 + 3), output_field=FloatField()
+        )
+        posts = Post.objects.annotate(search_rank=stable_rank(rank))
+        expected = list(
+            posts.order_by("-search_rank", "-id").values_list("id", flat=True)
+        )
+        for page_size in (2, 3, 4):
+            self.assertEqual(walk_pages(posts, page_size, key="search_rank"), expected)
+
+    @skipUnless(search_enabled(), "전문 검색은 PostgreSQL에서만 사용")
+    def test_search_results_pages(self):
+        for post in Post.objects.all():
+            update_search_vector(post)
+        posts, ranked = search_posts(Post.objects.all(), "고양이")
+        self.assertTrue(ranked)
+        expected = list(
+            posts.order_by("-search_rank", "-id").values_list("id", flat=True)
+        )
+        self.assertEqual(len(expected), 11)
+        self.assertEqual(walk_pages(posts, 3, key="search_rank"), expected)
+
+    def test_cursor_round_trip(self):
+        post = Post.objects.first()
+        self.assertEqual(
+            decode_cursor(encode_cursor(post)), (post.date_posted, post.pk)
+        )
+        post.search_rank = 0.333333
+        self.assertEqual(
+            decode_cursor(encode_cursor(post, "search_rank"), "search_rank"),
+            (0.333333, post.pk),
+        )
+
+    def test_invalid_cursors_are_rejected(self):
+        post = Post.objects.first()
+        post.search_rank = "0.5"
+        for cursor, key in [
+            ("not-a-cursor", "date_posted"),
+            (encode_cursor(post, "title"), "date_posted"),
+            (encode_cursor(post, "search_rank"), "search_rank"),
+        ]:
+            with self.subTest(cursor=cursor, key=key):
+                with self.assertRaises(InvalidCursor):
+                    decode_cursor(cursor, key)
+
+    def test_equal_dates_are_ordered_by_id(self):
+        Post.objects.update(date_posted=timezone.now())
+        ids = list(Post.objects.order_by("id").values_list("id", flat=True))
+        posts = Post.objects.all()
+        for page_size in (2, 3, 4):
+            self.assertEqual(walk_pages(posts, page_size), ids[::-1])
+            self.assertEqual(walk_pages(posts, page_size, descending=False), ids)
+
+
+@mock.patch("app.pagination.GALLERY_PAGE_SIZE", 4)
+class GalleryFeedTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("viewer", password="pw")
+        now = timezone.now()
+        for i in range(9):
+            post = Post.objects.create(
+                user=cls.user, title=f"작품 {i}", content="content", is_public=True
+            )
+            # date_posted는 auto_now_add라 두 개씩 같은 시각으로 바꿔둔다
+            Post.objects.filter(pk=post.pk).update(
+                date_posted=now - timedelta(minutes=i // 2)
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_feed_pages_through_gallery(self):
+        url = reverse("gallery_feed", args=["public"])
+        ids, cursor = [], None
+        while True:
+            data = self.client.get(url, {"cursor": cursor} if cursor else {}).json()
+            ids += [post["id"] for post in data["posts"]]
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+        expected = list(
+            Post.objects.order_by("date_posted", "id").values_list("id", flat=True)
+        )
+        self.assertEqual(ids, expected)
+
+    def test_feed_rejects_invalid_cursor(self):
+        response = self.client.get(
+            reverse("gallery_feed", args=["public"]), {"cursor": "not-a-cursor"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_gallery_redirect_keeps_search_query(self):
+        response = self.client.get(
+            reverse("public_gallery"),
+            {"search": "작품", "mode": "keyword", "cursor": "not-a-cursor"},
+        )
+        self.assertRedirects(
+            response,
+            reverse("public_gallery") + "?search=%EC%9E%91%ED%92%88&mode=keyword",
+            fetch_redirect_response=False,
+        )
+
+
+@mock.patch("app.models.delete_thumbnails")
+@mock.patch("app.models.delete_blob")
+class PostDeleteTests(TestCase):
+    image_url = "https://account.blob.core.windows.net/images/cat.png"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("deleter", password="pw")
+
+    def create_post(self, image=image_url):
+        return Post.objects.create(
+            user=self.user, title="post", content="content", image=image
+        )
+
+    def test_keeps_blob_referenced_by_generation_history(self, delete_blob, _):
+        asset = GenerationAsset.objects.create(
+            id=uuid.uuid4(),
+            user=self.user,
+            prompt="cat",
+            blob_name="cat.png",
+            image_url=self.image_url,
+        )
+        AIGeneration.objects.create(
+            user=self.user,
+            prompt="cat",
+            generated_prompt="a cat",
+            image_url=self.image_url,
+        )
+        self.create_post().delete()
+
+        delete_blob.assert_not_called()
+        self.assertTrue(GenerationAsset.objects.filter(id=asset.id).exists())
+
+    def test_keeps_blob_shared_with_another_post(self, delete_blob, _):
+        self.create_post()
+        self.create_post().delete()
+        delete_blob.assert_not_called()
+
+    def test_deletes_unreferenced_blob(self, delete_blob, delete_thumbnails):
+        self.create_post().delete()
+        delete_blob.assert_called_once_with("cat.png")
+        delete_thumbnails.assert_called_once()
+
+
+class PageCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("cached", password="pw")
+        cls.post = Post.objects.create(
+            user=cls.user, title="캐시된 작품", content="content", is_public=True
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def assertServedFromCache(self, url):
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        with self.assertNumQueries(0):
+            second = self.client.get(url)
+        self.assertEqual(second.content, first.content)
+        self.assertIn("Cookie", second["Vary"])
+
+    def test_anonymous_pages_are_served_from_cache(self):
+        # 동기 뷰(갤러리)와 async 뷰(게시물 상세) 모두
+        self.assertServedFromCache(reverse("public_gallery"))
+        self.assertServedFromCache(reverse("post_detail", args=[self.post.pk]))
+
+    def test_logged_in_pages_are_not_cached(self):
+        url = reverse("public_gallery")
+        self.client.get(url)
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertTrue(context.captured_queries)
+        self.assertIn("Cookie", response["Vary"])
+
+    def test_new_post_appears_in_cached_gallery(self):
+        url = reverse("public_gallery")
+        self.client.get(url)
+        Post.objects.create(
+            user=self.user, title="새 작품", content="content", is_public=True
+        )
+        self.assertContains(self.client.get(url), "새 작품")
+
+    def assertBumps(self, scopes, func):
+        before = {scope: get_cache_version(scope) for scope in scopes}
+        func()
+        for scope in scopes:
+            self.assertGreater(get_cache_version(scope), before[scope], scope)
+
+    def test_post_changes_bump_gallery_and_detail_versions(self):
+        scopes = [GALLERY_SCOPE, post_scope(self.post.pk)]
+        self.assertBumps(scopes, self.post.save)
+        self.assertBumps(scopes, self.post.delete)
+
+    def test_comment_changes_bump_detail_version(self):
+        gallery_version = get_cache_version(GALLERY_SCOPE)
+        scopes = [post_scope(self.post.pk)]
+        comment = Comment(post=self.post, author=self.user, message="좋아요")
+        self.assertBumps(scopes, comment.save)
+        self.assertBumps(scopes, comment.delete)
+        # 댓글은 갤러리 목록에 영향을 주지 않는다
+        self.assertEqual(get_cache_version(GALLERY_SCOPE), gallery_version)
+
+
+def png_bytes(width, height):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 120, 40)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class ThumbnailTests(TestCase):
+    image_url = "https://account.blob.core.windows.net/images/cat.png"
+
+    def test_derivatives_are_resized_and_encoded(self):
+        derivatives = build_derivatives(
+            png_bytes(1200, 600), [320, 640, 1024, 2048], ["avif", "webp"]
+        )
+        formats = supported_formats(["avif", "webp"])
+        self.assertIn("webp", formats)
+        # 원본(1200px)보다 넓은 크기로는 확대하지 않는다
+        self.assertEqual(
+            [(width, fmt) for width, fmt, _, _ in derivatives],
+            [(width, fmt) for width in (320, 640, 1024) for fmt in formats],
+        )
+        for width, fmt, data, content_type in derivatives:
+            with Image.open(io.BytesIO(data)) as image:
+                self.assertEqual(image.format, fmt.upper())
+                self.assertEqual(image.size, (width, width // 2))
+            self.assertEqual(content_type, f"image/{fmt}")
+
+    @mock.patch("app.thumbnails.THUMBNAIL_FORMATS", ["webp"])
+    def test_thumbnails_are_uploaded_next_to_original(self):
+        uploaded = {}
+
+        def upload_blob(name, data, content_type=None):
+            uploaded[name] = content_type
+            return f"https://account.blob.core.windows.net/images/{name}"
+
+        with mock.patch("app.thumbnails.is_blob_url", return_value=True), mock.patch(
+            "app.thumbnails.download_blob", return_value=png_bytes(1200, 600)
+        ) as download, mock.patch("app.thumbnails.upload_blob", upload_blob):
+            thumbnails = create_thumbnails(self.image_url)
+
+        download.assert_called_once_with("cat.png")
+        self.assertEqual(
+            uploaded,
+            {
+                "cat_w320.webp": "image/webp",
+                "cat_w640.webp": "image/webp",
+                "cat_w1024.webp": "image/webp",
+            },
+        )
+        post = Post(title="post", image=self.image_url, thumbnails=thumbnails)
+        # 너비는 문자열 키로 저장되지만 숫자 순서로 나열한다
+        base = "https://account.blob.core.windows.net/images/cat"
+        self.assertEqual(
+            post.webp_srcset,
+            f"{base}_w320.webp 320w, {base}_w640.webp 640w, {base}_w1024.webp 1024w",
+        )
+        self.assertEqual(post.avif_srcset, "")
+
+        with mock.patch("app.thumbnails.delete_blob") as delete_blob:
+            delete_thumbnails(thumbnails)
+        self.assertEqual(
+            sorted(call.args[0] for call in delete_blob.call_args_list),
+            sorted(uploaded),
+        )
+
+
+ASYNC_THUMBNAILS = {"webp": {"320": "https://blob/cat-320.webp"}}
+
+
+@mock.patch("app.async_views.create_thumbnails", return_value=ASYNC_THUMBNAILS)
+class AsyncGenerationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("async-user", password="pw")
+
+    def setUp(self):
+        get_prompt_cache().clear()
+
+    async def generate(self, prompt="고양이"):
+        await self.async_client.aforce_login(self.user)
+        return await self.async_client.post(
+            reverse("async_generate_image"), {"prompt": prompt}
+        )
+
+    async def test_generates_asset_usable_by_create_post(self, _):
+        with count_async_outbound_calls() as calls:
+            response = await self.generate()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            {name: calls[name].await_count for name in calls},
+            {"gpt": 0, "o3": 1, "dalle": 1, "blob": 1},
+        )
+
+        data = response.json()
+        asset = await GenerationAsset.objects.select_related("batch").aget(
+            id=data["generation_id"]
+        )
+        self.assertEqual(asset.image_url, data["image_url"])
+        self.assertEqual(asset.generated_prompt, "a cat")
+        self.assertEqual(asset.thumbnails, ASYNC_THUMBNAILS)
+        # 워커가 처리한 작업과 같이 작업 ID가 첫 번째 후보의 ID이고 슬롯은 반납된다
+        self.assertEqual(asset.batch.id, asset.id)
+        self.assertEqual(asset.batch.status, GenerationJob.STATUS_SUCCEEDED)
+        self.assertEqual(asset.batch.concurrency, 0)
+
+        # create_post는 generation_id로 이미지를 다시 복사하지 않고 연결한다
+        with mock.patch("app.views.get_post_image_analysis"), mock.patch(
+            "app.views.update_post_embedding"
+        ), mock.patch("app.views.save_image_to_blob") as save_image_to_blob:
+            await self.async_client.post(
+                reverse("create_post"),
+                {
+                    "title": "고양이",
+                    "content": "content",
+                    "generation_id": data["generation_id"],
+                },
+            )
+        save_image_to_blob.assert_not_called()
+        post = await Post.objects.aget(user=self.user)
+        self.assertEqual(post.image, asset.image_url)
+        self.assertEqual(post.asset_id, asset.id)
+        self.assertEqual(post.thumbnails, ASYNC_THUMBNAILS)
+        generation = await AIGeneration.objects.aget(user=self.user)
+        self.assertEqual(generation.batch_id, asset.batch_id)
+
+    async def test_failed_stage_is_recorded(self, _):
+        with count_async_outbound_calls() as calls:
+            calls["dalle"].side_effect = RuntimeError("DALL-E 장애")
+            response = await self.generate()
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.json()["error"], "이미지 생성에 실패했습니다.")
+        calls["blob"].assert_not_awaited()
+        job = await GenerationJob.objects.aget(user=self.user)
+        self.assertEqual(job.status, GenerationJob.STATUS_FAILED)
+        self.assertEqual(job.stage, GenerationJob.STAGE_IMAGE)
+        self.assertEqual(job.concurrency, 0)
+        self.assertFalse(await GenerationAsset.objects.filter(user=self.user).aexists())
+
+    async def test_respects_user_concurrency_limit(self, _):
+        # 워커에서 실행 중인 작업이 사용자의 슬롯을 모두 쓰고 있다
+        await GenerationJob.objects.acreate(
+            user=self.user,
+            prompt="다른 작업",
+            status=GenerationJob.STATUS_RUNNING,
+            concurrency=USER_MAX_CONCURRENCY,
+        )
+        with count_async_outbound_calls() as calls, mock.patch(
+            "app.jobs.SLOT_WAIT_TIMEOUT", 0.3
+        ), mock.patch("app.jobs._SLOT_POLL_INTERVAL", 0.1):
+            response = await self.generate()
+        self.assertEqual(response.status_code, 429)
+        calls["o3"].assert_not_awaited()
+        calls["dalle"].assert_not_awaited()
+        job = await GenerationJob.objects.exclude(prompt="다른 작업").aget()
+        self.assertEqual(job.status, GenerationJob.STATUS_FAILED)
+
+    async def test_concurrent_requests_share_user_slots(self, _):
+        in_flight = peak = 0
+
+        async def generate(**kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.05)
+            in_flight -= 1
+            return SimpleNamespace(data=[SimpleNamespace(url="https://dalle/cat.png")])
+
+        with count_async_outbound_calls() as calls, mock.patch(
+            "app.jobs.USER_MAX_CONCURRENCY", 2
+        ), mock.patch("app.jobs._SLOT_POLL_INTERVAL", 0.01):
+            calls["dalle"].side_effect = generate
+            await self.async_client.aforce_login(self.user)
+            responses = await asyncio.gather(
+                *(
+                    self.async_client.post(
+                        reverse("async_generate_image"),
+                        {"prompt": f"고양이 {i}", "force": "1"},
+                    )
+                    for i in range(4)
+                )
+            )
+        self.assertEqual([response.status_code for response in responses], [200] * 4)
+        self.assertEqual(calls["dalle"].await_count, 4)
+        self.assertEqual(peak, 2)
+
+
+class AsyncReadTextTests(TestCase):
+    def setUp(self):
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        patcher = mock.patch.object(tts_cache, "TTS_CACHE_DIR", Path(cache_dir.name))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.synthesis_calls = 0
+
+    async def fake_astream(self, text, voice=None, audio_format="mp3"):
+        self.synthesis_calls += 1
+        yield b"first"
+        yield b"second"
+
+    async def read_text(self, **headers):
+        return await self.async_client.get(
+            reverse("async_read_text"), {"caption": "caption"}, headers=headers
+        )
+
+    async def test_streams_then_serves_from_cache(self):
+        with mock.patch.object(tts_cache, "astream_text_to_speech", self.fake_astream):
+            response = await self.read_text()
+            self.assertTrue(response.streaming)
+            body = b"".join([chunk async for chunk in response.streaming_content])
+            self.assertEqual(body, b"firstsecond")
+
+            cached = await self.read_text()
+            self.assertEqual(cached.content, b"firstsecond")
+            self.assertEqual(
+                (await self.read_text(if_none_match=cached["ETag"])).status_code, 304
+            )
+        self.assertEqual(self.synthesis_calls, 1)
+
+    async def test_missing_caption(self):
+        response = await self.async_client.get(reverse("async_read_text"))
+        self.assertEqual(response.status_code, 400)
+
+
+class CachedAudioResponseTests(TestCase):
+    audio = b"0123456789"
+
+    def setUp(self):
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        path = Path(cache_dir.name) / "audio.mp3"
+        path.write_bytes(self.audio)
+        patcher = mock.patch(
+            "app.views.open_tts_audio", return_value=("key", path, None)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def read_text(self, **headers):
+        return self.client.get(
+            reverse("read_text"), {"caption": "caption"}, headers=headers
+        )
+
+    def test_full_response_has_validators(self):
+        response = self.read_text()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, self.audio)
+        self.assertEqual(response["ETag"], '"key"')
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+
+    def test_if_none_match(self):
+        response = self.read_text(if_none_match='"other", "key"')
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    def test_byte_ranges(self):
+        for header, content, content_range in [
+            ("bytes=2-5", b"2345", "bytes 2-5/10"),
+            ("bytes=7-", b"789", "bytes 7-9/10"),
+            ("bytes=-3", b"789", "bytes 7-9/10"),
+            ("bytes=8-100", b"89", "bytes 8-9/10"),
+        ]:
+            with self.subTest(header):
+                response = self.read_text(range=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(response.content, content)
+                self.assertEqual(response["Content-Range"], content_range)
+
+    def test_unsatisfiable_range(self):
+        response = self.read_text(range="bytes=10-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], "bytes */10")
+
+
+class GenerationJobTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("worker-user", password="pw")
+
+    def setUp(self):
+        get_prompt_cache().clear()
+
+    def create_job(self, **fields):
+        return GenerationJob.objects.create(user=self.user, prompt="고양이", **fields)
+
+    def make_stale(self, job):
+        # updated_at은 auto_now라 save()로는 과거 시각을 넣을 수 없다
+        GenerationJob.objects.filter(id=job.id).update(
+            updated_at=timezone.now() - timedelta(seconds=STALE_JOB_TIMEOUT + 1)
+        )
+
+    def test_claims_oldest_pending_job_once(self):
+        first = self.create_job()
+        second = self.create_job()
+        self.create_job(status=GenerationJob.STATUS_RUNNING)
+
+        claimed = claim_next_job("worker-1")
+        self.assertEqual(claimed.id, first.id)
+        self.assertEqual(claimed.status, GenerationJob.STATUS_RUNNING)
+        self.assertEqual(claimed.worker, "worker-1")
+        self.assertEqual(claimed.attempts, 1)
+        self.assertIsNotNone(claimed.started_at)
+
+        self.assertEqual(claim_next_job("worker-2").id, second.id)
+        self.assertIsNone(claim_next_job("worker-3"))
+
+    def test_claim_counts_attempts_in_the_claim_update(self):
+        self.create_job(attempts=1)
+        with CaptureQueriesContext(connection) as context:
+            claimed = claim_next_job("worker-1")
+        self.assertEqual(claimed.attempts, 2)
+        # 상태 변경과 시도 횟수 증가가 한 번의 UPDATE로 처리된다
+        updates = [
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].startswith("UPDATE")
+        ]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"attempts"', updates[0])
+
+    def test_requeues_or_fails_stale_jobs(self):
+        retry = self.create_job(
+            status=GenerationJob.STATUS_RUNNING, worker="dead", attempts=1
+        )
+        exhausted = self.create_job(
+            status=GenerationJob.STATUS_RUNNING,
+            worker="dead",
+            attempts=MAX_JOB_ATTEMPTS,
+        )
+        alive = self.create_job(
+            status=GenerationJob.STATUS_RUNNING, worker="alive", attempts=1
+        )
+        self.make_stale(retry)
+        self.make_stale(exhausted)
+
+        self.assertEqual(requeue_stale_jobs(), 1)
+        retry.refresh_from_db()
+        exhausted.refresh_from_db()
+        alive.refresh_from_db()
+        self.assertEqual(retry.status, GenerationJob.STATUS_PENDING)
+        self.assertEqual(retry.worker, "")
+        self.assertEqual(exhausted.status, GenerationJob.STATUS_FAILED)
+        self.assertTrue(exhausted.error)
+        self.assertIsNotNone(exhausted.finished_at)
+        self.assertEqual(alive.status, GenerationJob.STATUS_RUNNING)
+
+    def test_failed_stage_is_reported_by_status_view(self):
+        job = self.create_job()
+        with count_outbound_calls() as calls:
+            calls["dalle"].side_effect = RuntimeError("DALL-E 장애")
+            run_job(job)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, GenerationJob.STATUS_FAILED)
+        self.assertEqual(job.stage, GenerationJob.STAGE_IMAGE)
+        self.assertEqual(job.error, "이미지 생성에 실패했습니다.")
+        self.assertIsNotNone(job.finished_at)
+        calls["blob"].assert_not_called()
+
+        self.client.force_login(self.user)
+        data = self.client.get(reverse("generation_job_status", args=[job.id])).json()
+        self.assertEqual(data["status"], GenerationJob.STATUS_FAILED)
+        self.assertEqual(data["error"], "이미지 생성에 실패했습니다.")
+        self.assertEqual(
+            {stage["name"]: stage["status"] for stage in data["stages"]},
+            {
+                GenerationJob.STAGE_PROMPT: "done",
+                GenerationJob.STAGE_IMAGE: "failed",
+                GenerationJob.STAGE_UPLOAD: "pending",
+                GenerationJob.STAGE_THUMBNAILS: "pending",
+            },
+        )
+        self.assertNotIn("candidates", data)
+
+    def test_status_view_hides_other_users_jobs(self):
+        job = self.create_job()
+        other = User.objects.create_user("other", password="pw")
+        self.client.force_login(other)
+        response = self.client.get(reverse("generation_job_status", args=[job.id]))
+        self.assertEqual(response.status_code, 404)
+
+
+class BatchGenerationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("batcher", password="pw")
+
+    def setUp(self):
+        get_prompt_cache().clear()
+
+    def run_batch(self, candidate_count, max_concurrency, parallel):
+        """DALL-E 호출이 parallel개씩 모여야 진행되는 상태로 배치 작업 실행"""
+        in_flight = peak = 0
+        lock = threading.Lock()
+        barrier = threading.Barrier(parallel, timeout=5)
+
+        def generate(**kwargs):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            # parallel개가 동시에 호출되지 않으면 BrokenBarrierError로 후보가 빠진다
+            barrier.wait()
+            with lock:
+                in_flight -= 1
+            return SimpleNamespace(data=[SimpleNamespace(url="https://dalle/cat.png")])
+
+        job = GenerationJob.objects.create(
+            user=self.user, prompt="고양이", candidate_count=candidate_count
+        )
+        with count_outbound_calls() as calls, mock.patch(
+            "app.jobs.create_thumbnails", return_value={}
+        ), mock.patch("app.jobs.USER_MAX_CONCURRENCY", max_concurrency):
+            calls["dalle"].side_effect = generate
+            run_job(job)
+        return job, calls, peak
+
+    def test_batch_job_generates_candidates_concurrently(self):
+        job, calls, peak = self.run_batch(4, max_concurrency=2, parallel=2)
+        self.assertEqual(job.status, GenerationJob.STATUS_SUCCEEDED)
+        # 프롬프트는 한 번만 만들고 DALL-E 호출과 업로드는 후보마다 한 번씩
+        self.assertEqual(
+            {name: calls[name].call_count for name in ("o3", "dalle", "blob")},
+            {"o3": 1, "dalle": 4, "blob": 4},
+        )
+        # 사용자별 한도(2)만큼 동시에 호출하고 그보다 많이 호출하지 않는다
+        self.assertEqual(peak, 2)
+        self.assertEqual(job.concurrency, 0)
+
+        self.client.force_login(self.user)
+        data = self.client.get(reverse("generation_job_status", args=[job.id])).json()
+        self.assertEqual(data["candidate_count"], 4)
+        self.assertEqual(len(data["candidates"]), 4)
+        self.assertEqual(data["candidates"][0]["generation_id"], str(job.id))
+        self.assertEqual(GenerationAsset.objects.filter(batch=job).count(), 4)
+
+    def test_running_jobs_share_user_concurrency(self):
+        GenerationJob.objects.create(
+            user=self.user,
+            prompt="다른 작업",
+            status=GenerationJob.STATUS_RUNNING,
+            concurrency=3,
+        )
+        job, calls, peak = self.run_batch(4, max_concurrency=4, parallel=1)
+        # 다른 워커의 작업이 슬롯 3개를 쓰고 있으므로 하나씩 호출
+        self.assertEqual(job.status, GenerationJob.STATUS_SUCCEEDED)
+        self.assertEqual(calls["dalle"].call_count, 4)
+        self.assertEqual(peak, 1)
+
+    def run_without_slots(self, job):
+        """다른 작업이 사용자의 슬롯을 모두 쓰고 있는 상태에서 실행"""
+        GenerationJob.objects.create(
+            user=self.user,
+            prompt="다른 작업",
+            status=GenerationJob.STATUS_RUNNING,
+            concurrency=4,
+        )
+        with count_outbound_calls() as calls, mock.patch(
+            "app.jobs.SLOT_WAIT_TIMEOUT", 0.3
+        ), mock.patch("app.jobs._SLOT_POLL_INTERVAL", 0.1):
+            run_job(job)
+        self.assertEqual(calls["dalle"].call_count, 0)
+        return job
+
+    def test_requeues_when_no_slot_frees_up(self):
+        job = GenerationJob.objects.create(
+            user=self.user, prompt="고양이", candidate_count=2, attempts=1
+        )
+        newer = GenerationJob.objects.create(user=self.user, prompt="강아지")
+        before = job.updated_at
+        self.run_without_slots(job)
+        # 실패가 아니라 대기열로 돌아가고, 이번 시도는 횟수에 넣지 않는다
+        self.assertEqual(job.status, GenerationJob.STATUS_PENDING)
+        self.assertEqual(job.attempts, 0)
+        self.assertEqual(job.slot_waits, 1)
+        self.assertGreater(job.updated_at, before)
+
+        # 되돌린 작업은 대기 시간 동안 건너뛰고 뒤의 작업을 먼저 가져간다
+        self.assertEqual(claim_next_job("worker-1").id, newer.id)
+        self.assertIsNone(claim_next_job("worker-2"))
+        GenerationJob.objects.filter(id=job.id).update(
+            available_at=timezone.now() - timedelta(seconds=1)
+        )
+        self.assertEqual(claim_next_job("worker-2").id, job.id)
+
+    def test_fails_after_too_many_slot_waits(self):
+        job = GenerationJob.objects.create(
+            user=self.user, prompt="고양이", slot_waits=MAX_SLOT_WAITS, attempts=1
+        )
+        self.run_without_slots(job)
+        job.refresh_from_db()
+        self.assertEqual(job.status, GenerationJob.STATUS_FAILED)
+        self.assertTrue(job.error)
+        self.assertEqual(job.concurrency, 0)
+
+
+@mock.patch("app.curation.update_post_embedding")
+class CurationStreamTests(TestCase):
+    analysis = SimpleNamespace(caption="a cat", tags_text="cat")
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("curator", password="pw")
+        cls.post = Post.objects.create(
+            user=cls.user, title="고양이", content="content", image="cat.png"
+        )
+
+    @contextmanager
+    def generating(self):
+        """스타일 생성을 release가 설정될 때까지 멈춰두고 호출과 저장을 기록
+
+        생성 스레드는 테스트 트랜잭션 밖에서 실행되므로 저장은 기록만 한다.
+        """
+        calls = []
+        stored = queue.Queue()
+        release = threading.Event()
+
+        def stream_style_curation(style, combined_text, timeout):
+            calls.append(style)
+            release.wait(5)
+            yield f"{style} 큐레이션"
+
+        with mock.patch(
+            "app.curation.stream_style_curation", stream_style_curation
+        ), mock.patch(
+            "app.curation._store_curations",
+            side_effect=lambda post, curations: stored.put(curations),
+        ):
+            yield calls, stored, release
+            # 다음 테스트가 끝나가는 생성에 합류하지 않도록 정리될 때까지 기다린다
+            release.set()
+            deadline = time.monotonic() + 5
+            while curation._generations and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+    def stored_styles(self, stored):
+        styles = set()
+        while len(styles) < len(STYLE_PROMPTS):
+            styles.update(stored.get(timeout=5))
+        return styles
+
+    def test_concurrent_viewers_share_generation(self, _):
+        results = []
+
+        def view():
+            results.append(
+                list(stream_post_curations(self.post, self.analysis, {}, timeout=5))
+            )
+
+        with self.generating() as (calls, stored, release):
+            viewers = [threading.Thread(target=view) for _ in range(2)]
+            for viewer in viewers:
+                viewer.start()
+            # 두 번째 조회가 진행 중인 생성에 합류할 때까지 기다린다
+            while len(calls) < len(STYLE_PROMPTS):
+                time.sleep(0.01)
+            release.set()
+            for viewer in viewers:
+                viewer.join(5)
+            self.assertEqual(self.stored_styles(stored), set(STYLE_PROMPTS))
+
+        # 두 요청이 같은 생성을 함께 받으므로 스타일마다 한 번만 호출
+        self.assertEqual(sorted(calls), sorted(STYLE_PROMPTS))
+        self.assertEqual(len(results), 2)
+        for events in results:
+            curations = {
+                data["style"]: data["text"]
+                for event, data in events
+                if event == "curation"
+            }
+            self.assertEqual(set(curations), set(STYLE_PROMPTS))
+            self.assertEqual(curations["Critical"], "Critical 큐레이션")
+
+    def test_generation_continues_after_timeout(self, _):
+        with self.generating() as (calls, stored, release):
+            events = list(
+                stream_post_curations(self.post, self.analysis, {}, timeout=0.1)
+            )
+            self.assertEqual({event for event, _ in events}, {"error"})
+            release.set()
+            # 기다리던 요청이 끝나도 생성은 끝까지 진행되어 저장된다
+            self.assertEqual(self.stored_styles(stored), set(STYLE_PROMPTS))
+
+    def test_regenerate_discards_in_flight_generation(self, _):
+        with self.generating() as (calls, stored, release):
+            list(stream_post_curations(self.post, self.analysis, {}, timeout=0.1))
+            in_flight = list(curation._generations.values())
+            self.assertEqual(len(in_flight), len(STYLE_PROMPTS))
+
+            regenerate_post_curations(self.post)
+            # 다시 조회하면 취소된 생성에 합류하지 않고 새로 생성한다
+            list(stream_post_curations(self.post, self.analysis, {}, timeout=0.1))
+            self.assertEqual(len(calls), 2 * len(STYLE_PROMPTS))
+
+            release.set()
+            self.assertEqual(self.stored_styles(stored), set(STYLE_PROMPTS))
+            deadline = time.monotonic() + 5
+            while not all(generation._done for generation in in_flight):
+                self.assertLess(time.monotonic(), deadline)
+                time.sleep(0.01)
+        # 취소된 생성의 이전 결과는 저장되지 않는다
+        self.assertTrue(stored.empty())
+
+    def test_regenerate_does_not_generate_in_request(self, _):
+        PostCuration.objects.create(
+            post=self.post, style="Critical", prompt_version=1, text="이전"
+        )
+        self.client.force_login(self.user)
+        with mock.patch("app.curation.stream_style_curation") as stream:
+            response = self.client.post(
+                reverse("regenerate_curation", args=[self.post.pk])
+            )
+        self.assertRedirects(
+            response,
+            reverse("post_detail", args=[self.post.pk]),
+            fetch_redirect_response=False,
+        )
+        stream.assert_not_called()
+        self.assertFalse(PostCuration.objects.filter(post=self.post).exists())
+
+
+def unit_vector(*values):
+    vector = np.asarray(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+class EmbeddingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("embedder", password="pw")
+        cls.other = User.objects.create_user("stranger", password="pw")
+
+    def create_post(self, title, vector=None, user=None, is_public=True):
+        post = Post.objects.create(
+            user=user or self.user,
+            title=title,
+            content="content",
+            is_public=is_public,
+        )
+        if vector is not None:
+            self.store_vector(post, vector)
+        return post
+
+    def store_vector(self, post, vector):
+        PostEmbedding.objects.update_or_create(
+            post=post,
+            defaults={
+                "model": EMBEDDING_DEPLOYMENT,
+                "dimensions": len(vector),
+                "vector": vector_to_bytes(vector),
+                "source_hash": "",
+            },
+        )
+
+    def test_embedding_text_uses_current_curations_only(self):
+        post = self.create_post("고양이")
+        PostCuration.objects.create(
+            post=post,
+            style="Critical",
+            prompt_version=CURATION_PROMPT_VERSION,
+            text="현재 큐레이션",
+        )
+        PostCuration.objects.create(
+            post=post,
+            style="Emotional",
+            prompt_version=CURATION_PROMPT_VERSION - 1,
+            text="이전 큐레이션",
+        )
+        text = build_embedding_text(post)
+        self.assertIn("현재 큐레이션", text)
+        self.assertNotIn("이전 큐레이션", text)
+
+    def test_unchanged_text_is_not_embedded_again(self):
+        post = self.create_post("고양이")
+        with mock.patch(
+            "app.embeddings.embed_texts", return_value=[unit_vector(1, 0, 0)]
+        ) as embed:
+            update_post_embedding(post)
+            update_post_embedding(post)
+            post.title = "강아지"
+            update_post_embedding(post)
+        self.assertEqual(embed.call_count, 2)
+        self.assertEqual(PostEmbedding.objects.filter(post=post).count(), 1)
+
+    def test_index_refreshes_incrementally_and_rebuilds_on_delete(self):
+        cat = self.create_post("고양이", unit_vector(1, 0, 0))
+        tiger = self.create_post("호랑이", unit_vector(1, 1, 0))
+        index = EmbeddingIndex()
+        index.refresh(force=True)
+        self.assertEqual(len(index), 2)
+
+        dog = self.create_post("강아지", unit_vector(0, 1, 0))
+        self.store_vector(cat, unit_vector(0, 0, 1))
+        with mock.patch.object(index, "_rebuild") as rebuild:
+            index.refresh(force=True)
+        # 바뀐 행만 반영하고 전체를 다시 읽지 않는다
+        rebuild.assert_not_called()
+        self.assertEqual(len(index), 3)
+        np.testing.assert_allclose(index.vector_for(cat.pk), unit_vector(0, 0, 1))
+        self.assertEqual(
+            [post_id for post_id, _ in index.search(unit_vector(0, 1, 0), 2)],
+            [dog.pk, tiger.pk],
+        )
+
+        dog.delete()
+        index.refresh(force=True)
+        self.assertEqual(len(index), 2)
+        self.assertIsNone(index.vector_for(dog.pk))
+        self.assertEqual(
+            [post_id for post_id, _ in index.search(unit_vector(0, 1, 0), 5)],
+            [tiger.pk, cat.pk],
+        )
+
+    def test_search_excludes_ids(self):
+        cat = self.create_post("고양이", unit_vector(1, 0, 0))
+        tiger = self.create_post("호랑이", unit_vector(1, 1, 0))
+        index = EmbeddingIndex()
+        index.refresh(force=True)
+        results = index.search(unit_vector(1, 0, 0), 5, exclude_ids={cat.pk})
+        self.assertEqual([post_id for post_id, _ in results], [tiger.pk])
+
+    def test_similar_post_list_returns_visible_posts_by_similarity(self):
+        cat = self.create_post("고양이", unit_vector(1, 0, 0))
+        tiger = self.create_post("호랑이", unit_vector(1, 0.2, 0))
+        lion = self.create_post("사자", unit_vector(1, 1, 0))
+        self.create_post(
+            "비공개", unit_vector(1, 0.1, 0), user=self.other, is_public=False
+        )
+        self.create_post("임베딩 없음")
+
+        with mock.patch("app.embeddings._index", EmbeddingIndex()):
+            data = self.client.get(reverse("similar_post_list", args=[cat.pk])).json()
+        # 다른 사용자의 비공개 게시물과 자기 자신은 빠진다
+        self.assertEqual([post["id"] for post in data["posts"]], [tiger.pk, lion.pk])
+        self.assertGreater(data["posts"][0]["score"], data["posts"][1]["score"])
+
+    def test_semantic_search_ranks_within_visible_posts(self):
+        # 다른 사용자의 더 비슷한 게시물이 전체 상위 후보를 모두 차지해도
+        for i in range(12):
+            self.create_post(
+                f"남의 고양이 {i}", unit_vector(1, 0.01 * i, 0), self.other
+            )
+        mine = self.create_post("내 고양이", unit_vector(1, 1, 0))
+        self.create_post("내 강아지", unit_vector(0, 0, 1))
+
+        with mock.patch("app.embeddings._index", EmbeddingIndex()), mock.patch(
+            "app.embeddings.embed_query", return_value=unit_vector(1, 0, 0)
+        ):
+            posts = semantic_search(Post.objects.filter(user=self.user), "고양이", 1)
+        self.assertEqual([post.pk for post in posts], [mine.pk])
+
+    def test_index_picks_up_late_committed_rows(self):
+        cat = self.create_post("고양이", unit_vector(1, 0, 0))
+        dog = self.create_post("강아지", unit_vector(0, 1, 0))
+        index = EmbeddingIndex()
+        index.refresh(force=True)
+        synced_until = index._synced_until
+
+        # 먼저 저장을 시작했지만 늦게 커밋되어 updated_at이 마지막으로 본 시각보다 이른 수정
+        # (행 수가 그대로라 개수 비교로는 알 수 없다)
+        self.store_vector(dog, unit_vector(0, 0, 1))
+        PostEmbedding.objects.filter(post=dog).update(
+            updated_at=synced_until - timedelta(seconds=1)
+        )
+        index.refresh(force=True)
+        np.testing.assert_allclose(index.vector_for(dog.pk), unit_vector(0, 0, 1))
+        np.testing.assert_allclose(index.vector_for(cat.pk), unit_vector(1, 0, 0))
+
+    def test_refresh_does_not_modify_matrix_in_use(self):
+        cat = self.create_post("고양이", unit_vector(1, 0, 0))
+        self.create_post("강아지", unit_vector(0, 1, 0))
+        index = EmbeddingIndex()
+        index.refresh(force=True)
+        in_use = index._matrix
+        before = in_use.copy()
+
+        self.store_vector(cat, unit_vector(0, 0, 1))
+        self.create_post("호랑이", unit_vector(1, 1, 0))
+        index.refresh(force=True)
+        # 검색 중인 요청이 가져간 행렬은 그대로이고 새 행렬에 반영된다
+        np.testing.assert_array_equal(in_use, before)
+        self.assertIsNot(index._matrix, in_use)
+        np.testing.assert_allclose(index.vector_for(cat.pk), unit_vector(0, 0, 1))
+
+    @mock.patch("app.views.update_post_embedding")
+    def test_editing_title_refreshes_embedding(self, update_post_embedding):
+        post = self.create_post("고양이")
+        self.client.force_login(self.user)
+        url = reverse("edit_post", args=[post.pk])
+
+        self.client.post(url, {"title": "고양이", "content": "새 내용"})
+        update_post_embedding.assert_not_called()
+
+        self.client.post(url, {"title": "호랑이", "content": "새 내용"})
+        update_post_embedding.assert_called_once()
+        self.assertEqual(update_post_embedding.call_args.args[0].title, "호랑이")
+
+
+class DuplicateGenerationTests(TestCase):
+    prompt = "a fluffy orange cat sleeping on a red velvet sofa at sunset"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("duplicator", password="pw")
+
+    def create_generation(self, prompt=prompt, days_ago=0, user=None):
+        asset = GenerationAsset.objects.create(
+            id=uuid.uuid4(),
+            user=user or self.user,
+            prompt=prompt,
+            blob_name="cat.png",
+            image_url="https://account.blob.core.windows.net/images/cat.png",
+        )
+        index_generation_prompt(asset)
+        PromptFingerprint.objects.filter(asset=asset).update(
+            created_at=timezone.now() - timedelta(days=days_ago)
+        )
+        return asset
+
+    def test_finds_recent_duplicate(self):
+        asset = self.create_generation()
+        duplicate = find_duplicate_generation(self.user, self.prompt + "!")
+        self.assertEqual(duplicate, asset)
+        self.assertGreaterEqual(duplicate.similarity, 0.8)
+
+    def test_ignores_different_prompt_and_other_users(self):
+        self.create_generation(user=User.objects.create_user("someone", password="pw"))
+        self.create_generation("a lighthouse in a storm, oil painting")
+        self.assertIsNone(find_duplicate_generation(self.user, self.prompt))
+
+    def test_threshold(self):
+        self.create_generation()
+        with mock.patch("app.duplicates.DUPLICATE_PROMPT_THRESHOLD", 1.01):
+            self.assertIsNone(find_duplicate_generation(self.user, self.prompt))
+
+    def test_ignores_generations_older_than_lookback(self):
+        self.create_generation(days_ago=31)
+        self.assertIsNone(find_duplicate_generation(self.user, self.prompt))
+
+    def test_old_candidates_do_not_hide_recent_duplicate(self):
+        for _ in range(3):
+            self.create_generation(days_ago=40)
+        recent = self.create_generation(days_ago=1)
+        with mock.patch("app.duplicates.DUPLICATE_MAX_CANDIDATES", 1):
+            self.assertEqual(find_duplicate_generation(self.user, self.prompt), recent)
+
+    def test_generate_view_suggests_duplicate_unless_forced(self):
+        asset = self.create_generation()
+        self.client.force_login(self.user)
+        url = reverse("generate_image")
+
+        response = self.client.post(url, {"prompt": self.prompt})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["duplicate"]["generation_id"], str(asset.id))
+        self.assertFalse(GenerationJob.objects.exists())
 
-# Create your tests here.
+        response = self.client.post(url, {"prompt": self.prompt, "force": "1"})
+        self.assertEqual(response.status_code, 202)
+        self.assertTrue(GenerationJob.objects.filter(user=self.user).exists())
@@ -0,0 +1,67 @@
+import logging
+
+from django.conf import settings
+
+from util.common.azure_storage import (
+    blob_name_from_url,
+    delete_blob,
+    download_blob,
+    get_http_session,
+    is_blob_url,
+    upload_blob,
+)
+from util.common.image_derivatives import DERIVATIVE_FORMATS, build_derivatives
+
+# 갤러리용 썸네일 너비(px)와 포맷 (AVIF는 Pillow가 지원할 때만 생성)
+THUMBNAIL_WIDTHS = getattr(settings, "THUMBNAIL_WIDTHS", [320, 640, 1024])
+THUMBNAIL_FORMATS = getattr(settings, "THUMBNAIL_FORMATS", ["avif", "webp"])
+
+
+def derivative_blob_name(blob_name, width, fmt):
+    """원본 Blob 옆에 저장할 파생 이미지 이름 (예: a.png → a_w320.webp)"""
+    stem = blob_name.rsplit(".", 1)[0]
+    return f"{stem}_w{width}.{DERIVATIVE_FORMATS[fmt][2]}"
+
+
+def _read_original(image_url):
+    if is_blob_url(image_url):
+        return download_blob(blob_name_from_url(image_url))
+    response = get_http_session().get(image_url, timeout=60)
+    response.raise_for_status()
+    return response.content
+
+
+def create_thumbnails(image_url):
+    """원본 이미지의 썸네일을 만들어 Blob에 저장하고 {포맷: {너비: URL}} 반환"""
+    blob_name = blob_name_from_url(image_url)
+    thumbnails = {}
+    for width, fmt, data, content_type in build_derivatives(
+        _read_original(image_url), THUMBNAIL_WIDTHS, THUMBNAIL_FORMATS
+    ):
+        url = upload_blob(
+            derivative_blob_name(blob_name, width, fmt),
+            data,
+            content_type=content_type,
+        )
+        thumbnails.setdefault(fmt, {})[str(width)] = url
+    logging.info(f"썸네일 생성 완료: {blob_name} ({', '.join(thumbnails)})")
+    return thumbnails
+
+
+def generate_post_thumbnails(post):
+    """게시물 이미지의 썸네일을 생성해 저장 (실패 시 원본 이미지만 사용)"""
+    if not post.image:
+        return {}
+    try:
+        post.thumbnails = create_thumbnails(post.image)
+    except Exception as e:
+        logging.error(f"게시물 {post.pk} 썸네일 생성 실패: {str(e)}")
+        return {}
+    post.save(update_fields=["thumbnails"])
+    return post.thumbnails
+
+
+def delete_thumbnails(thumbnails):
+    for urls in thumbnails.values():
+        for url in urls.values():
+            delete_blob(blob_name_from_url(url))
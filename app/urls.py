@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import async_views, views
 
 urlpatterns = [
     path("", views.home, name="home"),
@@ -7,13 +7,38 @@ urlpatterns = [
     # AI Playground
     path("create/", views.create_post, name="create_post"),
     path("ai/generate/", views.generate_image, name="generate_image"),
+    path(
+        "ai/jobs/<uuid:job_id>/",
+        views.generation_job_status,
+        name="generation_job_status",
+    ),
     # Artwork
     path("artwork/my/", views.my_gallery, name="my_gallery"),
     path("artwork/public/", views.public_gallery, name="public_gallery"),
+    path(
+        "artwork/feed/<str:gallery_type>/",
+        views.gallery_feed,
+        name="gallery_feed",
+    ),
     # Post Detail & Comments
     path("posts/<int:pk>/", views.post_detail, name="post_detail"),
     path("posts/<int:pk>/edit/", views.edit_post, name="edit_post"),
     path("posts/<int:pk>/delete/", views.delete_post, name="delete_post"),
+    path(
+        "posts/<int:pk>/similar/",
+        views.similar_post_list,
+        name="similar_post_list",
+    ),
+    path(
+        "posts/<int:pk>/curation/stream/",
+        views.curation_stream,
+        name="curation_stream",
+    ),
+    path(
+        "posts/<int:pk>/curation/regenerate/",
+        views.regenerate_curation,
+        name="regenerate_curation",
+    ),
     path(
         "posts/<int:post_id>/comments/",
         views.comment_list_create,
@@ -22,4 +47,16 @@ urlpatterns = [
     path("comments/<int:pk>/", views.comment_detail, name="comment_detail"),
     # 추가: read_text 뷰 URL 패턴
     path("read_text/", views.read_text, name="read_text"),
+    # ASGI 서버용 async 뷰 (생성은 작업 등록 대신 결과를 바로 반환)
+    path(
+        "async/ai/generate/",
+        async_views.generate_image,
+        name="async_generate_image",
+    ),
+    path(
+        "async/posts/<int:post_id>/comments/",
+        async_views.comment_list_create,
+        name="async_comment_list_create",
+    ),
+    path("async/read_text/", async_views.read_text, name="async_read_text"),
 ]
@@ -1,246 +1,213 @@
 import os
 import re
 import logging
+from asgiref.sync import async_to_sync, sync_to_async
 from django.contrib.auth.decorators import login_required
-from django.http import HttpRequest, HttpResponse, JsonResponse
-from django.shortcuts import render, get_object_or_404, redirect
-from django.views.decorators.http import require_http_methods
-from azure.storage.blob import BlobServiceClient
+from django.http import (
+    HttpRequest,
+    HttpResponse,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.db.models import Count, Max, Q
+from django.shortcuts import aget_object_or_404, render, get_object_or_404, redirect
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.views.decorators.http import condition, require_http_methods
 from django.conf import settings
-from openai import AzureOpenAI
-import requests
 import uuid
 import json
-from datetime import datetime
+import hashlib
 
-from util.common.azure_computer_vision import get_image_caption_and_tags
-from util.common.azure_speech import synthesize_text_to_speech
-from django.views.decorators.http import require_GET
+from util.common.azure_storage import is_blob_url
+from util.common.azure_openai import get_client
+from util.common.generation import save_image_to_blob
+from util.common.timing import StageTimer
+from util.common.azure_speech import TTS_AUDIO_FORMATS
+from util.common.tts_cache import TTS_AUDIO_FORMAT, open_tts_audio
+from django.views.decorators.http import require_GET, require_POST
 
 from .forms import PostWithAIForm, PostEditForm
-from .models import Post, AIGeneration, Comment
-
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    handlers=[logging.FileHandler("ai_generation.log"), logging.StreamHandler()],
-)
-
-GPT_CLIENT = AzureOpenAI(
-    azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
-    api_key=settings.AZURE_OPENAI_API_KEY,
-    api_version=settings.AZURE_OPENAI_API_VERSION,
+from .models import Post, AIGeneration, Comment, GenerationAsset, GenerationJob
+from .image_analysis import (
+    aget_post_image_analysis,
+    get_post_image_analysis,
+    get_stored_image_analysis,
 )
-
-DALLE_CLIENT = AzureOpenAI(
-    azure_endpoint=settings.AZURE_DALLE_ENDPOINT,
-    api_key=settings.AZURE_DALLE_API_KEY,
-    api_version=settings.AZURE_DALLE_API_VERSION,
+from .thumbnails import generate_post_thumbnails
+from .page_cache import (
+    GALLERY_SCOPE,
+    PAGE_CACHE_TIMEOUT,
+    cache_anonymous_page,
+    get_cache_version,
+    post_scope,
 )
-
-
-GPT_CLIENT_o3 = AzureOpenAI(
-    azure_endpoint=settings.AZURE_3OMINI_ENDPOINT,
-    api_key=settings.AZURE_3OMINI_API_KEY,
-    api_version=settings.AZURE_3OMINI_API_VERSION,
+from .pagination import GALLERY_PAGE_SIZE, InvalidCursor, keyset_page
+from .duplicates import find_duplicate_generation
+from .jobs import MAX_BATCH_CANDIDATES
+from .embeddings import semantic_search, similar_posts, update_post_embedding
+from .search import search_posts
+from .curation import (
+    STYLE_PROMPTS,
+    aload_stored_curations,
+    load_stored_curations,
+    regenerate_post_curations,
+    stream_post_curations,
 )
 
 
-def generate_prompt_with_gpt3o(user_input):
-    try:
-        print("GPT-3o-mini를 사용해 프롬프트를 생성합니다...")
-
-        response = GPT_CLIENT_o3.chat.completions.create(
-            model="team6-o3-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": """You are an expert in converting user's natural language descriptions into DALL-E image generation prompts.
-            Please generate prompts according to the following guidelines:
-
-            ##Main Guidelines
-
-            1. Carefully analyze the user's description to identify key elements.
-            2. Use clear and specific language to write the prompt.
-            3. Include details such as the main subject, style, composition, color, and lighting of the image.
-            4. Appro-priately utilize artistic references or cultural elements to enrich the prompt.
-            5. Add instructions about image quality or resolution if necessary.
-            6. Evaluate if the user's request might violate DALL-E's content policy. If there's a possibility of violation, include a message in the user's original language: "This content may be blocked by DALL-E. Please try a different approach." and explain why blocked.
-            7. Always provide the prompt in English, regardless of the language used in the user's request.
-
-            ##Prompt Structure
-
-            - Specify the main subject first, then add details.
-            - Use adjectives and adverbs effectively to convey the mood and style of the image.
-            - Specify the composition or perspective of the image if needed.
-
-            ##Precautions
-
-            - Do not directly mention copyrighted characters or brands.
-            - Avoid violent or inappropriate content.
-            - Avoid overly complex or ambiguous descriptions, maintain clarity.
-            - Avoid words related to violence, adult content, gore, politics, or drugs.
-            - Do not use names of real people.
-            - Avoid directly mentioning specific body parts.
-
-            ##Using Alternative Expressions
-
-            Consider DALL-E's strict content policy and use visual synonyms with similar meanings to prohibited words. Examples:
-
-            - "shooting star" → "meteor" or "falling star"
-            - "exploding" → "bursting" or "expanding"
-
-            ##Example Prompt Format
-
-            "[Style/mood] image of [main subject]. [Detailed description]. [Composition/perspective]. [Color/lighting information]." Follow these guidelines to convert the user's description into a DALL-E-appropriate prompt. The prompt should be creative yet easy for AI to understand. If there's a possibility of content policy violation, notify the user and suggest alternatives.""",
-                },
-                {"role": "user", "content": user_input},
-            ],
-        )
+def duplicate_generation_response(duplicate):
+    return JsonResponse(
+        {
+            "duplicate": {
+                "generation_id": str(duplicate.id),
+                "prompt": duplicate.prompt,
+                "generated_prompt": duplicate.generated_prompt,
+                "image_url": duplicate.image_url,
+                "similarity": round(duplicate.similarity, 2),
+                "created_at": duplicate.created_at.isoformat(),
+            }
+        }
+    )
 
-        if response.choices and len(response.choices) > 0:
-            return response.choices[0].message.content
-        else:
-            print("응답을 생성하지 못했습니다.")
-            return None
 
-    except Exception as e:
-        print("GPT-3o-mini 호출 중 예외 발생:", str(e))
-        return None
+@login_required
+def generate_image(request):
+    """이미지 생성 작업 등록 뷰 (실제 생성은 run_generation_worker가 처리)"""
+    if request.method != "POST":
+        return JsonResponse({"error": "POST method required"}, status=405)
 
+    prompt = request.POST.get("prompt", "").strip()
+    if not prompt:
+        return JsonResponse({"error": "프롬프트를 입력해주세요."}, status=400)
 
-def generate_prompt_with_gpt4o(user_input):
-    """GPT-4o를 사용해 DALL-E 3 프롬프트 생성"""
     try:
-        logging.info("GPT-4o를 사용해 프롬프트를 생성합니다...")
-
-        response = GPT_CLIENT.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {
-                    "role": "system",
-                    "content": """You are an expert in converting user's natural language descriptions into DALL-E image generation prompts.
-                    Please generate prompts according to the following guidelines:
-
-                    ## Main Guidelines
-                    1. Carefully analyse the user's description to identify key elements.
-                    2. Use clear and specific language to write the prompt.
-                    3. Include details such as the main subject, style, composition, colour, and lighting.
-                    4. Appropriately utilise artistic references or cultural elements.
-                    5. Add instructions about image quality or resolution if necessary.
-                    6. Evaluate content policy violations and notify if blocked.
-                    7. Always provide the prompt in English.
-
-                    ## Prompt Structure
-                    - Specify the main subject first, then add details.
-                    - Use adjectives and adverbs for mood and style.
-                    - Specify composition or perspective if needed.
-
-                    ## Precautions
-                    - No copyrighted characters or brands
-                    - No violent or inappropriate content
-                    - Avoid complex or ambiguous descriptions
-                    - No words related to violence, adult content, gore, politics, or drugs
-                    - No names or real people
-                    - No specific body parts
-
-                    ## Format Example:
-                    "[Style/mood] image of [main subject]. [Detailed description]. [Composition]. [Colour/lighting]."
-                    """,
-                },
-                {"role": "user", "content": user_input},
-            ],
-            temperature=0.7,
+        candidate_count = int(request.POST.get("candidates") or 1)
+    except ValueError:
+        candidate_count = 0
+    if not 1 <= candidate_count <= MAX_BATCH_CANDIDATES:
+        return JsonResponse(
+            {"error": f"후보 수는 1~{MAX_BATCH_CANDIDATES}개 사이여야 합니다."},
+            status=400,
         )
 
-        if response.choices and len(response.choices) > 0:
-            generated_prompt = response.choices[0].message.content.strip()
-            logging.info(f"생성된 프롬프트: {generated_prompt}")
-            return generated_prompt
-        return None
+    if not request.POST.get("force"):
+        # 최근에 거의 같은 프롬프트로 만든 이미지가 있으면 먼저 재사용을 제안
+        duplicate = find_duplicate_generation(request.user, prompt)
+        if duplicate:
+            return duplicate_generation_response(duplicate)
 
-    except Exception as e:
-        logging.error(f"GPT-4o 호출 중 예외 발생: {str(e)}", exc_info=True)
-        return None
-
-
-def save_image_to_blob(image_url, prompt, user_id):
-    """이미지를 Azure Blob Storage에 저장"""
-    try:
-        response = requests.get(image_url, stream=True)
-        response.raise_for_status()
-
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        unique_id = str(uuid.uuid4())[:8]
+    job = GenerationJob.objects.create(
+        user=request.user, prompt=prompt, candidate_count=candidate_count
+    )
+    logging.info(f"이미지 생성 작업이 등록되었습니다: {job.id}")
+    return JsonResponse(
+        {
+            "job_id": str(job.id),
+            "status": job.status,
+            "status_url": reverse("generation_job_status", args=[job.id]),
+        },
+        status=202,
+    )
 
-        sanitised_prompt = re.sub(r'[<>:"/\\|?*]', "", prompt[:20]).strip()
-        filename = f"user_{user_id}_{timestamp}_{unique_id}_{sanitised_prompt}.png"
 
-        blob_service_client = BlobServiceClient.from_connection_string(
-            settings.AZURE_CONNECTION_STRING
-        )
-        blob_client = blob_service_client.get_blob_client(
-            container=settings.CONTAINER_NAME, blob=filename
+@login_required
+@require_GET
+def generation_job_status(request, job_id):
+    """이미지 생성 작업 진행 상황 조회"""
+    job = get_object_or_404(GenerationJob, id=job_id, user=request.user)
+
+    stages = []
+    current_index = (
+        GenerationJob.PIPELINE_STAGES.index(job.stage)
+        if job.stage in GenerationJob.PIPELINE_STAGES
+        else None
+    )
+    for index, stage in enumerate(GenerationJob.PIPELINE_STAGES):
+        if index == current_index and job.status == GenerationJob.STATUS_FAILED:
+            stage_status = "failed"
+        elif job.stage == GenerationJob.STAGE_DONE or stage in job.stage_timings:
+            stage_status = "done"
+        elif index == current_index:
+            stage_status = "running"
+        else:
+            stage_status = "pending"
+        stages.append(
+            {
+                "name": stage,
+                "status": stage_status,
+                "elapsed": job.stage_timings.get(stage),
+            }
         )
 
-        blob_client.upload_blob(response.content, overwrite=True)
-        logging.info(f"이미지가 Blob Storage에 저장되었습니다: {filename}")
-        return blob_client.url
-
-    except Exception as e:
-        logging.error(f"Blob Storage 저장 중 오류 발생: {str(e)}", exc_info=True)
-        return None
-
-
-def generate_image_with_dalle(prompt):
-    """DALL-E를 사용해 이미지를 생성"""
-    try:
-        logging.info("DALL-E를 사용해 이미지를 생성합니다...")
-
-        result = DALLE_CLIENT.images.generate(model="dall-e-3", prompt=prompt, n=1)
-
-        if result and result.data:
-            image_url = result.data[0].url
-            logging.info(f"DALL-E 호출 성공! 생성된 이미지 URL: {image_url}")
-            return image_url
-        return None
-
-    except Exception as e:
-        logging.error(f"DALL-E 호출 중 예외 발생: {str(e)}", exc_info=True)
-        return None
-
-
-@login_required
-def generate_image(request):
-    """이미지 생성 뷰"""
-    if request.method != "POST":
-        return JsonResponse({"error": "POST method required"}, status=405)
+    data = {
+        "job_id": str(job.id),
+        "status": job.status,
+        "stage": job.stage,
+        "stages": stages,
+        "candidate_count": job.candidate_count,
+    }
+    if job.status == GenerationJob.STATUS_SUCCEEDED:
+        data["generation_id"] = str(job.id)
+        data["image_url"] = job.image_url
+        data["generated_prompt"] = job.generated_prompt
+        # 첫 번째 후보(작업 ID와 같은 에셋)가 맨 앞에 오도록 정렬
+        data["candidates"] = [
+            {
+                "generation_id": str(asset.id),
+                "image_url": asset.image_url,
+                "thumbnails": asset.thumbnails,
+            }
+            for asset in sorted(
+                job.candidates.order_by("created_at"),
+                key=lambda asset: asset.id != job.id,
+            )
+        ]
+    elif job.status == GenerationJob.STATUS_FAILED:
+        data["error"] = job.error
+    return JsonResponse(data)
 
-    prompt = request.POST.get("prompt", "").strip()
-    if not prompt:
-        return JsonResponse({"error": "프롬프트를 입력해주세요."}, status=400)
 
-    try:
-        # generated_prompt = generate_prompt_with_gpt4o(prompt)
-        generated_prompt = generate_prompt_with_gpt3o(prompt)
-        if not generated_prompt:
-            return JsonResponse({"error": "프롬프트 생성에 실패했습니다."}, status=500)
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
 
-        image_url = generate_image_with_dalle(generated_prompt)
-        if not image_url:
-            return JsonResponse({"error": "이미지 생성에 실패했습니다."}, status=500)
 
-        blob_url = save_image_to_blob(image_url, generated_prompt, request.user.id)
-        if not blob_url:
-            return JsonResponse({"error": "이미지 저장에 실패했습니다."}, status=500)
+def _cached_audio_response(request, path, etag, content_type):
+    """캐시된 음성 파일 응답 (If-None-Match, 단일 Range 요청 지원)"""
+    if etag in [
+        tag.strip() for tag in request.headers.get("If-None-Match", "").split(",")
+    ]:
+        response = HttpResponse(status=304)
+        response["ETag"] = etag
+        return response
 
-        return JsonResponse(
-            {"image_url": blob_url, "generated_prompt": generated_prompt}
-        )
+    with open(path, "rb") as f:
+        audio_data = f.read()
+    size = len(audio_data)
 
-    except Exception as e:
-        logging.error(f"이미지 생성 중 오류 발생: {str(e)}", exc_info=True)
-        return JsonResponse({"error": str(e)}, status=500)
+    status = 200
+    match = _RANGE_RE.match(request.headers.get("Range", "").strip())
+    if match and match.group(1) + match.group(2):
+        first, last = match.groups()
+        if first:
+            start, end = int(first), min(int(last or size - 1), size - 1)
+        else:
+            start, end = max(size - int(last), 0), size - 1
+        if start > end or start >= size:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+        audio_data = audio_data[start : end + 1]
+        status = 206
+
+    response = HttpResponse(audio_data, content_type=content_type, status=status)
+    if status == 206:
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    response["Cache-Control"] = "public, max-age=86400"
+    return response
 
 
 @require_GET
@@ -249,15 +216,16 @@ def read_text(request: HttpRequest) -> HttpResponse:
     if not caption:
         return JsonResponse({"error": "캡션이 제공되지 않았습니다."}, status=400)
     try:
-        audio_data = synthesize_text_to_speech(caption)
-        if not audio_data:
-            raise Exception("음성 데이터를 생성하지 못했습니다.")
-        response = HttpResponse(audio_data, content_type="audio/wav")
-        response["Content-Disposition"] = 'attachment; filename="caption.wav"'
+        _, content_type, extension = TTS_AUDIO_FORMATS[TTS_AUDIO_FORMAT]
+        key, path, chunks = open_tts_audio(caption)
+        if path is not None:
+            response = _cached_audio_response(request, path, f'"{key}"', content_type)
+        else:
+            # 캐시에 없으면 합성되는 대로 바로 전송 (전송이 끝나면 캐시에 저장됨)
+            response = StreamingHttpResponse(chunks, content_type=content_type)
+        response["Content-Disposition"] = f'inline; filename="caption.{extension}"'
         return response
     except Exception as e:
-        import logging
-
         logging.error("read_text 에러", exc_info=True)
         return JsonResponse({"error": str(e)}, status=500)
 
@@ -277,26 +245,94 @@ def index(request: HttpRequest) -> HttpResponse:
     return render(request, "app/home.html", {"ai_images": ai_images})
 
 
-def post_detail(request: HttpRequest, pk: int) -> HttpResponse:
-    post = get_object_or_404(Post.objects.select_related("user__profile"), pk=pk)
-    caption, tags = get_image_caption_and_tags(post.image)
+@cache_anonymous_page(lambda request, pk: post_scope(pk))
+async def post_detail(request: HttpRequest, pk: int) -> HttpResponse:
+    """게시물 상세 (DB에 저장된 내용만으로 렌더링)
+
+    이미지 분석이나 큐레이션이 아직 없으면 페이지를 먼저 보내고,
+    브라우저가 curation_stream에서 결과를 받아 채운다.
+    """
+    timer = StageTimer(f"post_detail:{pk}")
+
+    with timer.stage("db_post"):
+        post = await aget_object_or_404(
+            Post.objects.select_related("user__profile", "image_analysis"), pk=pk
+        )
+    with timer.stage("db_curations"):
+        stored_curations = await aload_stored_curations(post)
+
+    analysis = get_stored_image_analysis(post) if post.image else None
+    caption = analysis.caption if analysis else ""
+    tags = analysis.tags_text if analysis else ""
     # curation_text = ai_curation(
-    #     post.title, post.generated_prompt, caption[0], ", ".join(tags)
+    #     post.title, post.generated_prompt, caption, tags
     # )
+    curation_text = {
+        style: stored_curations[style]
+        for style in STYLE_PROMPTS
+        if style in stored_curations
+    }
+    curation_pending = bool(post.image) and (
+        analysis is None or len(curation_text) < len(STYLE_PROMPTS)
+    )
 
-    curation_text = generate_ai_curation(post.title, caption[0], ", ".join(tags))
+    with timer.stage("render"):
+        response = await sync_to_async(render)(
+            request,
+            "app/post_detail.html",
+            {
+                "post": post,
+                "caption": caption,
+                "tags": tags,
+                "curation_text": curation_text,
+                "curation_pending": curation_pending,
+            },
+        )
+    timer.log()
+    response["Server-Timing"] = timer.server_timing()
+    return response
 
-    return render(
-        request,
-        "app/post_detail.html",
-        {
-            "post": post,
-            "caption": caption[0],
-            "tags": ", ".join(tags),
-            "curation_text": curation_text,
-        },
+
+def _sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@require_GET
+def curation_stream(request: HttpRequest, pk: int) -> HttpResponse:
+    """게시물 이미지 분석과 큐레이션을 server-sent events로 스트리밍"""
+    post = get_object_or_404(
+        Post.objects.select_related("image_analysis"), pk=pk, image__isnull=False
     )
 
+    def events():
+        timer = StageTimer(f"curation_stream:{pk}")
+        with timer.stage("analysis"):
+            analysis = async_to_sync(aget_post_image_analysis)(post, timer)
+        if analysis is None:
+            yield _sse_event("error", {"error": "이미지 분석에 실패했습니다."})
+            yield _sse_event("done", {})
+            return
+        yield _sse_event(
+            "analysis", {"caption": analysis.caption, "tags": analysis.tags_text}
+        )
+
+        stored = load_stored_curations(post)
+        for style in STYLE_PROMPTS:
+            if style in stored:
+                yield _sse_event("curation", {"style": style, "text": stored[style]})
+
+        with timer.stage("curation"):
+            for event, data in stream_post_curations(post, analysis, stored):
+                yield _sse_event(event, data)
+        yield _sse_event("done", {})
+        timer.log()
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # nginx 등 프록시가 응답을 버퍼링하지 않도록 설정
+    response["X-Accel-Buffering"] = "no"
+    return response
+
 
 def ai_curation(prompt, ai_prompt, caption, tags):
     user_input = (
@@ -306,7 +342,7 @@ def ai_curation(prompt, ai_prompt, caption, tags):
     try:
         print("GPT-3o-mini를 사용해 프롬프트를 생성합니다...")
 
-        response = GPT_CLIENT_o3.chat.completions.create(
+        response = get_client("o3").chat.completions.create(
             model="team6-o3-mini",
             messages=[
                 {
@@ -328,85 +364,28 @@ def ai_curation(prompt, ai_prompt, caption, tags):
         return None
 
 
-def generate_ai_curation(user_prompt, captions, tags):
-    """
-    한글로 각 스타일별 큐레이션을 생성하는 함수
-
-    Args:
-        user_prompt (str): 사용자 프롬프트
-        captions (str): 이미지 설명
-        tags (str): 태그들
-
-    Returns:
-        dict: 한글 스타일명과 큐레이션을 담은 딕셔너리
-    """
-
-    combined_text = f"프롬프트: {user_prompt}\n이미지 설명: {captions}\n태그: {tags}"
-
-    # 스타일별 프롬프트 설정
-    style_prompts = {
-        "Emotional": """Explore the emotions and sentiments contained in this artwork in depth. Write lyrically, including the following elements:
-            - The main emotions and atmosphere conveyed by the work
-            - Emotional responses evoked by visual elements
-            - The special emotions given by the moment in the work
-            - Empathy and resonance that viewers can feel
-            - Lyrical characteristics and poetic expressions of the work""",
-        # "Interpretive": """Analyze the meaning and artistic techniques of the work in depth. Interpret it by including the following elements:
-        #     - The main visual elements of the work and their symbolism
-        #     - The effects of composition and color sense
-        #     - The artist's intention and message
-        #     - Artistic techniques used and their effects
-        #     - Philosophical/conceptual meaning conveyed by the work""",
-        # "Historical": """Analyze the work in depth in its historical and art historical context. Explain it by including the following elements:
-        #     - The historical background and characteristics of the era in which the work was produced
-        #     - Relationship with similar art trends or works
-        #     - Position and significance in modern art history
-        #     - Artistic/social impact of the work
-        #     - Interpretation of the work in its historical context""",
-        # "Critical": """Provide a professional and balanced critique of the work. Evaluate it by including the following elements:
-        #     - Technical completeness and artistry of the work
-        #     - Analysis of creativity and innovation
-        #     - Strengths and areas for improvement
-        #     - Artistic achievement and limitations
-        #     - Uniqueness and differentiation of the work""",
-        # "Narrative": """Unravel the work into an attractive story. Describe it by including the following elements:
-        #     - Vivid description of the scene in the work
-        #     - Relationship and story between the elements of appearance
-        #     - Flow and changes in time in the work
-        #     - Hidden drama and narrative in the scene
-        #     - Context before and after that viewers can imagine""",
-        # "Trend": """Analyze the work from the perspective of contemporary art trends. Evaluate it by including the following elements:
-        #     - Relevance to contemporary art trends
-        #     - Digital/technological innovation elements
-        #     - Meaning in the context of modern society/culture
-        #     - Contact with the latest art trends
-        #     - Implications for future art development""",
-    }
+@login_required
+@require_POST
+def regenerate_curation(request: HttpRequest, pk: int) -> HttpResponse:
+    """게시물 큐레이션 다시 생성 (작성자만 가능)"""
+    post = get_object_or_404(Post, pk=pk)
+    if post.user != request.user and not request.user.is_staff:
+        return JsonResponse({"error": "권한이 없습니다."}, status=403)
 
-    # 결과를 저장할 딕셔너리
-    curations = {}
+    regenerate_post_curations(post)
+    return redirect("post_detail", pk=pk)
 
-    # 각 스타일별로 큐레이션 생성
-    for style, style_prompt in style_prompts.items():
-        try:
-            response = GPT_CLIENT_o3.chat.completions.create(
-                model="team6-o3-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": f"""You are an art curation expert. Provide a very detailed and professional analysis of the given work.
-                    {style_prompt} The analysis should be written in a specific and persuasive manner,
-                    and should clearly reveal the characteristics and value of the work from a professional perspective.
-                    Please write a curation in Korean based on the following information.""",
-                    },
-                    {"role": "user", "content": combined_text},
-                ],
-            )
-            curations[style] = response.choices[0].message.content
-        except Exception as e:
-            curations[style] = f"Error generating {style} curation: {str(e)}"
 
-    return curations
+def _get_generation_asset(request):
+    """폼에 포함된 generation_id로 현재 사용자의 생성 이미지 에셋 조회"""
+    generation_id = request.POST.get("generation_id")
+    if not generation_id:
+        return None
+    try:
+        generation_id = uuid.UUID(generation_id)
+    except ValueError:
+        return None
+    return GenerationAsset.objects.filter(id=generation_id, user=request.user).first()
 
 
 @login_required
@@ -419,12 +398,31 @@ def create_post(request: HttpRequest) -> HttpResponse:
 
             generated_image_url = request.POST.get("generated_image_url")
             generated_prompt = request.POST.get("generated_prompt")
-            if generated_image_url:
-                blob_url = save_image_to_blob(
-                    generated_image_url, form.cleaned_data["prompt"], request.user.id
+            asset = _get_generation_asset(request)
+            if asset:
+                # 워커가 이미 저장한 이미지를 그대로 연결 (다시 복사하지 않음)
+                post.asset = asset
+                post.image = asset.image_url
+                post.thumbnails = asset.thumbnails
+                generated_prompt = asset.generated_prompt
+                AIGeneration.objects.create(
+                    user=request.user,
+                    prompt=asset.prompt,
+                    generated_prompt=asset.generated_prompt,
+                    image_url=asset.image_url,
+                    batch_id=asset.batch_id,
                 )
+            elif generated_image_url:
+                if is_blob_url(generated_image_url):
+                    blob_url = generated_image_url
+                else:
+                    blob_url = save_image_to_blob(
+                        generated_image_url,
+                        form.cleaned_data["prompt"],
+                        request.user.id,
+                    )
                 if blob_url:
-                    post.image = generated_image_url
+                    post.image = blob_url
 
                     AIGeneration.objects.create(
                         user=request.user,
@@ -437,6 +435,10 @@ def create_post(request: HttpRequest) -> HttpResponse:
 
             post.save()
             form.save_m2m()
+            if post.image and not post.thumbnails:
+                generate_post_thumbnails(post)
+            get_post_image_analysis(post)
+            update_post_embedding(post)
             return redirect("post_detail", pk=post.pk)
     else:
         form = PostWithAIForm()
@@ -451,6 +453,9 @@ def edit_post(request: HttpRequest, pk: int) -> HttpResponse:
         form = PostEditForm(request.POST, instance=post)
         if form.is_valid():
             post = form.save()
+            if "title" in form.changed_data:
+                # 제목은 임베딩 입력에 들어가므로 유사 작품 검색 결과도 갱신
+                update_post_embedding(post)
             return redirect("post_detail", pk=pk)
     else:
         form = PostEditForm(instance=post)
@@ -466,71 +471,242 @@ def delete_post(request: HttpRequest, pk: int) -> HttpResponse:
     return render(request, "app/post_detail.html", {"post": post})
 
 
-@login_required
-def my_gallery(request):
-    """사용자의 개인 갤러리"""
-    search_query = request.GET.get("search", "")
-    posts = Post.objects.filter(user=request.user)
+# 갤러리 종류별 (조회 조건, 최신순 여부). 기존 정렬 순서를 그대로 유지한다.
+GALLERY_TYPES = {
+    "personal": (lambda request: Q(user=request.user), True),
+    "public": (lambda request: Q(is_public=True), False),
+}
 
-    if search_query:
-        posts = posts.filter(title__icontains=search_query)
 
-    posts = posts.order_by("-date_posted")
-    search_query = request.GET.get("search", "")
-    posts = Post.objects.filter(user=request.user)
+def _gallery_page(request, gallery_type):
+    """검색어와 커서를 반영한 갤러리 한 페이지 (게시물, 다음 커서, 검색어)"""
+    condition, descending = GALLERY_TYPES[gallery_type]
+    search_query = request.GET.get("search", "").strip()
+    posts = Post.objects.filter(condition(request)).defer("search_vector")
+    if search_query and request.GET.get("mode") == "semantic":
+        # 의미 검색은 유사도 상위 한 페이지만 보여준다
+        try:
+            return (
+                semantic_search(posts, search_query, GALLERY_PAGE_SIZE),
+                None,
+                search_query,
+            )
+        except Exception as e:
+            logging.error(f"의미 검색 실패, 키워드 검색으로 대체: {str(e)}")
 
+    key = "date_posted"
     if search_query:
-        posts = posts.filter(title__icontains=search_query)
+        posts, ranked = search_posts(posts, search_query)
+        if ranked:
+            # 검색 결과는 관련도 순으로 표시
+            key, descending = "search_rank", True
+
+    posts, next_cursor = keyset_page(
+        posts, cursor=request.GET.get("cursor"), descending=descending, key=key
+    )
+    return posts, next_cursor, search_query
+
+
+@require_GET
+def similar_post_list(request, pk):
+    """저장된 임베딩으로 찾은 비슷한 작품 (공개 게시물과 내 게시물만)"""
+    post = get_object_or_404(Post, pk=pk)
+    visible = Q(is_public=True)
+    if request.user.is_authenticated:
+        visible |= Q(user=request.user)
+    posts = similar_posts(post, Post.objects.filter(visible).defer("search_vector"))
+    return JsonResponse(
+        {
+            "posts": [
+                {
+                    "id": similar.id,
+                    "title": similar.title,
+                    "image": similar.image,
+                    "webp_srcset": similar.webp_srcset,
+                    "url": reverse("post_detail", args=[similar.id]),
+                    "score": round(similar.similarity, 4),
+                }
+                for similar in posts
+            ]
+        }
+    )
+
+
+def _gallery_fragment_context():
+    # 게시물 카드 프래그먼트 캐시 키에 쓰는 버전 (게시물이 바뀌면 올라감)
+    return {
+        "cache_timeout": PAGE_CACHE_TIMEOUT,
+        "cache_version": get_cache_version(GALLERY_SCOPE),
+    }
+
 
-    posts = posts.order_by("-date_posted")
+def _render_gallery(request, template_name, gallery_type):
+    try:
+        posts, next_cursor, search_query = _gallery_page(request, gallery_type)
+    except InvalidCursor:
+        # 잘못된 커서만 빼고 검색어 등 나머지 조건은 유지한 채 첫 페이지로
+        query = request.GET.copy()
+        query.pop("cursor", None)
+        url = f"{request.path}?{query.urlencode()}" if query else request.path
+        return redirect(url)
     return render(
         request,
-        "app/gallery.html",
-        {"posts": posts, "gallery_type": "personal", "search_query": search_query},
+        template_name,
+        {
+            "posts": posts,
+            "gallery_type": gallery_type,
+            "search_query": search_query,
+            "search_mode": request.GET.get("mode", ""),
+            "next_cursor": next_cursor,
+            "feed_url": reverse("gallery_feed", args=[gallery_type]),
+            **_gallery_fragment_context(),
+        },
     )
 
 
+@login_required
+def my_gallery(request):
+    """사용자의 개인 갤러리"""
+    return _render_gallery(request, "app/gallery.html", "personal")
+
+
+@cache_anonymous_page(lambda request: GALLERY_SCOPE)
 def public_gallery(request):
     """공개 갤러리"""
-    search_query = request.GET.get("search", "")
-    posts = Post.objects.filter(is_public=True)
+    return _render_gallery(request, "app/gallery.html", "public")
 
-    if search_query:
-        posts = posts.filter(title__icontains=search_query)
 
-    posts = posts.order_by("date_posted")
-    search_query = request.GET.get("search", "")
-    posts = Post.objects.filter(is_public=True)
+def _gallery_feed_etag(request, gallery_type):
+    """갤러리 캐시 버전(게시물 변경 시 증가) + 사용자 + 요청 URL로 만든 ETag"""
+    state = "\x1f".join(
+        [
+            str(get_cache_version(GALLERY_SCOPE)),
+            str(request.user.pk or ""),
+            request.get_full_path(),
+        ]
+    )
+    return hashlib.sha256(state.encode("utf-8")).hexdigest()
 
-    if search_query:
-        posts = posts.filter(title__icontains=search_query)
 
-    posts = posts.order_by("date_posted")
-    return render(
-        request,
-        "app/gallery.html",
-        {"posts": posts, "gallery_type": "public", "search_query": search_query},
+@require_GET
+@condition(etag_func=_gallery_feed_etag)
+@cache_anonymous_page(lambda request, gallery_type: GALLERY_SCOPE)
+def gallery_feed(request, gallery_type):
+    """무한 스크롤용 갤러리 다음 페이지 (JSON)"""
+    if gallery_type not in GALLERY_TYPES:
+        return JsonResponse({"error": "알 수 없는 갤러리입니다."}, status=404)
+    if gallery_type == "personal" and not request.user.is_authenticated:
+        return JsonResponse({"error": "로그인이 필요합니다."}, status=401)
+
+    try:
+        posts, next_cursor, _ = _gallery_page(request, gallery_type)
+    except InvalidCursor:
+        return JsonResponse({"error": "잘못된 페이지 커서입니다."}, status=400)
+
+    return JsonResponse(
+        {
+            "posts": [
+                {
+                    "id": post.id,
+                    "title": post.title,
+                    "image": post.image,
+                    "url": reverse("post_detail", args=[post.id]),
+                    "date_posted": post.date_posted.isoformat(),
+                }
+                for post in posts
+            ],
+            "html": render_to_string(
+                "app/common/gallery_cards.html",
+                {"posts": posts, **_gallery_fragment_context()},
+                request=request,
+            ),
+            "next_cursor": next_cursor,
+        }
+    )
+
+
+def comment_state_aggregates():
+    """ETag 계산에 쓰는 댓글 집계 (개수, 마지막 작성/수정 시각)"""
+    return {
+        "count": Count("id"),
+        "last_created": Max("created_at"),
+        "last_updated": Max("updated_at"),
+    }
+
+
+def comment_validators(post, state):
+    """댓글 집계로 (ETag, 댓글 수) 계산
+
+    댓글이 추가/수정되면 시각이, 삭제되면 개수가 바뀌므로 ETag도 바뀐다.
+    남은 댓글의 최신 시각은 삭제 후 뒤로 갈 수 있어 Last-Modified는 보내지 않는다.
+    """
+    last_changed = max(
+        (t for t in (state["last_created"], state["last_updated"]) if t),
+        default=None,
+    )
+    version = f"{post.id}:{state['count']}:{last_changed and last_changed.isoformat()}"
+    return (
+        quote_etag(hashlib.sha256(version.encode("utf-8")).hexdigest()),
+        state["count"],
+    )
+
+
+def parse_comment_cursor(request):
+    """?after=<댓글 ID> 커서: 이 ID 이후의 새 댓글만 반환 (잘못된 값은 ValueError)"""
+    after = request.GET.get("after")
+    return int(after) if after else None
+
+
+def comment_payload(comment):
+    return {
+        "id": comment.id,
+        "message": comment.message,
+        "author": comment.author_nickname if comment.author else "Anonymous",
+        "created_at": comment.created_at.isoformat(),
+    }
+
+
+def comment_list_response(data, count, after):
+    return JsonResponse(
+        {
+            "comments": data,
+            "count": count,
+            "cursor": max((c["id"] for c in data), default=after),
+        }
     )
 
 
+def set_comment_validators(response, etag):
+    response["ETag"] = etag
+    # 브라우저가 매번 서버에 재검증하도록 (조건부 요청으로 304를 받음)
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
 @require_http_methods(["GET", "POST"])
 def comment_list_create(request, post_id):
     post = get_object_or_404(Post, id=post_id)
 
     if request.method == "GET":
-        comments = Comment.objects.filter(post=post).select_related(
-            "author", "author__profile"
+        # 폴링 시 변경이 없으면 댓글을 조회/직렬화하지 않고 304 반환
+        etag, count = comment_validators(
+            post,
+            Comment.objects.filter(post=post).aggregate(**comment_state_aggregates()),
         )
-        data = [
-            {
-                "id": comment.id,
-                "message": comment.message,
-                "author": comment.author_nickname if comment.author else "Anonymous",
-                "create_at": comment.created_at.isoformat(),
-            }
-            for comment in comments
-        ]
-        return JsonResponse({"comments": data})
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            try:
+                after = parse_comment_cursor(request)
+            except ValueError:
+                return JsonResponse({"error": "잘못된 댓글 커서입니다."}, status=400)
+            comments = Comment.objects.filter(post=post).select_related(
+                "author", "author__profile"
+            )
+            if after is not None:
+                comments = comments.filter(id__gt=after)
+            data = [comment_payload(comment) for comment in comments]
+            response = comment_list_response(data, count, after)
+        return set_comment_validators(response, etag)
 
     elif request.method == "POST":
         if not request.user.is_authenticated:
@@ -637,27 +813,10 @@ def ai_play(request):
     return render(request, "app/ai_play.html")  # html만 있고, 아직 기능 merge 전
 
 
+@cache_anonymous_page(lambda request: GALLERY_SCOPE)
 def art_gal(request):
     """공개 갤러리"""
-    search_query = request.GET.get("search", "")
-    posts = Post.objects.filter(is_public=True)
-
-    if search_query:
-        posts = posts.filter(title__icontains=search_query)
-
-    posts = posts.order_by("date_posted")
-    search_query = request.GET.get("search", "")
-    posts = Post.objects.filter(is_public=True)
-
-    if search_query:
-        posts = posts.filter(title__icontains=search_query)
-
-    posts = posts.order_by("date_posted")
-    return render(
-        request,
-        "app/artgal.html",
-        {"posts": posts, "gallery_type": "public", "search_query": search_query},
-    )
+    return _render_gallery(request, "app/artgal.html", "public")
 
 
 def index_ai(request):
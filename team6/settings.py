@@ -65,6 +65,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     # third party apps
     "django_bootstrap5",
     "corsheaders",
@@ -136,6 +137,82 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+# GPT 프롬프트 변환 캐시 백엔드: locmem(기본값) | file | db
+# db를 사용하는 경우 `python manage.py createcachetable`을 먼저 실행해야 합니다.
+PROMPT_CACHE_BACKEND = env("PROMPT_CACHE_BACKEND", default="locmem")
+PROMPT_CACHE_ALIAS = "prompt_rewrite"
+
+_PROMPT_CACHE_BACKENDS = {
+    "locmem": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "prompt-rewrite",
+    },
+    "file": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": env(
+            "PROMPT_CACHE_LOCATION", default=str(BASE_DIR / ".cache" / "prompt_rewrite")
+        ),
+    },
+    "db": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": env("PROMPT_CACHE_LOCATION", default="prompt_rewrite_cache"),
+    },
+}
+if PROMPT_CACHE_BACKEND not in _PROMPT_CACHE_BACKENDS:
+    raise ImproperlyConfigured(
+        f"PROMPT_CACHE_BACKEND must be one of {', '.join(_PROMPT_CACHE_BACKENDS)}"
+    )
+
+# 기본 캐시 백엔드(페이지/프래그먼트 캐시): file(기본값) | redis | locmem
+# 캐시 무효화(버전 올리기)가 모든 프로세스에 반영되어야 하므로 프로세스 간에 공유되는
+# 백엔드를 사용한다. file은 같은 서버의 프로세스끼리, redis는 여러 서버끼리 공유된다.
+# (redis를 사용하려면 redis 패키지를 설치하고 REDIS_URL을 설정해야 합니다.)
+# locmem은 프로세스마다 따로 저장되어 다른 프로세스의 변경이 반영되지 않으므로
+# 프로세스 하나로 실행할 때만 사용하세요.
+DEFAULT_CACHE_BACKEND = env("DEFAULT_CACHE_BACKEND", default="file")
+
+_DEFAULT_CACHE_BACKENDS = {
+    "locmem": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "default",
+    },
+    "redis": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": env("REDIS_URL", default="redis://127.0.0.1:6379/1"),
+    },
+    "file": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": env(
+            "DEFAULT_CACHE_LOCATION", default=str(BASE_DIR / ".cache" / "default")
+        ),
+    },
+}
+if DEFAULT_CACHE_BACKEND not in _DEFAULT_CACHE_BACKENDS:
+    raise ImproperlyConfigured(
+        f"DEFAULT_CACHE_BACKEND must be one of {', '.join(_DEFAULT_CACHE_BACKENDS)}"
+    )
+
+# 익명 사용자용 페이지 캐시와 템플릿 프래그먼트 캐시 유지 시간(초)
+PAGE_CACHE_TIMEOUT = env.int("PAGE_CACHE_TIMEOUT", default=60 * 10)
+
+CACHES = {
+    "default": {
+        **_DEFAULT_CACHE_BACKENDS[DEFAULT_CACHE_BACKEND],
+        "TIMEOUT": PAGE_CACHE_TIMEOUT,
+        "KEY_PREFIX": "team6",
+    },
+    PROMPT_CACHE_ALIAS: {
+        **_PROMPT_CACHE_BACKENDS[PROMPT_CACHE_BACKEND],
+        "TIMEOUT": env.int("PROMPT_CACHE_TIMEOUT", default=60 * 60 * 24 * 7),
+        "OPTIONS": {
+            "MAX_ENTRIES": env.int("PROMPT_CACHE_MAX_ENTRIES", default=5000),
+        },
+    },
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -215,6 +292,32 @@ LOGIN_URL = "/accounts/login/"
 LOGIN_REDIRECT_URL = "/"
 LOGOUT_REDIRECT_URL = "/"
 
+# 생성 파이프라인 로그 (app 모듈의 logging.info 등은 루트 로거로 기록됨)
+# delay=True: 첫 로그가 기록될 때 파일을 연다 (관리 명령/테스트 시작 시 파일을 만들지 않음)
+GENERATION_LOG_FILE = env(
+    "GENERATION_LOG_FILE", default=str(BASE_DIR / "ai_generation.log")
+)
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "generation": {"format": "%(asctime)s [%(levelname)s] %(message)s"},
+    },
+    "handlers": {
+        "console": {"class": "logging.StreamHandler", "formatter": "generation"},
+        "generation_file": {
+            "class": "logging.FileHandler",
+            "filename": GENERATION_LOG_FILE,
+            "formatter": "generation",
+            "encoding": "utf-8",
+            "delay": True,
+        },
+    },
+    "root": {"handlers": ["console", "generation_file"], "level": "INFO"},
+}
+
+# SQL 로그가 필요하면 아래 설정을 참고
 # LOGGING = {
 #     "version": 1,
 #     "disable_existing_loggers": False,
@@ -236,6 +339,10 @@ LOGOUT_REDIRECT_URL = "/"
 AZURE_OPENAI_ENDPOINT = env("AZURE_OPENAI_ENDPOINT")
 AZURE_OPENAI_API_KEY = env("AZURE_OPENAI_API_KEY")
 AZURE_OPENAI_API_VERSION = env("AZURE_OPENAI_API_VERSION")
+# 유사 작품 검색용 임베딩 배포 이름
+AZURE_OPENAI_EMBEDDING_DEPLOYMENT = env(
+    "AZURE_OPENAI_EMBEDDING_DEPLOYMENT", default="text-embedding-3-small"
+)
 
 # Azure OpenAI (DALL-E) 설정
 AZURE_DALLE_ENDPOINT = env("AZURE_DALLE_ENDPOINT")
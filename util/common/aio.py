@@ -0,0 +1,24 @@
+"""이벤트 루프별로 공유하는 비동기 클라이언트
+
+httpx.AsyncClient, AsyncAzureOpenAI, aio BlobServiceClient의 연결은 생성된
+이벤트 루프에 묶여 있다. uvicorn 워커처럼 루프가 하나면 프로세스 전체에서
+공유되고, WSGI 서버에서 async 뷰가 요청마다 새 루프에서 실행되면 루프별로
+따로 만든다(루프가 사라지면 함께 정리됨).
+"""
+
+import asyncio
+import weakref
+
+_registry = weakref.WeakKeyDictionary()
+
+
+def loop_local(key, factory):
+    """현재 이벤트 루프에서 key에 해당하는 클라이언트 (없으면 factory()로 생성)"""
+    loop = asyncio.get_running_loop()
+    clients = _registry.get(loop)
+    if clients is None:
+        clients = _registry[loop] = {}
+    client = clients.get(key)
+    if client is None:
+        client = clients[key] = factory()
+    return client
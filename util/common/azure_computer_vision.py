@@ -1,18 +1,40 @@
 import os
-from azure.cognitiveservices.vision.computervision import ComputerVisionClient
-from msrest.authentication import CognitiveServicesCredentials
+import threading
 
 # ...existing code...
 
+_client_lock = threading.Lock()
+_client = None
+
+
+def get_computer_vision_client():
+    """프로세스 전체에서 공유하는 ComputerVisionClient (처음 사용할 때 생성)"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                # SDK import 비용을 서버 시작 시점이 아니라 처음 분석할 때 치른다
+                from azure.cognitiveservices.vision.computervision import (
+                    ComputerVisionClient,
+                )
+                from msrest.authentication import CognitiveServicesCredentials
+
+                AZURE_COMPUTER_VISION_API_KEY = os.getenv(
+                    "AZURE_COMPUTER_VISION_API_KEY"
+                )
+                AZURE_COMPUTER_VISION_ENDPOINT = os.getenv(
+                    "AZURE_COMPUTER_VISION_ENDPOINT"
+                )
+                _client = ComputerVisionClient(
+                    AZURE_COMPUTER_VISION_ENDPOINT,
+                    CognitiveServicesCredentials(AZURE_COMPUTER_VISION_API_KEY),
+                )
+    return _client
 
-def get_image_caption_and_tags(image_url):
-    AZURE_COMPUTER_VISION_API_KEY = os.getenv("AZURE_COMPUTER_VISION_API_KEY")
-    AZURE_COMPUTER_VISION_ENDPOINT = os.getenv("AZURE_COMPUTER_VISION_ENDPOINT")
 
-    computervision_client = ComputerVisionClient(
-        AZURE_COMPUTER_VISION_ENDPOINT,
-        CognitiveServicesCredentials(AZURE_COMPUTER_VISION_API_KEY),
-    )
+def describe_image_captions(image_url):
+    """이미지 캡션 목록을 반환 (describe_image 호출)"""
+    computervision_client = get_computer_vision_client()
 
     # Analyze the image using the Dense Caption feature
     analysis = computervision_client.describe_image(image_url)
@@ -25,12 +47,23 @@ def get_image_caption_and_tags(image_url):
             captions.append(caption.text)
     else:
         captions.append("No caption detected.")
+    return captions
+
+
+def tag_image_tags(image_url):
+    """이미지 태그 목록을 반환 (tag_image 호출)"""
+    computervision_client = get_computer_vision_client()
 
     # Extract the tag information
     tags_result = computervision_client.tag_image(image_url)
     tags = [tag.name for tag in tags_result.tags]
     print("Tags: ", tags)
+    return tags
 
+
+def get_image_caption_and_tags(image_url):
+    captions = describe_image_captions(image_url)
+    tags = tag_image_tags(image_url)
     return captions, tags
 
 
@@ -0,0 +1,63 @@
+"""Azure OpenAI 클라이언트 레지스트리
+
+클라이언트는 처음 사용할 때 만들어 프로세스 전체에서 공유한다.
+openai 패키지 import와 클라이언트 생성은 비용이 커서, 서버 시작이나 관리 명령,
+테스트 실행 때마다 이 비용을 치르지 않도록 사용 시점까지 미룬다.
+"""
+
+import threading
+
+from django.conf import settings
+
+from util.common.aio import loop_local
+
+# 클라이언트 이름 → 설정 접두사 (<접두사>_ENDPOINT, _API_KEY, _API_VERSION)
+CLIENT_SETTINGS = {
+    "gpt": "AZURE_OPENAI",
+    "dalle": "AZURE_DALLE",
+    "o3": "AZURE_3OMINI",
+}
+# 이전 모듈 속성 이름 (from util.common.azure_openai import GPT_CLIENT 등) 호환
+_LEGACY_NAMES = {"GPT_CLIENT": "gpt", "DALLE_CLIENT": "dalle", "GPT_CLIENT_o3": "o3"}
+
+_lock = threading.Lock()
+_clients = {}
+
+
+def _client_kwargs(name):
+    prefix = CLIENT_SETTINGS[name]
+    return {
+        "azure_endpoint": getattr(settings, f"{prefix}_ENDPOINT"),
+        "api_key": getattr(settings, f"{prefix}_API_KEY"),
+        "api_version": getattr(settings, f"{prefix}_API_VERSION"),
+    }
+
+
+def get_client(name):
+    """이름("gpt", "dalle", "o3")에 해당하는 AzureOpenAI 클라이언트 (처음 사용할 때 생성)"""
+    client = _clients.get(name)
+    if client is None:
+        with _lock:
+            client = _clients.get(name)
+            if client is None:
+                from openai import AzureOpenAI
+
+                client = _clients[name] = AzureOpenAI(**_client_kwargs(name))
+    return client
+
+
+def get_async_client(name):
+    """현재 이벤트 루프에서 공유하는 AsyncAzureOpenAI 클라이언트 (async 뷰용)"""
+
+    def create():
+        from openai import AsyncAzureOpenAI
+
+        return AsyncAzureOpenAI(**_client_kwargs(name))
+
+    return loop_local(f"openai:{name}", create)
+
+
+def __getattr__(name):
+    if name in _LEGACY_NAMES:
+        return get_client(_LEGACY_NAMES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
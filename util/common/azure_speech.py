@@ -1,6 +1,7 @@
+import functools
 import json
 import os
-import azure.cognitiveservices.speech as speechsdk
+from xml.sax.saxutils import escape
 
 # Azure Speech Service 설정
 AZURE_SPEECH_API_KEY = os.getenv("AZURE_SPEECH_API_KEY")
@@ -9,7 +10,15 @@ AZURE_SPEECH_SERVICE_REGION = os.getenv("AZURE_SPEECH_SERVICE_REGION")
 text_to_synthesize = "Azure를 사용해 텍스트를 음성으로 변환합니다."
 
 
+def _speechsdk():
+    """Speech SDK 모듈 (import 비용을 서버 시작이 아니라 처음 사용할 때 치름)"""
+    import azure.cognitiveservices.speech as speechsdk
+
+    return speechsdk
+
+
 def detect_language_and_transcribe():
+    speechsdk = _speechsdk()
     print("음성을 입력하세요. (중지하려면 Ctrl+C를 누르세요)")
     # Speech Configuration 설정
     speech_config = speechsdk.SpeechConfig(
@@ -56,6 +65,7 @@ def detect_language_and_transcribe():
 
 
 def synthesize_text_to_speech(text, language):
+    speechsdk = _speechsdk()
     # Speech 구성 설정
     speech_config = speechsdk.SpeechConfig(
         subscription=AZURE_SPEECH_API_KEY, region=AZURE_SPEECH_SERVICE_REGION
@@ -119,10 +129,43 @@ def read_story_and_synthesize(file_path):
 # read_story_and_synthesize(story_file_path)
 
 
-def synthesize_text_to_speech(text: str) -> bytes:
+def select_voice(text: str) -> str:
+    """텍스트 내용에 맞는 화자 선택"""
+    if any(char in text for char in "가나다라마바사아자차카타파하"):
+        return "ko-KR-SunHiNeural"
+    return "en-US-JennyNeural"
+
+
+# 출력 형식: (SDK SpeechSynthesisOutputFormat 이름, Content-Type, 파일 확장자)
+TTS_AUDIO_FORMATS = {
+    "mp3": (
+        "Audio24Khz48KBitRateMonoMp3",
+        "audio/mpeg",
+        "mp3",
+    ),
+    "opus": (
+        "Ogg24Khz16BitMonoOpus",
+        "audio/ogg",
+        "ogg",
+    ),
+    "wav": (
+        "Riff24Khz16BitMonoPcm",
+        "audio/wav",
+        "wav",
+    ),
+}
+
+
+# async 뷰에서 사용하는 Speech REST API의 출력 형식 (X-Microsoft-OutputFormat)
+TTS_REST_OUTPUT_FORMATS = {
+    "mp3": "audio-24khz-48kbitrate-mono-mp3",
+    "opus": "ogg-24khz-16bit-mono-opus",
+    "wav": "riff-24khz-16bit-mono-pcm",
+}
+
+
+def _get_speech_credentials():
     from django.conf import settings
-    import tempfile
-    import os
 
     subscription_key = getattr(
         settings, "AZURE_SPEECH_API_KEY", os.getenv("AZURE_SPEECH_API_KEY")
@@ -136,27 +179,99 @@ def synthesize_text_to_speech(text: str) -> bytes:
         raise Exception(
             "AZURE_SPEECH_KEY와 AZURE_SPEECH_REGION 환경 변수를 설정하세요."
         )
+    return subscription_key, region
+
+
+@functools.lru_cache(maxsize=None)
+def _get_speech_config(voice: str, audio_format: str):
+    """(화자, 출력 형식)별 SpeechConfig (프로세스에서 한 번만 만들어 공유)"""
+    speechsdk = _speechsdk()
+
+    subscription_key, region = _get_speech_credentials()
     speech_config = speechsdk.SpeechConfig(subscription=subscription_key, region=region)
+    speech_config.speech_synthesis_voice_name = voice
+    speech_config.set_speech_synthesis_output_format(
+        getattr(
+            speechsdk.SpeechSynthesisOutputFormat, TTS_AUDIO_FORMATS[audio_format][0]
+        )
+    )
+    return speech_config
 
-    # Detect language based on text content
-    if any(char in text for char in "가나다라마바사아자차카타파하"):
-        speech_config.speech_synthesis_voice_name = "ko-KR-SunHiNeural"
-    else:
-        speech_config.speech_synthesis_voice_name = "en-US-JennyNeural"
 
-    # Use a temporary file to capture synthesized audio
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp_file:
-        tmp_filename = tmp_file.name
-    audio_config = speechsdk.audio.AudioOutputConfig(filename=tmp_filename)
+def synthesize_text_to_speech(
+    text: str, voice: str = None, audio_format: str = "wav"
+) -> bytes:
+    """텍스트를 음성으로 변환해 메모리에서 바로 반환 (임시 파일 없음)"""
+    speechsdk = _speechsdk()
+    speech_config = _get_speech_config(voice or select_voice(text), audio_format)
+
+    # audio_config=None이면 결과가 스피커나 파일 대신 result.audio_data에 담긴다
     synthesizer = speechsdk.SpeechSynthesizer(
-        speech_config=speech_config, audio_config=audio_config
+        speech_config=speech_config, audio_config=None
     )
     result = synthesizer.speak_text_async(text).get()
     if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
-        with open(tmp_filename, "rb") as f:
-            audio_data = f.read()
-        os.remove(tmp_filename)
-        return audio_data
-    else:
-        os.remove(tmp_filename)
-        raise Exception(f"음성 합성 실패: {result.error_details}")
+        return result.audio_data
+    raise Exception(f"음성 합성 실패: {result.cancellation_details.error_details}")
+
+
+def stream_text_to_speech(
+    text: str, voice: str = None, audio_format: str = "mp3", chunk_size: int = 16384
+):
+    """텍스트를 음성으로 변환하면서 생성되는 오디오를 청크 단위로 반환"""
+    speechsdk = _speechsdk()
+    speech_config = _get_speech_config(voice or select_voice(text), audio_format)
+    synthesizer = speechsdk.SpeechSynthesizer(
+        speech_config=speech_config, audio_config=None
+    )
+
+    # 합성이 시작되면 바로 반환되고, 이후 오디오는 AudioDataStream으로 읽는다
+    result = synthesizer.start_speaking_text_async(text).get()
+    if result.reason == speechsdk.ResultReason.Canceled:
+        raise Exception(f"음성 합성 실패: {result.cancellation_details.error_details}")
+
+    stream = speechsdk.AudioDataStream(result)
+    buffer = bytes(chunk_size)
+    while True:
+        filled = stream.read_data(buffer)
+        if filled == 0:
+            break
+        yield buffer[:filled]
+
+    if stream.status == speechsdk.StreamStatus.Canceled:
+        raise Exception(f"음성 합성 실패: {stream.cancellation_details.error_details}")
+
+
+async def astream_text_to_speech(
+    text: str, voice: str = None, audio_format: str = "mp3", chunk_size: int = 16384
+):
+    """stream_text_to_speech의 비동기 버전
+
+    Speech SDK는 결과를 기다리는 동안 스레드를 막으므로, REST API를
+    httpx.AsyncClient로 호출해 받은 오디오를 청크 단위로 반환한다.
+    """
+    from util.common.azure_storage import get_async_http_client
+
+    subscription_key, region = _get_speech_credentials()
+    voice = voice or select_voice(text)
+    ssml = (
+        f"<speak version='1.0' xml:lang='{voice[:5]}'>"
+        f"<voice name='{voice}'>{escape(text)}</voice></speak>"
+    )
+    async with get_async_http_client().stream(
+        "POST",
+        f"https://{region}.tts.speech.microsoft.com/cognitiveservices/v1",
+        content=ssml.encode("utf-8"),
+        headers={
+            "Ocp-Apim-Subscription-Key": subscription_key,
+            "Content-Type": "application/ssml+xml",
+            "X-Microsoft-OutputFormat": TTS_REST_OUTPUT_FORMATS[audio_format],
+        },
+    ) as response:
+        if response.status_code != 200:
+            await response.aread()
+            raise Exception(
+                f"음성 합성 실패: {response.status_code} {response.text[:200]}"
+            )
+        async for chunk in response.aiter_bytes(chunk_size):
+            yield chunk
@@ -0,0 +1,394 @@
+"""Azure Blob Storage 서비스
+
+프로세스 전체에서 하나의 BlobServiceClient(연결 풀 공유)를 사용해
+매 호출마다 연결 설정과 TLS 핸드셰이크를 반복하지 않도록 한다.
+Azure SDK는 import 비용이 커서 처음 Blob에 접근할 때 불러온다.
+Django 설정이 없는 스크립트(ai_playground/converter.py)에서는
+AZURE_STORAGE_CONNECTION_STRING, AZURE_STORAGE_CONTAINER_NAME 환경 변수를 사용한다.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from urllib.parse import unquote, urlparse
+
+import requests
+from django.conf import settings
+
+from util.common.aio import loop_local
+
+# 연결 풀 크기 (동시에 Blob Storage와 통신하는 스레드 수 이상으로 설정)
+BLOB_CONNECTION_POOL_SIZE = 20
+# URL → Blob 전송 방식: stream(내려받으며 블록 단위 업로드) | copy(서버 측 복사)
+BLOB_TRANSFER_MODE = "stream"
+# 스트리밍 업로드 블록 크기. 전송 중 메모리 사용량은 이 크기 정도로 제한된다
+BLOB_TRANSFER_BLOCK_SIZE = 4 * 1024 * 1024
+# async 뷰의 HTTP 동시 연결 수 (이벤트 루프 하나가 여러 생성을 동시에 처리)
+ASYNC_CONNECTION_LIMIT = 200
+
+_client_lock = threading.Lock()
+_service_client = None
+_container_clients = {}
+_http_session = None
+
+_metrics_lock = threading.Lock()
+_metrics = {}
+_transfers = deque(maxlen=100)
+
+
+def _get_config():
+    if settings.configured:
+        return settings.AZURE_CONNECTION_STRING, settings.CONTAINER_NAME
+    return (
+        os.getenv("AZURE_STORAGE_CONNECTION_STRING"),
+        os.getenv("AZURE_STORAGE_CONTAINER_NAME"),
+    )
+
+
+def _setting(name, default):
+    if settings.configured:
+        return getattr(settings, name, default)
+    return default
+
+
+def _pooled_session():
+    pool_size = _setting("BLOB_CONNECTION_POOL_SIZE", BLOB_CONNECTION_POOL_SIZE)
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_blob_service_client():
+    """프로세스 전체에서 공유하는 BlobServiceClient (처음 사용할 때 생성)"""
+    global _service_client
+    if _service_client is None:
+        with _client_lock:
+            if _service_client is None:
+                from azure.core.pipeline.transport import RequestsTransport
+                from azure.storage.blob import BlobServiceClient
+
+                connection_string, _ = _get_config()
+                block_size = _setting(
+                    "BLOB_TRANSFER_BLOCK_SIZE", BLOB_TRANSFER_BLOCK_SIZE
+                )
+                _service_client = BlobServiceClient.from_connection_string(
+                    connection_string,
+                    transport=RequestsTransport(
+                        session=_pooled_session(), session_owner=False
+                    ),
+                    # 블록 크기보다 큰 스트림은 한 번에 메모리로 읽지 않고 블록 단위로 업로드
+                    max_single_put_size=block_size,
+                    max_block_size=block_size,
+                )
+    return _service_client
+
+
+def get_http_session():
+    """외부 URL(DALL-E 결과 등)을 내려받을 때 공유하는 HTTP 세션"""
+    global _http_session
+    if _http_session is None:
+        with _client_lock:
+            if _http_session is None:
+                _http_session = _pooled_session()
+    return _http_session
+
+
+def get_async_http_client():
+    """async 뷰에서 외부 URL을 내려받을 때 공유하는 httpx.AsyncClient (이벤트 루프별)"""
+
+    def create():
+        import httpx
+
+        limit = _setting("ASYNC_CONNECTION_LIMIT", ASYNC_CONNECTION_LIMIT)
+        return httpx.AsyncClient(
+            timeout=60,
+            limits=httpx.Limits(max_connections=limit, max_keepalive_connections=limit),
+        )
+
+    return loop_local("httpx", create)
+
+
+def get_async_container_client(container=None):
+    """aio SDK ContainerClient (이벤트 루프별로 하나의 BlobServiceClient 공유)"""
+    container = container or _get_config()[1]
+
+    def create_service():
+        from azure.storage.blob.aio import BlobServiceClient
+
+        connection_string, _ = _get_config()
+        block_size = _setting("BLOB_TRANSFER_BLOCK_SIZE", BLOB_TRANSFER_BLOCK_SIZE)
+        return BlobServiceClient.from_connection_string(
+            connection_string,
+            max_single_put_size=block_size,
+            max_block_size=block_size,
+        )
+
+    service = loop_local("blob", create_service)
+    return loop_local(
+        f"blob:{container}", lambda: service.get_container_client(container)
+    )
+
+
+def get_container_client(container=None):
+    container = container or _get_config()[1]
+    client = _container_clients.get(container)
+    if client is None:
+        with _client_lock:
+            client = _container_clients.get(container)
+            if client is None:
+                client = get_blob_service_client().get_container_client(container)
+                _container_clients[container] = client
+    return client
+
+
+def get_blob_client(name, container=None):
+    return get_container_client(container).get_blob_client(name)
+
+
+@contextmanager
+def _timed(operation):
+    started = time.monotonic()
+    ok = False
+    try:
+        yield
+        ok = True
+    finally:
+        elapsed = time.monotonic() - started
+        with _metrics_lock:
+            metric = _metrics.setdefault(
+                operation, {"calls": 0, "errors": 0, "total_seconds": 0.0}
+            )
+            metric["calls"] += 1
+            metric["total_seconds"] += elapsed
+            if not ok:
+                metric["errors"] += 1
+        logging.debug(f"Blob {operation}: {elapsed * 1000:.1f}ms (성공: {ok})")
+
+
+def get_storage_metrics():
+    """작업별 호출 수, 오류 수, 총/평균 소요 시간"""
+    with _metrics_lock:
+        return {
+            operation: {
+                **metric,
+                "avg_ms": (
+                    metric["total_seconds"] / metric["calls"] * 1000
+                    if metric["calls"]
+                    else 0.0
+                ),
+            }
+            for operation, metric in _metrics.items()
+        }
+
+
+def get_transfer_metrics():
+    """최근 URL → Blob 전송 기록 (크기, 소요 시간, 방식)"""
+    with _metrics_lock:
+        return list(_transfers)
+
+
+def reset_storage_metrics():
+    with _metrics_lock:
+        _metrics.clear()
+        _transfers.clear()
+
+
+def blob_url(name, container=None):
+    return get_blob_client(name, container).url
+
+
+def blob_name_from_url(url):
+    """Blob URL에서 Blob 이름 추출"""
+    return unquote(urlparse(url).path.split("/")[-1])
+
+
+def is_blob_url(url, container=None):
+    """이미 이 컨테이너에 저장된 Blob의 URL인지 확인"""
+    container_url = get_container_client(container).url.rstrip("/")
+    return url.split("?")[0].startswith(container_url + "/")
+
+
+def upload_blob(name, data, overwrite=True, content_type=None, container=None):
+    """Blob 업로드 후 URL 반환"""
+    from azure.storage.blob import ContentSettings
+
+    blob_client = get_blob_client(name, container)
+    kwargs = {}
+    if content_type:
+        kwargs["content_settings"] = ContentSettings(content_type=content_type)
+    with _timed("upload"):
+        blob_client.upload_blob(data, overwrite=overwrite, **kwargs)
+    return blob_client.url
+
+
+def download_blob(name, container=None):
+    """Blob 내용을 바이트로 반환"""
+    with _timed("download"):
+        return get_blob_client(name, container).download_blob().readall()
+
+
+def delete_blob(name, container=None):
+    """Blob 삭제 (이미 없으면 False 반환)"""
+    from azure.core.exceptions import ResourceNotFoundError
+
+    try:
+        with _timed("delete"):
+            get_container_client(container).delete_blob(name)
+    except ResourceNotFoundError:
+        return False
+    return True
+
+
+def blob_exists(name, container=None):
+    with _timed("exists"):
+        return get_blob_client(name, container).exists()
+
+
+class _CountingReader:
+    """읽은 바이트 수를 세는 스트림 래퍼"""
+
+    def __init__(self, raw):
+        self._raw = raw
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = self._raw.read(size)
+        self.bytes_read += len(data)
+        return data
+
+
+def _record_transfer(name, mode, size, elapsed):
+    transfer = {
+        "blob": name,
+        "mode": mode,
+        "bytes": size,
+        "seconds": round(elapsed, 3),
+    }
+    with _metrics_lock:
+        _transfers.append(transfer)
+    size_text = f"{size / 1024:.0f}KB" if size is not None else "크기 미상"
+    logging.info(f"Blob 전송 완료 ({mode}): {name}, {size_text}, {elapsed:.2f}초")
+
+
+def _decoded_length(headers):
+    """압축 해제한 본문의 길이 (Content-Encoding이 있으면 Content-Length와 달라 알 수 없음)"""
+    length = headers.get("Content-Length")
+    if not length or headers.get("Content-Encoding", "identity") != "identity":
+        return None
+    return int(length)
+
+
+def _copy_url_to_blob(source_url, blob_client, content_settings):
+    """Blob Storage가 원본 URL에서 직접 가져오도록 요청 (데이터가 앱을 거치지 않음)"""
+    with _timed("transfer_copy"):
+        blob_client.upload_blob_from_url(
+            source_url, overwrite=True, content_settings=content_settings
+        )
+    return None
+
+
+def _stream_url_to_blob(source_url, blob_client, content_settings):
+    """원본을 내려받으면서 블록 단위로 업로드 (전체를 메모리에 올리지 않음)"""
+    with _timed("transfer_stream"):
+        with get_http_session().get(source_url, stream=True, timeout=60) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            reader = _CountingReader(response.raw)
+            blob_client.upload_blob(
+                reader,
+                length=_decoded_length(response.headers),
+                overwrite=True,
+                max_concurrency=1,
+                content_settings=content_settings,
+            )
+    return reader.bytes_read
+
+
+def transfer_url_to_blob(
+    source_url, name, content_type=None, mode=None, container=None
+):
+    """외부 URL의 파일을 Blob으로 옮기고 Blob URL 반환
+
+    mode가 copy이면 서버 측 복사를 먼저 시도하고, 실패하면 스트리밍으로 전송한다.
+    """
+    from azure.storage.blob import ContentSettings
+
+    mode = mode or _setting("BLOB_TRANSFER_MODE", BLOB_TRANSFER_MODE)
+    blob_client = get_blob_client(name, container)
+    content_settings = (
+        ContentSettings(content_type=content_type) if content_type else None
+    )
+
+    started = time.monotonic()
+    if mode == "copy":
+        try:
+            size = _copy_url_to_blob(source_url, blob_client, content_settings)
+            _record_transfer(name, "copy", size, time.monotonic() - started)
+            return blob_client.url
+        except Exception as e:
+            logging.warning(f"서버 측 복사 실패, 스트리밍 전송으로 재시도: {str(e)}")
+            started = time.monotonic()
+
+    size = _stream_url_to_blob(source_url, blob_client, content_settings)
+    _record_transfer(name, "stream", size, time.monotonic() - started)
+    return blob_client.url
+
+
+async def _astream_url_to_blob(source_url, blob_client, content_settings):
+    block_size = _setting("BLOB_TRANSFER_BLOCK_SIZE", BLOB_TRANSFER_BLOCK_SIZE)
+    size = 0
+    with _timed("transfer_stream_async"):
+        async with get_async_http_client().stream("GET", source_url) as response:
+            response.raise_for_status()
+
+            async def chunks():
+                nonlocal size
+                async for chunk in response.aiter_bytes(block_size):
+                    size += len(chunk)
+                    yield chunk
+
+            await blob_client.upload_blob(
+                chunks(),
+                length=_decoded_length(response.headers),
+                overwrite=True,
+                max_concurrency=1,
+                content_settings=content_settings,
+            )
+    return size
+
+
+async def atransfer_url_to_blob(
+    source_url, name, content_type=None, mode=None, container=None
+):
+    """transfer_url_to_blob의 비동기 버전 (httpx로 내려받으면서 aio SDK로 업로드)"""
+    from azure.storage.blob import ContentSettings
+
+    mode = mode or _setting("BLOB_TRANSFER_MODE", BLOB_TRANSFER_MODE)
+    blob_client = get_async_container_client(container).get_blob_client(name)
+    content_settings = (
+        ContentSettings(content_type=content_type) if content_type else None
+    )
+
+    started = time.monotonic()
+    if mode == "copy":
+        try:
+            with _timed("transfer_copy_async"):
+                await blob_client.upload_blob_from_url(
+                    source_url, overwrite=True, content_settings=content_settings
+                )
+            _record_transfer(name, "copy", None, time.monotonic() - started)
+            return blob_client.url
+        except Exception as e:
+            logging.warning(f"서버 측 복사 실패, 스트리밍 전송으로 재시도: {str(e)}")
+            started = time.monotonic()
+
+    size = await _astream_url_to_blob(source_url, blob_client, content_settings)
+    _record_transfer(name, "stream", size, time.monotonic() - started)
+    return blob_client.url
@@ -2,25 +2,23 @@ import json
 import os
 from urllib import request
 
-# Load workflow prompt from workflow.json
+# ComfyUI 서버 주소
+COMFYUI_PROMPT_URL = "http://comfyui.inspiraition.net:8188/prompt"
+
 workflow_path = os.path.join(os.path.dirname(__file__), "workflow.json")
-with open(workflow_path, "r", encoding="utf-8") as f:
-    prompt = json.load(f)
 
 
-# set the text prompt for our positive CLIPTextEncode node
-prompt["6"]["inputs"][
-    "text"
-] = "a monochromatic pencil sketch of a classic car, minimalist, impressionism, negative space"
-# set the seed for our KSampler node
-prompt["3"]["inputs"]["seed"] = 1
+def load_workflow():
+    """workflow.json에서 워크플로 프롬프트 읽기"""
+    with open(workflow_path, "r", encoding="utf-8") as f:
+        return json.load(f)
 
 
 def queue_prompt(prompt):
     # 수정: prompt를 문자열로 변환하지 않고 그대로 전송
     p = {"prompt": prompt}
     data = json.dumps(p).encode("utf-8")
-    req = request.Request("http://comfyui.inspiraition.net:8188/prompt", data=data)
+    req = request.Request(COMFYUI_PROMPT_URL, data=data)
     try:
         response = request.urlopen(req)
         print("Response:", response.read().decode("utf-8"))
@@ -28,4 +26,15 @@ def queue_prompt(prompt):
         print("Error when sending prompt:", e)
 
 
-queue_prompt(prompt)
+# import할 때 요청을 보내지 않도록 직접 실행할 때만 예시 프롬프트를 전송
+# 실행: python -m util.common.comfyUI
+if __name__ == "__main__":
+    prompt = load_workflow()
+    # set the text prompt for our positive CLIPTextEncode node
+    prompt["6"]["inputs"][
+        "text"
+    ] = "a monochromatic pencil sketch of a classic car, minimalist, impressionism, negative space"
+    # set the seed for our KSampler node
+    prompt["3"]["inputs"]["seed"] = 1
+
+    queue_prompt(prompt)
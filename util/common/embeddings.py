@@ -0,0 +1,48 @@
+"""Azure OpenAI 텍스트 임베딩
+
+벡터는 정규화된 float32 배열로 다루며, DB에는 리틀 엔디언 float32 바이트로 저장한다.
+"""
+
+import functools
+
+import numpy as np
+from django.conf import settings
+
+from util.common.azure_openai import get_client
+
+EMBEDDING_DEPLOYMENT = getattr(
+    settings, "AZURE_OPENAI_EMBEDDING_DEPLOYMENT", "text-embedding-3-small"
+)
+VECTOR_DTYPE = np.dtype("<f4")
+
+
+def normalize(vectors):
+    """코사인 유사도를 내적으로 계산할 수 있도록 행 벡터를 단위 길이로 정규화"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def embed_texts(texts):
+    """여러 텍스트를 한 번의 API 호출로 임베딩해 (n, d) 배열 반환"""
+    response = get_client("gpt").embeddings.create(
+        model=EMBEDDING_DEPLOYMENT, input=texts
+    )
+    data = sorted(response.data, key=lambda item: item.index)
+    return normalize([item.embedding for item in data])
+
+
+@functools.lru_cache(maxsize=256)
+def embed_query(text):
+    """검색어 임베딩 (같은 검색어는 프로세스 안에서 다시 계산하지 않음)"""
+    vector = embed_texts([text])[0]
+    vector.flags.writeable = False
+    return vector
+
+
+def vector_to_bytes(vector):
+    return np.asarray(vector, dtype=VECTOR_DTYPE).tobytes()
+
+
+def vector_from_bytes(data):
+    return np.frombuffer(bytes(data), dtype=VECTOR_DTYPE)
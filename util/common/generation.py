@@ -0,0 +1,285 @@
+"""이미지 생성 공통 서비스
+
+app(작업 큐 워커, 게시물 작성)과 ai_playground가 같은 클라이언트와 함수로
+프롬프트 변환 → DALL-E 생성 → Blob 저장을 수행한다. 최적화(캐시, 전송 방식 등)는
+여기 한 곳에만 적용하면 된다. a로 시작하는 함수는 async 뷰용 비동기 버전이다.
+"""
+
+import logging
+import re
+import uuid
+from datetime import datetime
+
+from util.common.azure_openai import get_async_client, get_client
+from util.common.azure_storage import atransfer_url_to_blob, transfer_url_to_blob
+from util.common.prompt_cache import cached_prompt_rewrite
+
+
+class GenerationError(Exception):
+    """생성 파이프라인 단계 실패"""
+
+
+GPT3O_SYSTEM_PROMPT = """You are an expert in converting user's natural language descriptions into DALL-E image generation prompts.
+            Please generate prompts according to the following guidelines:
+
+            ##Main Guidelines
+
+            1. Carefully analyze the user's description to identify key elements.
+            2. Use clear and specific language to write the prompt.
+            3. Include details such as the main subject, style, composition, color, and lighting of the image.
+            4. Appro-priately utilize artistic references or cultural elements to enrich the prompt.
+            5. Add instructions about image quality or resolution if necessary.
+            6. Evaluate if the user's request might violate DALL-E's content policy. If there's a possibility of violation, include a message in the user's original language: "This content may be blocked by DALL-E. Please try a different approach." and explain why blocked.
+            7. Always provide the prompt in English, regardless of the language used in the user's request.
+
+            ##Prompt Structure
+
+            - Specify the main subject first, then add details.
+            - Use adjectives and adverbs effectively to convey the mood and style of the image.
+            - Specify the composition or perspective of the image if needed.
+
+            ##Precautions
+
+            - Do not directly mention copyrighted characters or brands.
+            - Avoid violent or inappropriate content.
+            - Avoid overly complex or ambiguous descriptions, maintain clarity.
+            - Avoid words related to violence, adult content, gore, politics, or drugs.
+            - Do not use names of real people.
+            - Avoid directly mentioning specific body parts.
+
+            ##Using Alternative Expressions
+
+            Consider DALL-E's strict content policy and use visual synonyms with similar meanings to prohibited words. Examples:
+
+            - "shooting star" → "meteor" or "falling star"
+            - "exploding" → "bursting" or "expanding"
+
+            ##Example Prompt Format
+
+            "[Style/mood] image of [main subject]. [Detailed description]. [Composition/perspective]. [Color/lighting information]." Follow these guidelines to convert the user's description into a DALL-E-appropriate prompt. The prompt should be creative yet easy for AI to understand. If there's a possibility of content policy violation, notify the user and suggest alternatives."""
+
+GPT4O_SYSTEM_PROMPT = """You are an expert in converting user's natural language descriptions into DALL-E image generation prompts.
+                    Please generate prompts according to the following guidelines:
+
+                    ## Main Guidelines
+                    1. Carefully analyse the user's description to identify key elements.
+                    2. Use clear and specific language to write the prompt.
+                    3. Include details such as the main subject, style, composition, colour, and lighting.
+                    4. Appropriately utilise artistic references or cultural elements.
+                    5. Add instructions about image quality or resolution if necessary.
+                    6. Evaluate content policy violations and notify if blocked.
+                    7. Always provide the prompt in English.
+
+                    ## Prompt Structure
+                    - Specify the main subject first, then add details.
+                    - Use adjectives and adverbs for mood and style.
+                    - Specify composition or perspective if needed.
+
+                    ## Precautions
+                    - No copyrighted characters or brands
+                    - No violent or inappropriate content
+                    - Avoid complex or ambiguous descriptions
+                    - No words related to violence, adult content, gore, politics, or drugs
+                    - No names or real people
+                    - No specific body parts
+
+                    ## Format Example:
+                    "[Style/mood] image of [main subject]. [Detailed description]. [Composition]. [Colour/lighting]."
+                    """
+
+
+@cached_prompt_rewrite(model="team6-o3-mini", system_prompt=GPT3O_SYSTEM_PROMPT)
+def generate_prompt_with_gpt3o(user_input, system_prompt=GPT3O_SYSTEM_PROMPT):
+    try:
+        print("GPT-3o-mini를 사용해 프롬프트를 생성합니다...")
+
+        response = get_client("o3").chat.completions.create(
+            model="team6-o3-mini",
+            messages=[
+                {
+                    "role": "system",
+                    "content": system_prompt,
+                },
+                {"role": "user", "content": user_input},
+            ],
+        )
+
+        if response.choices and len(response.choices) > 0:
+            return response.choices[0].message.content
+        else:
+            print("응답을 생성하지 못했습니다.")
+            return None
+
+    except Exception as e:
+        print("GPT-3o-mini 호출 중 예외 발생:", str(e))
+        return None
+
+
+@cached_prompt_rewrite(model="gpt-4o", system_prompt=GPT4O_SYSTEM_PROMPT)
+def generate_prompt_with_gpt4o(user_input, system_prompt=GPT4O_SYSTEM_PROMPT):
+    """GPT-4o를 사용해 DALL-E 3 프롬프트 생성"""
+    try:
+        logging.info("GPT-4o를 사용해 프롬프트를 생성합니다...")
+
+        response = get_client("gpt").chat.completions.create(
+            model="gpt-4o",
+            messages=[
+                {
+                    "role": "system",
+                    "content": system_prompt,
+                },
+                {"role": "user", "content": user_input},
+            ],
+            temperature=0.7,
+        )
+
+        if response.choices and len(response.choices) > 0:
+            generated_prompt = response.choices[0].message.content.strip()
+            logging.info(f"생성된 프롬프트: {generated_prompt}")
+            return generated_prompt
+        return None
+
+    except Exception as e:
+        logging.error(f"GPT-4o 호출 중 예외 발생: {str(e)}", exc_info=True)
+        return None
+
+
+def _blob_filename(prompt, user_id):
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    unique_id = str(uuid.uuid4())[:8]
+    sanitised_prompt = re.sub(r'[<>:"/\\|?*]', "", prompt[:20]).strip()
+    return f"user_{user_id}_{timestamp}_{unique_id}_{sanitised_prompt}.png"
+
+
+def save_image_to_blob(image_url, prompt, user_id):
+    """이미지를 Azure Blob Storage에 저장"""
+    try:
+        filename = _blob_filename(prompt, user_id)
+        blob_url = transfer_url_to_blob(image_url, filename, content_type="image/png")
+        logging.info(f"이미지가 Blob Storage에 저장되었습니다: {filename}")
+        return blob_url
+
+    except Exception as e:
+        logging.error(f"Blob Storage 저장 중 오류 발생: {str(e)}", exc_info=True)
+        return None
+
+
+def generate_image_with_dalle(prompt):
+    """DALL-E를 사용해 이미지를 생성"""
+    try:
+        logging.info("DALL-E를 사용해 이미지를 생성합니다...")
+
+        result = get_client("dalle").images.generate(
+            model="dall-e-3", prompt=prompt, n=1
+        )
+
+        if result and result.data:
+            image_url = result.data[0].url
+            logging.info(f"DALL-E 호출 성공! 생성된 이미지 URL: {image_url}")
+            return image_url
+        return None
+
+    except Exception as e:
+        logging.error(f"DALL-E 호출 중 예외 발생: {str(e)}", exc_info=True)
+        return None
+
+
+def generate_image_from_idea(
+    user_input, prompt_generator=generate_prompt_with_gpt4o, system_prompt=None
+):
+    """사용자 입력을 프롬프트로 변환한 뒤 DALL-E로 이미지 생성
+
+    단계마다 외부 호출은 한 번씩이며(변환 결과가 캐시에 있으면 변환 호출 없음),
+    (생성된 프롬프트, 이미지 URL)을 반환한다. 실패한 단계는 GenerationError로 알린다.
+    system_prompt를 생략하면 prompt_generator의 기본 시스템 프롬프트를 사용한다.
+    """
+    generated_prompt = prompt_generator(user_input, system_prompt=system_prompt)
+    if not generated_prompt:
+        raise GenerationError("프롬프트 생성에 실패했습니다.")
+
+    image_url = generate_image_with_dalle(generated_prompt)
+    if not image_url:
+        raise GenerationError("이미지 생성에 실패했습니다.")
+    return generated_prompt, image_url
+
+
+@cached_prompt_rewrite(model="team6-o3-mini", system_prompt=GPT3O_SYSTEM_PROMPT)
+async def agenerate_prompt_with_gpt3o(user_input, system_prompt=GPT3O_SYSTEM_PROMPT):
+    """generate_prompt_with_gpt3o의 비동기 버전 (같은 프롬프트 캐시 사용)"""
+    try:
+        response = await get_async_client("o3").chat.completions.create(
+            model="team6-o3-mini",
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_input},
+            ],
+        )
+        if response.choices:
+            return response.choices[0].message.content
+        return None
+    except Exception as e:
+        logging.error(f"GPT-3o-mini 호출 중 예외 발생: {str(e)}", exc_info=True)
+        return None
+
+
+@cached_prompt_rewrite(model="gpt-4o", system_prompt=GPT4O_SYSTEM_PROMPT)
+async def agenerate_prompt_with_gpt4o(user_input, system_prompt=GPT4O_SYSTEM_PROMPT):
+    """generate_prompt_with_gpt4o의 비동기 버전 (같은 프롬프트 캐시 사용)"""
+    try:
+        response = await get_async_client("gpt").chat.completions.create(
+            model="gpt-4o",
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_input},
+            ],
+            temperature=0.7,
+        )
+        if response.choices:
+            return response.choices[0].message.content.strip()
+        return None
+    except Exception as e:
+        logging.error(f"GPT-4o 호출 중 예외 발생: {str(e)}", exc_info=True)
+        return None
+
+
+async def agenerate_image_with_dalle(prompt):
+    """generate_image_with_dalle의 비동기 버전"""
+    try:
+        result = await get_async_client("dalle").images.generate(
+            model="dall-e-3", prompt=prompt, n=1
+        )
+        if result and result.data:
+            logging.info(f"DALL-E 호출 성공! 생성된 이미지 URL: {result.data[0].url}")
+            return result.data[0].url
+        return None
+    except Exception as e:
+        logging.error(f"DALL-E 호출 중 예외 발생: {str(e)}", exc_info=True)
+        return None
+
+
+async def asave_image_to_blob(image_url, prompt, user_id):
+    """save_image_to_blob의 비동기 버전"""
+    try:
+        filename = _blob_filename(prompt, user_id)
+        blob_url = await atransfer_url_to_blob(
+            image_url, filename, content_type="image/png"
+        )
+        logging.info(f"이미지가 Blob Storage에 저장되었습니다: {filename}")
+        return blob_url
+    except Exception as e:
+        logging.error(f"Blob Storage 저장 중 오류 발생: {str(e)}", exc_info=True)
+        return None
+
+
+async def agenerate_image_from_idea(
+    user_input, prompt_generator=agenerate_prompt_with_gpt4o, system_prompt=None
+):
+    """generate_image_from_idea의 비동기 버전"""
+    generated_prompt = await prompt_generator(user_input, system_prompt=system_prompt)
+    if not generated_prompt:
+        raise GenerationError("프롬프트 생성에 실패했습니다.")
+
+    image_url = await agenerate_image_with_dalle(generated_prompt)
+    if not image_url:
+        raise GenerationError("이미지 생성에 실패했습니다.")
+    return generated_prompt, image_url
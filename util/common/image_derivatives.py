@@ -0,0 +1,40 @@
+"""Pillow 기반 파생 이미지(반응형 썸네일) 생성"""
+
+import io
+
+from PIL import Image
+
+# 포맷별 (Pillow 포맷 이름, Content-Type, 확장자, 저장 옵션)
+DERIVATIVE_FORMATS = {
+    "avif": ("AVIF", "image/avif", "avif", {"quality": 55}),
+    "webp": ("WEBP", "image/webp", "webp", {"quality": 80, "method": 4}),
+}
+
+
+def supported_formats(formats):
+    """현재 Pillow 빌드에서 인코딩할 수 있는 포맷만 반환 (AVIF는 플러그인이 있어야 함)"""
+    Image.init()
+    return [fmt for fmt in formats if DERIVATIVE_FORMATS[fmt][0] in Image.SAVE]
+
+
+def build_derivatives(image_bytes, widths, formats):
+    """원본 이미지를 너비별, 포맷별로 축소해 (너비, 포맷, 바이트, Content-Type) 목록 반환
+
+    원본보다 넓은 크기로는 확대하지 않는다.
+    """
+    with Image.open(io.BytesIO(image_bytes)) as original:
+        original.load()
+        image = original.convert("RGBA" if "A" in original.getbands() else "RGB")
+
+    derivatives = []
+    for width in sorted(set(widths)):
+        if width >= image.width:
+            continue
+        height = round(image.height * width / image.width)
+        resized = image.resize((width, height), Image.Resampling.LANCZOS)
+        for fmt in supported_formats(formats):
+            pil_format, content_type, _, options = DERIVATIVE_FORMATS[fmt]
+            buffer = io.BytesIO()
+            resized.save(buffer, format=pil_format, **options)
+            derivatives.append((width, fmt, buffer.getvalue(), content_type))
+    return derivatives
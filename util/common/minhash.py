@@ -0,0 +1,75 @@
+"""MinHash 서명과 LSH 밴드 (짧은 텍스트의 유사 중복 탐지용)
+
+문자 n-gram 집합의 자카드 유사도를 MinHash 서명으로 근사하고, 서명을 밴드로
+나눈 해시(LSH 버킷)가 하나라도 같은 항목만 후보로 비교한다.
+"""
+
+import hashlib
+
+import numpy as np
+
+from util.common.prompt_cache import normalize_user_input
+
+NUM_PERM = 128
+BANDS = 32
+ROWS_PER_BAND = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+# 모든 프로세스가 같은 서명을 만들도록 고정된 시드로 순열 계수를 생성
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """정규화된 텍스트의 문자 n-gram 집합 (한국어처럼 띄어쓰기가 불규칙해도 동작)"""
+    text = normalize_user_input(text)
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i : i + size] for i in range(len(text) - size + 1)}
+
+
+def _hash32(value):
+    return int.from_bytes(
+        hashlib.blake2b(value.encode("utf-8"), digest_size=4).digest(), "little"
+    )
+
+
+def signature(text):
+    """MinHash 서명 (uint32 NUM_PERM개). 빈 텍스트는 None"""
+    items = shingles(text)
+    if not items:
+        return None
+    hashes = np.fromiter((_hash32(item) for item in items), dtype=np.uint64)
+    # (a * x + b) mod p 를 모든 순열과 n-gram에 대해 한 번에 계산
+    permuted = (np.outer(hashes, _PERM_A) + _PERM_B) % _MERSENNE_PRIME & _MAX_HASH
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def band_hashes(sig):
+    """서명을 BANDS개 밴드로 나눈 64비트 부호 있는 정수 해시 목록 (DB BigInteger에 저장)"""
+    bands = np.asarray(sig, dtype="<u4").reshape(BANDS, ROWS_PER_BAND)
+    return [
+        int.from_bytes(
+            hashlib.blake2b(band.tobytes(), digest_size=8).digest(),
+            "little",
+            signed=True,
+        )
+        for band in bands
+    ]
+
+
+def estimate_similarity(sig_a, sig_b):
+    """두 서명의 일치 비율 = 자카드 유사도 추정값"""
+    return float(np.mean(np.asarray(sig_a) == np.asarray(sig_b)))
+
+
+def signature_to_bytes(sig):
+    return np.asarray(sig, dtype="<u4").tobytes()
+
+
+def signature_from_bytes(data):
+    return np.frombuffer(bytes(data), dtype="<u4")
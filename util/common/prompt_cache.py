@@ -0,0 +1,115 @@
+import asyncio
+import functools
+import hashlib
+import logging
+import re
+import unicodedata
+
+from django.conf import settings
+from django.core.cache import caches
+
+PROMPT_CACHE_ALIAS = getattr(settings, "PROMPT_CACHE_ALIAS", "prompt_rewrite")
+# 캐시 키 형식이 바뀌면 올려서 이전 항목을 무시하도록 한다
+PROMPT_CACHE_KEY_VERSION = 1
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = " .!?~。…"
+
+
+def normalize_user_input(user_input):
+    """사소한 차이(공백, 전각/반각, 대소문자, 끝 문장부호)를 무시하도록 입력을 정규화"""
+    text = unicodedata.normalize("NFKC", user_input)
+    text = _WHITESPACE_RE.sub(" ", text).strip()
+    text = text.rstrip(_TRAILING_PUNCTUATION)
+    return text.casefold()
+
+
+def _sha256(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def make_prompt_cache_key(model, system_prompt, user_input):
+    """(모델, 시스템 프롬프트 해시, 정규화된 사용자 입력)으로 캐시 키 생성"""
+    digest = _sha256(
+        "\x1f".join([model, _sha256(system_prompt), normalize_user_input(user_input)])
+    )
+    return f"prompt-rewrite:v{PROMPT_CACHE_KEY_VERSION}:{digest}"
+
+
+def get_prompt_cache():
+    return caches[PROMPT_CACHE_ALIAS]
+
+
+def cached_prompt_rewrite(model, system_prompt):
+    """프롬프트 변환 결과를 Django 캐시에 저장하는 데코레이터
+
+    실패(None 또는 빈 문자열)는 저장하지 않는다. 캐시 적중 시 만료 시간을
+    연장하므로 자주 쓰이는 입력이 오래 남는다(LRU에 가까운 동작).
+    async 함수에 붙이면 비동기 캐시 API(aget/aset)를 사용한다.
+
+    감싼 함수는 func(user_input, system_prompt=...)로 호출된다. 호출할 때
+    system_prompt를 주면 그 프롬프트로 변환하고 캐시 키에도 반영하며,
+    생략하면 데코레이터의 system_prompt를 사용한다.
+    """
+    default_system_prompt = system_prompt
+
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(user_input, system_prompt=None):
+                system_prompt = system_prompt or default_system_prompt
+                cache = get_prompt_cache()
+                key = make_prompt_cache_key(model, system_prompt, user_input)
+
+                try:
+                    cached = await cache.aget(key)
+                except Exception as e:
+                    logging.warning(f"프롬프트 캐시 조회 실패: {str(e)}")
+                    cached = None
+
+                if cached is not None:
+                    logging.info(f"프롬프트 캐시 적중 ({model})")
+                    await cache.atouch(key)
+                    return cached
+
+                result = await func(user_input, system_prompt=system_prompt)
+                if result:
+                    try:
+                        await cache.aset(key, result)
+                    except Exception as e:
+                        logging.warning(f"프롬프트 캐시 저장 실패: {str(e)}")
+                return result
+
+            async_wrapper.uncached = func
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(user_input, system_prompt=None):
+            system_prompt = system_prompt or default_system_prompt
+            cache = get_prompt_cache()
+            key = make_prompt_cache_key(model, system_prompt, user_input)
+
+            try:
+                cached = cache.get(key)
+            except Exception as e:
+                logging.warning(f"프롬프트 캐시 조회 실패: {str(e)}")
+                cached = None
+
+            if cached is not None:
+                logging.info(f"프롬프트 캐시 적중 ({model})")
+                cache.touch(key)
+                return cached
+
+            result = func(user_input, system_prompt=system_prompt)
+            if result:
+                try:
+                    cache.set(key, result)
+                except Exception as e:
+                    logging.warning(f"프롬프트 캐시 저장 실패: {str(e)}")
+            return result
+
+        wrapper.uncached = func
+        return wrapper
+
+    return decorator
@@ -0,0 +1,46 @@
+import logging
+import time
+from contextlib import contextmanager
+
+
+class StageTimer:
+    """요청 처리 단계별 소요 시간을 기록
+
+    비동기 코드에서 동시에 실행되는 단계도 각각 기록할 수 있으며,
+    결과는 로그와 Server-Timing 헤더로 확인할 수 있다.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.started = time.monotonic()
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name):
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.stages[name] = (started - self.started, time.monotonic() - started)
+
+    @property
+    def total(self):
+        return time.monotonic() - self.started
+
+    def server_timing(self):
+        """Server-Timing 헤더 값 (브라우저 개발자 도구에서 확인 가능)"""
+        metrics = [
+            f"{name};dur={duration * 1000:.1f}"
+            for name, (_, duration) in self.stages.items()
+        ]
+        metrics.append(f"total;dur={self.total * 1000:.1f}")
+        return ", ".join(metrics)
+
+    def log(self):
+        stages = ", ".join(
+            f"{name}={duration:.3f}s(+{offset:.3f}s)"
+            for name, (offset, duration) in sorted(
+                self.stages.items(), key=lambda item: item[1][0]
+            )
+        )
+        logging.info(f"[{self.name}] 총 {self.total:.3f}초: {stages}")
@@ -0,0 +1,278 @@
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+from django.conf import settings
+
+from util.common.aio import loop_local
+from util.common.azure_speech import (
+    TTS_AUDIO_FORMATS,
+    astream_text_to_speech,
+    select_voice,
+    stream_text_to_speech,
+)
+
+TTS_CACHE_DIR = Path(
+    getattr(settings, "TTS_CACHE_DIR", Path(settings.BASE_DIR) / ".cache" / "tts")
+)
+# 캐시 디렉터리 최대 크기. 초과하면 가장 오래 사용되지 않은 파일부터 삭제
+TTS_CACHE_MAX_BYTES = getattr(settings, "TTS_CACHE_MAX_BYTES", 200 * 1024 * 1024)
+# 기본 출력 형식: mp3 | opus | wav (압축 형식은 WAV보다 약 10배 작다)
+TTS_AUDIO_FORMAT = getattr(settings, "TTS_AUDIO_FORMAT", "mp3")
+
+# 합성이 이 시간(초) 동안 다음 청크를 보내지 않으면 응답을 중단
+TTS_SYNTHESIS_TIMEOUT = getattr(settings, "TTS_SYNTHESIS_TIMEOUT", 30)
+
+_synthesis_guard = threading.Lock()
+_synthesis_in_flight = {}
+
+
+def make_tts_cache_key(voice, text, audio_format):
+    return hashlib.sha256(
+        f"{voice}\x1f{audio_format}\x1f{text}".encode("utf-8")
+    ).hexdigest()
+
+
+def _cache_path(key, audio_format):
+    extension = TTS_AUDIO_FORMATS[audio_format][2]
+    return TTS_CACHE_DIR / key[:2] / f"{key}.{extension}"
+
+
+def _write_atomic(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+
+
+def evict_tts_cache(max_bytes=None):
+    """캐시 크기가 한도를 넘으면 마지막 사용 시각이 오래된 파일부터 삭제"""
+    max_bytes = TTS_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    entries = []
+    total = 0
+    for path in TTS_CACHE_DIR.glob("*/*.*"):
+        if path.suffix == ".tmp":
+            continue
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+        total += stat.st_size
+
+    if total <= max_bytes:
+        return 0
+
+    removed = 0
+    for _, size, path in sorted(entries):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            continue
+        total -= size
+        removed += 1
+        if total <= max_bytes * 0.9:
+            break
+    logging.info(f"TTS 캐시 정리: {removed}개 파일 삭제")
+    return removed
+
+
+class _Synthesis:
+    """한 텍스트에 대해 진행 중인 합성
+
+    합성은 별도 스레드에서 끝까지 진행하며 청크를 모아 두고, 같은 텍스트를 요청한
+    응답들은 각자 속도로 청크를 읽는다. 느리거나 끊긴 클라이언트가 다른 요청이나
+    합성을 막지 않으며, 합성이 끝나면 캐시에 저장한다.
+    """
+
+    def __init__(self, text, voice, audio_format, key, path):
+        self.text = text
+        self.voice = voice
+        self.audio_format = audio_format
+        self.key = key
+        self.path = path
+        self._chunks = []
+        self._done = False
+        self._error = None
+        self._condition = threading.Condition()
+
+    def start(self):
+        threading.Thread(
+            target=self._run, name=f"tts-{self.key[:8]}", daemon=True
+        ).start()
+
+    def _run(self):
+        try:
+            logging.info(f"TTS 캐시 미스, 스트리밍 합성: {self.key[:12]}")
+            for chunk in stream_text_to_speech(
+                self.text, voice=self.voice, audio_format=self.audio_format
+            ):
+                with self._condition:
+                    self._chunks.append(chunk)
+                    self._condition.notify_all()
+            if self._chunks:
+                _write_atomic(self.path, b"".join(self._chunks))
+                evict_tts_cache()
+        except Exception as e:
+            logging.error(f"TTS 합성 실패: {str(e)}")
+            self._error = e
+        finally:
+            # 캐시 파일을 쓴 뒤에 빼야 다음 요청이 파일을 찾는다
+            with _synthesis_guard:
+                _synthesis_in_flight.pop(self.key, None)
+            with self._condition:
+                self._done = True
+                self._condition.notify_all()
+
+    def chunks(self):
+        """처음부터 청크를 반환 (합성이 TTS_SYNTHESIS_TIMEOUT 동안 멈추면 TimeoutError)"""
+        index = 0
+        while True:
+            with self._condition:
+                if not self._condition.wait_for(
+                    lambda: index < len(self._chunks) or self._done,
+                    timeout=TTS_SYNTHESIS_TIMEOUT,
+                ):
+                    raise TimeoutError("음성 합성 응답이 없습니다.")
+                if index < len(self._chunks):
+                    chunk = self._chunks[index]
+                elif self._error is not None:
+                    raise self._error
+                else:
+                    return
+            index += 1
+            yield chunk
+
+
+def open_tts_audio(text, audio_format=None):
+    """캐시된 음성 파일 경로 또는 새로 합성하며 스트리밍할 청크 이터레이터를 반환
+
+    캐시에 없으면 합성되는 오디오를 그대로 흘려보내고, 합성이 끝나면 캐시에
+    저장한다. 같은 텍스트를 합성 중인 요청이 있으면 합성을 새로 시작하지 않고
+    진행 중인 합성의 청크를 처음부터 함께 받는다.
+
+    Returns:
+        tuple: (캐시 키, 음성 파일 경로 또는 None, 청크 이터레이터 또는 None)
+    """
+    audio_format = audio_format or TTS_AUDIO_FORMAT
+    voice = select_voice(text)
+    key = make_tts_cache_key(voice, text, audio_format)
+    path = _cache_path(key, audio_format)
+
+    if path.exists():
+        # 마지막 사용 시각 갱신 (LRU 정리 기준)
+        os.utime(path)
+        return key, path, None
+
+    with _synthesis_guard:
+        synthesis = _synthesis_in_flight.get(key)
+        if synthesis is None:
+            if path.exists():
+                # 확인하는 사이 다른 요청의 합성이 끝남
+                return key, path, None
+            synthesis = _synthesis_in_flight[key] = _Synthesis(
+                text, voice, audio_format, key, path
+            )
+            synthesis.start()
+    return key, None, synthesis.chunks()
+
+
+class _ASynthesis:
+    """_Synthesis의 비동기 버전 (이벤트 루프의 태스크에서 REST API로 합성)"""
+
+    def __init__(self, text, voice, audio_format, key, path, in_flight):
+        self.text = text
+        self.voice = voice
+        self.audio_format = audio_format
+        self.key = key
+        self.path = path
+        self._in_flight = in_flight
+        self._chunks = []
+        self._done = False
+        self._error = None
+        self._condition = asyncio.Condition()
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _notify(self):
+        async with self._condition:
+            self._condition.notify_all()
+
+    async def _run(self):
+        try:
+            logging.info(f"TTS 캐시 미스, 비동기 스트리밍 합성: {self.key[:12]}")
+            async for chunk in astream_text_to_speech(
+                self.text, voice=self.voice, audio_format=self.audio_format
+            ):
+                self._chunks.append(chunk)
+                await self._notify()
+            if self._chunks:
+                await asyncio.to_thread(
+                    _write_atomic, self.path, b"".join(self._chunks)
+                )
+                await asyncio.to_thread(evict_tts_cache)
+        except Exception as e:
+            logging.error(f"TTS 합성 실패: {str(e)}")
+            self._error = e
+        finally:
+            # 캐시 파일을 쓴 뒤에 빼야 다음 요청이 파일을 찾는다
+            self._in_flight.pop(self.key, None)
+            self._done = True
+            await self._notify()
+
+    async def chunks(self):
+        index = 0
+        while True:
+            async with self._condition:
+                try:
+                    await asyncio.wait_for(
+                        self._condition.wait_for(
+                            lambda: index < len(self._chunks) or self._done
+                        ),
+                        TTS_SYNTHESIS_TIMEOUT,
+                    )
+                except asyncio.TimeoutError:
+                    raise TimeoutError("음성 합성 응답이 없습니다.")
+            if index < len(self._chunks):
+                chunk = self._chunks[index]
+            elif self._error is not None:
+                raise self._error
+            else:
+                return
+            index += 1
+            yield chunk
+
+
+def aopen_tts_audio(text, audio_format=None):
+    """open_tts_audio의 비동기 버전 (청크 이터레이터가 async iterator)
+
+    같은 이벤트 루프에서 같은 텍스트를 합성 중이면 그 합성의 청크를 함께 받는다.
+    """
+    audio_format = audio_format or TTS_AUDIO_FORMAT
+    voice = select_voice(text)
+    key = make_tts_cache_key(voice, text, audio_format)
+    path = _cache_path(key, audio_format)
+
+    if path.exists():
+        os.utime(path)
+        return key, path, None
+
+    in_flight = loop_local("tts-synthesis", dict)
+    synthesis = in_flight.get(key)
+    if synthesis is None:
+        synthesis = in_flight[key] = _ASynthesis(
+            text, voice, audio_format, key, path, in_flight
+        )
+        synthesis.start()
+    return key, None, synthesis.chunks()
@@ -0,0 +1,114 @@
+"""여러 앱의 테스트가 함께 쓰는 도우미
+
+실행 계획(EXPLAIN)으로 인덱스 사용을 확인하는 믹스인과, 생성 서비스의 외부 호출을
+가짜로 바꾸고 호출 수를 세는 컨텍스트 매니저를 제공한다.
+"""
+
+import re
+from contextlib import contextmanager
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# EXPLAIN 결과에서 인덱스를 사용한 조회로 볼 수 있는 패턴
+INDEX_SCAN_PATTERNS = {
+    "postgresql": re.compile(r"Index Scan|Index Only Scan|Bitmap Index Scan"),
+    "sqlite": re.compile(r"USING (COVERING )?INDEX"),
+}
+
+
+def explain(sql, params=()):
+    """쿼리 실행 계획을 문자열로 반환 (PostgreSQL은 순차 스캔을 비활성화해 인덱스 사용 가능 여부를 확인)"""
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute(f"EXPLAIN {sql}", params)
+        else:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        return "\n".join(str(row[-1]) for row in cursor.fetchall())
+
+
+def _fake_responses():
+    """가짜 클라이언트가 돌려주는 (채팅 응답, DALL-E 응답)"""
+    chat = SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content="a cat"))]
+    )
+    image = SimpleNamespace(data=[SimpleNamespace(url="https://dalle/cat.png")])
+    return chat, image
+
+
+@contextmanager
+def count_outbound_calls():
+    """생성 서비스의 외부 호출(GPT, DALL-E, Blob 전송)을 가짜로 바꾸고 호출 수를 센다"""
+    chat, image = _fake_responses()
+    clients = {name: mock.MagicMock() for name in ("gpt", "o3", "dalle")}
+    clients["gpt"].chat.completions.create.return_value = chat
+    clients["o3"].chat.completions.create.return_value = chat
+    clients["dalle"].images.generate.return_value = image
+    with mock.patch(
+        "util.common.generation.get_client", side_effect=clients.__getitem__
+    ), mock.patch(
+        "util.common.generation.transfer_url_to_blob",
+        return_value="https://blob/cat.png",
+    ) as transfer:
+        yield {
+            "gpt": clients["gpt"].chat.completions.create,
+            "o3": clients["o3"].chat.completions.create,
+            "dalle": clients["dalle"].images.generate,
+            "blob": transfer,
+        }
+
+
+@contextmanager
+def count_async_outbound_calls():
+    """count_outbound_calls의 async 클라이언트 버전 (async 뷰용)"""
+    chat, image = _fake_responses()
+    clients = {name: mock.MagicMock() for name in ("gpt", "o3", "dalle")}
+    for name in ("gpt", "o3"):
+        clients[name].chat.completions.create = mock.AsyncMock(return_value=chat)
+    clients["dalle"].images.generate = mock.AsyncMock(return_value=image)
+    with mock.patch(
+        "util.common.generation.get_async_client", side_effect=clients.__getitem__
+    ), mock.patch(
+        "util.common.generation.atransfer_url_to_blob",
+        new=mock.AsyncMock(return_value="https://blob/cat.png"),
+    ) as transfer:
+        yield {
+            "gpt": clients["gpt"].chat.completions.create,
+            "o3": clients["o3"].chat.completions.create,
+            "dalle": clients["dalle"].images.generate,
+            "blob": transfer,
+        }
+
+
+class IndexUsageTestMixin:
+    """뷰가 실행한 쿼리의 실행 계획을 EXPLAIN으로 확인"""
+
+    def setUp(self):
+        if connection.vendor not in INDEX_SCAN_PATTERNS:
+            self.skipTest(f"{connection.vendor}는 실행 계획 확인을 지원하지 않습니다.")
+        # 익명 페이지 캐시에 적중하면 쿼리가 실행되지 않으므로 비워둔다
+        cache.clear()
+
+    def captured_queries(self, table, func):
+        with CaptureQueriesContext(connection) as context:
+            func()
+        queries = [
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].startswith("SELECT") and f'FROM "{table}"' in query["sql"]
+        ]
+        self.assertTrue(queries, f"{table} 조회 쿼리가 실행되지 않았습니다.")
+        return queries
+
+    def assertUsesIndex(self, sql, index_name=None):
+        plan = explain(sql)
+        self.assertRegex(plan, INDEX_SCAN_PATTERNS[connection.vendor], plan)
+        if index_name:
+            self.assertIn(index_name, plan)
+        if connection.vendor == "sqlite":
+            # 인덱스 순서로 읽지 못하면 정렬용 임시 B-tree가 생긴다
+            self.assertNotIn("TEMP B-TREE", plan)
@@ -1,3 +1,224 @@
-from django.test import TestCase
+import asyncio
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.test import SimpleTestCase
+from requests.structures import CaseInsensitiveDict
+
+from util.common import azure_storage, tts_cache
+
+# 새 프로세스에서 django.setup()과 URL 설정 로드까지 걸리는 시간(초) 상한
+STARTUP_TIME_BUDGET = float(os.getenv("STARTUP_TIME_BUDGET", 3.0))
+# 시작 시점에 import되면 안 되는 무거운 SDK (처음 사용할 때 불러와야 함)
+LAZY_MODULES = [
+    "openai",
+    "azure.cognitiveservices.speech",
+    "azure.cognitiveservices.vision.computervision",
+    "azure.storage.blob",
+]
+
+STARTUP_SCRIPT = """
+import json, os, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+setup_done = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+finished = time.perf_counter()
+print(json.dumps({
+    "setup": setup_done - started,
+    "urls": finished - setup_done,
+    "total": finished - started,
+    "modules": [name for name in sys.argv[1:] if name in sys.modules],
+}))
+"""
+
+
+def measure_startup():
+    """새 인터프리터에서 Django 시작 시간과 이미 import된 무거운 모듈 측정"""
+    result = subprocess.run(
+        [sys.executable, "-c", STARTUP_SCRIPT, *LAZY_MODULES],
+        cwd=settings.BASE_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class StartupTimeTests(SimpleTestCase):
+    def test_startup_does_not_import_sdk_clients(self):
+        startup = measure_startup()
+        self.assertEqual(startup["modules"], [])
+
+    def test_startup_time_within_budget(self):
+        # 첫 실행은 .pyc 생성 등으로 느릴 수 있어 두 번 측정해 빠른 쪽을 사용
+        startup = min((measure_startup() for _ in range(2)), key=lambda s: s["total"])
+        self.assertLess(
+            startup["total"],
+            STARTUP_TIME_BUDGET,
+            f"시작 시간 {startup['total']:.2f}초 (setup {startup['setup']:.2f}초, "
+            f"URL {startup['urls']:.2f}초)",
+        )
+
+
+class TTSCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        patcher = mock.patch.object(tts_cache, "TTS_CACHE_DIR", Path(cache_dir.name))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+        self.synthesis_calls = 0
+
+    def fake_stream(self, text, voice=None, audio_format="mp3"):
+        self.synthesis_calls += 1
+        yield b"first"
+        self.release.wait(5)
+        yield b"second"
+
+    def test_concurrent_requests_share_one_synthesis(self):
+        with mock.patch.object(tts_cache, "stream_text_to_speech", self.fake_stream):
+            _, first_path, first = tts_cache.open_tts_audio("hello")
+            _, second_path, second = tts_cache.open_tts_audio("hello")
+            self.assertIsNone(first_path)
+            self.assertIsNone(second_path)
+
+            # 첫 번째 응답이 아직 읽지 않아도 두 번째 응답은 기다리지 않는다
+            self.assertEqual(next(second), b"first")
+            self.release.set()
+            self.assertEqual(b"".join(second), b"second")
+            self.assertEqual(b"".join(first), b"firstsecond")
+        self.assertEqual(self.synthesis_calls, 1)
+
+        _, path, chunks = tts_cache.open_tts_audio("hello")
+        self.assertIsNone(chunks)
+        self.assertEqual(path.read_bytes(), b"firstsecond")
+
+    def test_stalled_synthesis_times_out(self):
+        with mock.patch.object(
+            tts_cache, "stream_text_to_speech", self.fake_stream
+        ), mock.patch.object(tts_cache, "TTS_SYNTHESIS_TIMEOUT", 0.05):
+            _, _, chunks = tts_cache.open_tts_audio("hello")
+            self.assertEqual(next(chunks), b"first")
+            with self.assertRaises(TimeoutError):
+                next(chunks)
+
+    async def test_async_requests_share_one_synthesis(self):
+        release = asyncio.Event()
+
+        async def fake_astream(text, voice=None, audio_format="mp3"):
+            self.synthesis_calls += 1
+            yield b"first"
+            await release.wait()
+            yield b"second"
+
+        async def read_all(chunks):
+            return b"".join([chunk async for chunk in chunks])
+
+        with mock.patch.object(tts_cache, "astream_text_to_speech", fake_astream):
+            _, _, first = tts_cache.aopen_tts_audio("hello")
+            _, _, second = tts_cache.aopen_tts_audio("hello")
+            self.assertEqual(await anext(second), b"first")
+            release.set()
+            self.assertEqual(
+                await asyncio.gather(read_all(first), read_all(second)),
+                [b"firstsecond", b"second"],
+            )
+        self.assertEqual(self.synthesis_calls, 1)
+
+        _, path, chunks = tts_cache.aopen_tts_audio("hello")
+        self.assertIsNone(chunks)
+        self.assertEqual(path.read_bytes(), b"firstsecond")
+
+
+class _FakeRaw(io.BytesIO):
+    """요청한 크기만큼만 읽었는지 기록하는 응답 본문"""
+
+    decode_content = False
+
+    def __init__(self, body):
+        super().__init__(body)
+        self.read_sizes = []
+
+    def read(self, size=-1):
+        self.read_sizes.append(size)
+        return super().read(size)
+
+
+class BlobTransferTests(SimpleTestCase):
+    body = b"0123456789" * 10
+    block_size = 16
+
+    def setUp(self):
+        azure_storage.reset_storage_metrics()
+        self.raw = _FakeRaw(self.body)
+        self.response = mock.MagicMock(
+            raw=self.raw, headers=CaseInsensitiveDict({"Content-Length": "100"})
+        )
+        self.response.__enter__.return_value = self.response
+        self.session = mock.Mock()
+        self.session.get.return_value = self.response
+
+        self.uploaded = None
+        self.blob = mock.Mock(url="https://blob/cat.png")
+        self.blob.upload_blob.side_effect = self.fake_upload
+
+    def fake_upload(self, data, length=None, **kwargs):
+        # SDK처럼 블록 크기만큼씩 읽는다
+        parts = []
+        while chunk := data.read(self.block_size):
+            parts.append(chunk)
+        self.uploaded = b"".join(parts)
+
+    def transfer(self, mode):
+        with mock.patch.object(
+            azure_storage, "get_blob_client", return_value=self.blob
+        ), mock.patch.object(
+            azure_storage, "get_http_session", return_value=self.session
+        ):
+            return azure_storage.transfer_url_to_blob(
+                "https://dalle/cat.png", "cat.png", "image/png", mode=mode
+            )
+
+    def test_stream_uploads_without_buffering_body(self):
+        self.assertEqual(self.transfer("stream"), "https://blob/cat.png")
+        self.assertEqual(self.uploaded, self.body)
+        # 본문 전체를 한 번에 읽지 않고 블록 크기 단위로만 읽는다
+        self.assertTrue(self.raw.read_sizes)
+        self.assertTrue(all(size == self.block_size for size in self.raw.read_sizes))
+        self.assertEqual(self.blob.upload_blob.call_args.kwargs["length"], 100)
+        self.assertEqual(azure_storage.get_transfer_metrics()[-1]["bytes"], 100)
+
+    def test_compressed_response_is_uploaded_without_length(self):
+        # Content-Length는 압축된 크기라 압축을 푼 본문 길이로 쓸 수 없다
+        self.response.headers["Content-Length"] = "40"
+        self.response.headers["Content-Encoding"] = "gzip"
+        self.transfer("stream")
+        self.assertTrue(self.raw.decode_content)
+        self.assertIsNone(self.blob.upload_blob.call_args.kwargs["length"])
+        self.assertEqual(self.uploaded, self.body)
+
+    def test_copy_does_not_download(self):
+        self.transfer("copy")
+        self.blob.upload_blob_from_url.assert_called_once()
+        self.session.get.assert_not_called()
+        self.assertEqual(azure_storage.get_transfer_metrics()[-1]["mode"], "copy")
+
+    def test_failed_copy_falls_back_to_streaming(self):
+        self.blob.upload_blob_from_url.side_effect = RuntimeError("copy 실패")
+        self.assertEqual(self.transfer("copy"), "https://blob/cat.png")
+        self.session.get.assert_called_once()
+        self.assertEqual(self.uploaded, self.body)
+        self.assertEqual(azure_storage.get_transfer_metrics()[-1]["mode"], "stream")